@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+"""
+Benchmarks of the umodbus request processing
+
+Runs headless on CPython and on the MicroPython unix port, from the
+repository root::
+
+    python3 benchmarks/bench.py [-n ITERATIONS] [FILTER ...]
+    micropython benchmarks/bench.py [-n ITERATIONS] [FILTER ...]
+
+Only benchmarks whose name contains one of the filters are run. For every
+benchmark the requests per second, the bytes allocated per request and the
+p50/p99 latency in microseconds are reported.
+"""
+
+# system packages
+import gc
+import struct
+import sys
+
+sys.path.insert(0, 'benchmarks')
+sys.path.insert(0, 'lib')
+
+import fakes    # noqa: E402
+fakes.install()
+
+import time     # noqa: E402
+
+from umodbus import const as Const      # noqa: E402
+from umodbus import functions           # noqa: E402
+from umodbus.common import Request      # noqa: E402
+from umodbus.crc import crc16           # noqa: E402
+from umodbus.modbus import Modbus       # noqa: E402
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+#: Unit address of the benchmarked client
+UNIT_ADDR = 1
+
+
+def _sorted_percentile(samples, percent):
+    return samples[min(len(samples) - 1, (len(samples) * percent) // 100)]
+
+
+def _measure_alloc(func, iterations):
+    """
+    Get the bytes allocated by a function per call
+
+    MicroPython counts all allocations with the garbage collector disabled,
+    CPython reports the peak of traced memory above the start of each call.
+    """
+    gc.collect()
+    total = 0
+
+    if tracemalloc is not None:
+        tracemalloc.start()
+        for _ in range(iterations):
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            func()
+            total += tracemalloc.get_traced_memory()[1] - before
+        tracemalloc.stop()
+    else:
+        gc.disable()
+        before = gc.mem_alloc()
+        for _ in range(iterations):
+            func()
+        total = gc.mem_alloc() - before
+        gc.enable()
+
+    return total // iterations
+
+
+def measure(func, iterations):
+    """
+    Run a function repeatedly and measure it
+
+    :param      func:        The function to benchmark
+    :type       func:        Callable[[], None]
+    :param      iterations:  The amount of calls
+    :type       iterations:  int
+
+    :returns:   Requests per second, bytes per request, p50 and p99 in us
+    :rtype:     tuple
+    """
+    # warm up caches and lazily created objects
+    for _ in range(min(iterations, 10)):
+        func()
+
+    samples = []
+    ticks_us = time.ticks_us
+    ticks_diff = time.ticks_diff
+    total_start = ticks_us()
+    for _ in range(iterations):
+        start = ticks_us()
+        func()
+        samples.append(ticks_diff(ticks_us(), start))
+    total = ticks_diff(ticks_us(), total_start)
+
+    # allocations are measured in a separate run, tracing slows down
+    alloc = _measure_alloc(func, iterations)
+
+    samples.sort()
+    rate = (iterations * 1000000) // max(1, total)
+    return (rate,
+            alloc,
+            _sorted_percentile(samples, 50),
+            _sorted_percentile(samples, 99))
+
+
+def _request_pdus():
+    """
+    Get the benchmarked request PDUs
+
+    :returns:   Tuples of name and request PDU
+    :rtype:     List[tuple]
+    """
+    pdus = []
+    for qty in (1, 16, 2000):
+        pdus.append(('FC01 qty {}'.format(qty),
+                     functions.read_coils(0, qty)))
+    for qty in (1, 16, 2000):
+        pdus.append(('FC02 qty {}'.format(qty),
+                     functions.read_discrete_inputs(0, qty)))
+    for qty in (1, 16, 125):
+        pdus.append(('FC03 qty {}'.format(qty),
+                     functions.read_holding_registers(0, qty)))
+    for qty in (1, 16, 125):
+        pdus.append(('FC04 qty {}'.format(qty),
+                     functions.read_input_registers(0, qty)))
+    pdus.append(('FC05 qty 1', functions.write_single_coil(0, True)))
+    pdus.append(('FC06 qty 1', functions.write_single_register(0, 1234)))
+    for qty in (16, 1968):
+        pdus.append(('FC15 qty {}'.format(qty),
+                     functions.write_multiple_coils(0, [True] * qty)))
+    for qty in (16, 123):
+        pdus.append(('FC16 qty {}'.format(qty),
+                     functions.write_multiple_registers(0,
+                                                        list(range(qty)),
+                                                        False)))
+    pdus.append(('FC22 qty 1', struct.pack('>BHHH',
+                                           Const.MASK_WRITE_REGISTER,
+                                           0, 0xF0F0, 0x0F0F)))
+    pdus.append(('FC23 qty 16', functions.read_write_multiple_registers(
+        0, 16, 16, list(range(16)), False)))
+    return pdus
+
+
+def _setup_registers(client):
+    client.add_coil(0, [False] * 2000)
+    client.add_ist(0, [True] * 2000)
+    client.add_hreg(0, list(range(125)))
+    client.add_ireg(0, list(range(125)))
+
+
+def bench_response():
+    """Encode read responses with functions.response"""
+    for qty in (1, 16, 2000):
+        values = [bool(x & 1) for x in range(qty)]
+        yield ('response FC01 qty {}'.format(qty),
+               lambda values=values, qty=qty: functions.response(
+                   Const.READ_COILS, 0, qty, None, values))
+    for qty in (1, 16, 125):
+        values = list(range(qty))
+        yield ('response FC03 qty {}'.format(qty),
+               lambda values=values, qty=qty: functions.response(
+                   Const.READ_HOLDING_REGISTERS, 0, qty, None, values))
+
+
+def bench_request():
+    """Decode request PDUs with Request.__init__"""
+    for name, pdu in _request_pdus():
+        data = bytes([UNIT_ADDR]) + pdu
+        yield ('Request {}'.format(name),
+               lambda data=data: Request(None, data))
+
+
+def bench_crc():
+    """Calculate the CRC of RTU frames"""
+    itf = fakes.loopback_serial()
+    for length in (8, 64, 256):
+        data = bytes(range(length))
+        yield ('crc16 {} bytes'.format(length),
+               lambda data=data: itf._calculate_crc16(data))
+
+
+def bench_process_tcp():
+    """Process requests received via TCP with Modbus.process"""
+    itf = fakes.loopback_tcp()
+    client = Modbus(itf, None)
+    _setup_registers(client)
+
+    for name, pdu in _request_pdus():
+        frame = struct.pack('>HHHB', 1, 0, len(pdu) + 1, UNIT_ADDR) + pdu
+
+        def run(frame=frame):
+            itf.frame = frame
+            client.process()
+
+        yield ('process TCP {}'.format(name), run)
+
+
+def bench_process_rtu():
+    """Process requests received via RTU with Modbus.process"""
+    itf = fakes.loopback_serial()
+    client = Modbus(itf, [UNIT_ADDR])
+    _setup_registers(client)
+
+    for name, pdu in _request_pdus():
+        frame = bytes([UNIT_ADDR]) + pdu
+        frame += struct.pack('<H', crc16(frame))
+
+        def run(frame=frame):
+            itf.frame = frame
+            client.process()
+
+        yield ('process RTU {}'.format(name), run)
+
+
+BENCHMARKS = (
+    bench_response,
+    bench_request,
+    bench_crc,
+    bench_process_tcp,
+    bench_process_rtu,
+)
+
+
+def main(argv):
+    iterations = 1000
+    filters = []
+    args = list(argv)
+    while args:
+        arg = args.pop(0)
+        if arg in ('-n', '--iterations'):
+            iterations = int(args.pop(0))
+        else:
+            filters.append(arg)
+
+    print('{:<32} {:>10} {:>8} {:>8} {:>8}'.format(
+        'benchmark', 'req/s', 'B/req', 'p50 us', 'p99 us'))
+
+    for bench in BENCHMARKS:
+        for name, func in bench():
+            if filters and not any(f in name for f in filters):
+                continue
+            rate, alloc, p50, p99 = measure(func, iterations)
+            print('{:<32} {:>10} {:>8} {:>8} {:>8}'.format(
+                name, rate, alloc, p50, p99))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
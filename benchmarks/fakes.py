@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+"""
+Stand-in modules and loopback interfaces for the benchmarks
+
+:py:func:`install` has to be called before anything of ``umodbus`` is
+imported. It registers minimal ``machine`` and ``micropython`` modules and
+the MicroPython ``time`` functions where they are missing, which is the
+case on CPython, and on the MicroPython unix port for the ``machine``
+classes used by ``umodbus.serial``.
+"""
+
+# system packages
+import sys
+import time
+
+
+class _Module(object):
+    """Namespace used as stand-in module"""
+    pass
+
+
+class FakePin(object):
+    OUT = 1
+    IN = 0
+
+    def __init__(self, *args, **kwargs):
+        self._value = 0
+
+    def on(self):
+        self._value = 1
+
+    def off(self):
+        self._value = 0
+
+    def value(self, value=None):
+        if value is not None:
+            self._value = value
+        return self._value
+
+
+class FakeUART(object):
+    """UART counting the written bytes, nothing is ever received"""
+    def __init__(self, *args, **kwargs):
+        self.written = 0
+
+    def any(self):
+        return 0
+
+    def read(self, nbytes=None):
+        return None
+
+    def readinto(self, buf, nbytes=None):
+        return None
+
+    def write(self, buf):
+        self.written += len(buf)
+        return len(buf)
+
+    def flush(self):
+        pass
+
+    def irq(self, *args, **kwargs):
+        pass
+
+
+class FakeTimer(object):
+    PERIODIC = 1
+    ONE_SHOT = 0
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def init(self, *args, **kwargs):
+        pass
+
+    def deinit(self):
+        pass
+
+
+class FakeSocket(object):
+    """Socket counting the sent bytes"""
+    def __init__(self):
+        self.sent = 0
+
+    def send(self, buf):
+        self.sent += len(buf)
+        return len(buf)
+
+    def close(self):
+        pass
+
+
+def _install_time():
+    if hasattr(time, 'ticks_us'):
+        return
+
+    def ticks_ms():
+        return int(time.monotonic() * 1000) & 0x3FFFFFFF
+
+    def ticks_us():
+        return int(time.monotonic() * 1000000) & 0x3FFFFFFF
+
+    def ticks_add(ticks, delta):
+        return (ticks + delta) & 0x3FFFFFFF
+
+    def ticks_diff(end, start):
+        diff = (end - start) & 0x3FFFFFFF
+        if diff & 0x20000000:
+            diff -= 0x40000000
+        return diff
+
+    def sleep_us(us):
+        time.sleep(us / 1000000)
+
+    def sleep_ms(ms):
+        time.sleep(ms / 1000)
+
+    time.ticks_ms = ticks_ms
+    time.ticks_us = ticks_us
+    time.ticks_add = ticks_add
+    time.ticks_diff = ticks_diff
+    time.sleep_us = sleep_us
+    time.sleep_ms = sleep_ms
+
+
+def install():
+    """Register the stand-in modules where the real ones are missing"""
+    _install_time()
+
+    try:
+        import micropython      # noqa: F401
+    except ImportError:
+        module = _Module()
+        module.const = lambda value: value
+        sys.modules['micropython'] = module
+
+    try:
+        from machine import UART, Pin, Timer     # noqa: F401
+    except ImportError:
+        module = _Module()
+        module.UART = FakeUART
+        module.Pin = FakePin
+        module.Timer = FakeTimer
+        module.idle = lambda: None
+        sys.modules['machine'] = module
+
+
+def loopback_tcp():
+    """
+    Create a Modbus TCP server interface fed with a fixed request
+
+    :returns:   The interface, set its ``frame`` to the MBAP request
+    :rtype:     LoopbackTCPServer
+    """
+    from umodbus.tcp import TCPServer, TCPConnection
+
+    class LoopbackTCPServer(TCPServer):
+        """TCP server receiving the same request on every call"""
+        def __init__(self):
+            super().__init__()
+            self.frame = b''
+            self.sock = FakeSocket()
+            self.conn = TCPConnection(self, self.sock, ('loopback', 0))
+            self._clients.append(self.conn)
+
+        def get_request(self, unit_addr_list=None, timeout=None):
+            self.conn._rx_buf = bytearray(self.frame)
+            self.conn.decode(unit_addr_list, self._requests)
+            return self._next_request()
+
+    return LoopbackTCPServer()
+
+
+def loopback_serial():
+    """
+    Create a Modbus RTU serial interface fed with a fixed request
+
+    :returns:   The interface, set its ``frame`` to the RTU request
+    :rtype:     LoopbackSerial
+    """
+    from umodbus.crc import crc16
+    from umodbus.serial import Serial
+
+    class LoopbackSerial(Serial):
+        """Serial receiving the same request on every call"""
+        def __init__(self):
+            super().__init__(uart_id=0,
+                             baudrate=115200,
+                             pins=(0, 1),
+                             rx_engine=False)
+            self.frame = b''
+
+        def get_request(self, unit_addr_list, timeout=None):
+            return self._decode_request(req=self.frame,
+                                        crc_valid=crc16(self.frame) == 0,
+                                        unit_addr_list=unit_addr_list)
+
+        def _write_adu(self, length):
+            # the CRC as on the wire, without waiting for the UART
+            crc = crc16(self._tx_buf, 0, length)
+            self._tx_buf[length] = crc & 0xFF
+            self._tx_buf[length + 1] = crc >> 8
+            self._uart.write(self._tx_view[:length + 2])
+
+    return LoopbackSerial()
@@ -7,37 +7,68 @@ from typing import Optional
 
 from machine import Pin
 from rp2 import StateMachine
+try:
+    from rp2 import DMA
+except ImportError:  # MicroPython before v1.21
+    DMA = None
 # -----------------------------------------------
 # add type hints for the rp2.PIO Instructions
 from typing_extensions import TYPE_CHECKING
 
-from pio_code.pio_dmx import dmx_receive, dmx_send
+from pio_code.pio_dmx import claim_state_machine, dmx_receive, dmx_send, release_state_machine
+
+# TX FIFO register of the first state machine of each PIO block
+PIO_TXF0 = (0x50200010, 0x50300010)
+# DMA transfer request of the first TX FIFO of each PIO block
+DREQ_PIO_TX0 = (0, 8)
+
+# timing of dmx_send at 1 MHz: BREAK and MAB, then 11 bits of 4us per slot
+BREAK_MAB_US = 192
+SLOT_US = 44
+
 
 class DMX:
     """
     DMX class for controlling DMX universe.
 
+    A frame is fed to the state machine by DMA, so `send` returns at once.
+    While it goes out the next frame is prepared in the second universe
+    buffer.
+
     Args:
         dmx_tx (Pin): The pin used for transmitting DMX data.
         size (int, optional): The size of the DMX universe. Defaults to 512.
         max485_send (Optional[Pin], optional): The pin used for controlling the MAX485 chip. Defaults to None.
+        on_done (Optional[Callable[[DMX], None]], optional): Called once a frame has been sent. Defaults to None.
+        machine_nr (Optional[int], optional): The state machine, 0-3 on PIO0 and 4-7 on PIO1, None for the first free one. Defaults to None.
 
     Attributes:
-        universe (array): The DMX universe array.
+        universe (array): The DMX universe array the next frame is prepared in.
         sm_tx (StateMachine): The state machine for transmitting DMX data.
         max485_send (Optional[Pin]): The pin used for controlling the MAX485 chip.
+        on_done (Optional[Callable[[DMX], None]]): Called once a frame has been sent.
 
     Methods:
-        send: Send the universe to the DMX bus.
+        send: Start sending the universe to the DMX bus.
+        start: Start a frame prepared by `send(start=False)`.
+        busy: Check whether a frame is still being sent.
+        wait: Wait until the frame has been sent.
         set_channel: Set the value of a specific DMX channel.
         get_channel: Get the value of a specific DMX channel.
-        blackout: Set all channels to 0.
+        set_all: Set all channels to a value.
+        resize: Change the number of channels sent per frame.
+        deinit: Release the state machine and the DMA channel.
     """
-    
-    def __init__(self, dmx_tx: Pin , size:int = 512, max485_send: Optional[Pin] = None):
+
+    def __init__(self, dmx_tx: Pin , size:int = 512, max485_send: Optional[Pin] = None, on_done = None, machine_nr: Optional[int] = None):
         self.universe = array("B", [0] + [0] * (size))  # 1 start code + 512 channels
-        machine_nr = 0
+        # the buffer of the frame being sent, None if idle
+        self._sending = None
+        self._spare = array("B", self.universe)
+        self._frame_end = time.ticks_us()
+        self.machine_nr = machine_nr = claim_state_machine(machine_nr)
         self.max485_send = max485_send
+        self.on_done = on_done
         self.sm_tx = StateMachine(
             machine_nr,
             dmx_send,
@@ -45,6 +76,16 @@ class DMX:
             out_base=dmx_tx,
             sideset_base=dmx_tx,
         )
+        if DMA is not None:
+            self._dma = DMA()
+            self._txf = PIO_TXF0[machine_nr // 4] + 4 * (machine_nr % 4)
+            self._dma_ctrl = self._dma.pack_ctrl(
+                size=0,  # bytes, the state machine shifts out the low byte
+                inc_write=False,
+                treq_sel=DREQ_PIO_TX0[machine_nr // 4] + machine_nr % 4,
+            )
+        else:
+            self._dma = None
 
     def set_channel(self, channel: int, value: int):
         """
@@ -69,26 +110,227 @@ class DMX:
         """
         return self.universe[channel]
 
-    def set_all(value : int = 0):
+    def set_all(self, value : int = 0):
+        """
+        Set all channels to a value, 0 by default.
         """
-        Set all channels to 0.
-        """	
         for i in range(1, len(self.universe)):
             self.universe[i] = value
 
+    def resize(self, size: int):
+        """
+        Change the number of channels sent per frame, shorter frames refresh faster.
+
+        The channel values are kept as far as they fit. A frame being sent
+        keeps its own buffer, so this is safe at any time and takes effect
+        with the next `send`.
+
+        Args:
+            size (int): The new size of the DMX universe, 1 to 512.
+
+        Raises:
+            ValueError: If the size is out of range.
+        """
+        if not 0 < size <= 512:
+            raise ValueError("DMX universe size must be 1 to 512, got {}".format(size))
+        if size + 1 == len(self.universe):
+            return
+        universe = array("B", bytes(size + 1))
+        keep = min(len(universe), len(self.universe))
+        universe[:keep] = self.universe[:keep]
+        self.universe = universe
+        self._spare = array("B", universe)
+
+    def busy(self) -> bool:
+        """
+        Check whether a frame is still being sent.
+
+        Once the frame is out the MAX485 chip is switched back to receiving
+        and `on_done` is called.
+
+        Returns:
+            bool: True while a frame is being sent.
+        """
+        if self._sending is None:
+            return False
+        if self._frame_end is None or time.ticks_diff(time.ticks_us(), self._frame_end) < 0 or (
+                self._dma is not None and self._dma.active()):
+            return True
+
+        self._sending = None
+        if self.max485_send:
+            self.max485_send.off()  # switch the MAX485 chip for receiving
+        if self.on_done:
+            self.on_done(self)
+        return False
 
-    def send(self):
+    def wait(self):
+        """
+        Wait until the frame has been sent.
         """
-        Send the universe to the DMX bus.
-        """	
+        while self.busy():
+            time.sleep_us(50)
+
+    def send(self, start: bool = True) -> bool:
+        """
+        Start sending the universe to the DMX bus.
+
+        The universe buffers are swapped, `universe` keeps the values of the
+        frame being sent and may be changed right away.
+
+        Args:
+            start (bool, optional): Start the frame now, otherwise only fill the tx FIFO until `start` is called. Defaults to True.
+
+        Returns:
+            bool: True if the frame has been started, False if the previous one is still being sent.
+        """
+        if self.busy():
+            return False
+
+        frame = self.universe
         if self.max485_send:
             self.max485_send.on()  # switch the MAX485 chip for transmitting
+        self.sm_tx.active(0)
         self.sm_tx.restart()
-        self.sm_tx.active(1)
-        self.sm_tx.put(self.universe) 
-        if self.max485_send:
-            while (self.sm_tx.tx_fifo() != 0):
-                time.sleep_us(50)  # wait for the last 4 frames (4 x 44us and some) in the tx FIFO to be sent before switching the 485 driver
-            self.max485_send.off()  # switch the MAX485 chip for receiving
+        self._sending = frame
+        self._frame_end = None
+        if self._dma is not None:
+            # the DMA fills the tx FIFO and waits for the state machine
+            self._dma.config(read=frame, write=self._txf, count=len(frame), ctrl=self._dma_ctrl, trigger=True)
+        else:
+            self.start()
+            self.sm_tx.put(frame)  # blocks until the last 4 slots are in the tx FIFO
 
+        # prepare the next frame in the other buffer
+        self._spare[:] = frame
+        self.universe, self._spare = self._spare, frame
+        if start:
+            self.start()
+        return True
 
+    def start(self):
+        """
+        Start a frame prepared by `send(start=False)`, the BREAK begins now.
+        """
+        if self._sending is not None and self._frame_end is None:
+            self.sm_tx.active(1)
+            self._frame_end = time.ticks_add(time.ticks_us(), BREAK_MAB_US + SLOT_US * len(self._sending))
+
+    def deinit(self):
+        """
+        Stop sending and release the state machine and the DMA channel.
+        """
+        self.sm_tx.active(0)
+        if self._dma is not None:
+            self._dma.close()
+        self._sending = None
+        release_state_machine(self.machine_nr)
+
+
+class DMXOutput:
+    """
+    Several DMX universes, one per pin, each sent by its own state machine.
+
+    The state machines are claimed from both PIO blocks and all universes
+    are refreshed in parallel at the same frame rate, either with
+    synchronised frame starts or with the starts spread evenly over the
+    frame period.
+
+    Args:
+        pins (list[Pin]): The pin of each universe.
+        size (int, optional): The size of each universe. Defaults to 512.
+        fps (int, optional): Frames per second of each universe. Defaults to 25.
+        synchronised (bool, optional): Start the frames of all universes together, otherwise staggered. Defaults to False.
+        max485_send (Optional[list[Pin]], optional): The MAX485 control pin of each universe. Defaults to None.
+
+    Attributes:
+        universes (list[DMX]): The universes in order of their pins.
+
+    Methods:
+        service: Start the frames that are due.
+        deinit: Release all universes.
+    """
+
+    def __init__(self, pins: list, size: int = 512, fps: int = 25, synchronised: bool = False, max485_send: Optional[list] = None):
+        self.universes = []
+        for index, pin in enumerate(pins):
+            self.universes.append(DMX(pin, size=size, max485_send=max485_send[index] if max485_send else None))
+        self.synchronised = synchronised
+        self._due = [time.ticks_us()] * len(pins)
+        self.fps = fps
+
+    @property
+    def fps(self) -> int:
+        return self._fps
+
+    @fps.setter
+    def fps(self, value: int):
+        if value < 1:
+            value = 1
+        self._fps = value
+        self._period = 1_000_000 // value
+        # spread the staggered starts over the period
+        now = time.ticks_us()
+        step = 0 if self.synchronised else self._period // max(1, len(self.universes))
+        for index in range(len(self._due)):
+            self._due[index] = time.ticks_add(now, index * step)
+
+    def __len__(self):
+        return len(self.universes)
+
+    def __getitem__(self, index: int) -> DMX:
+        return self.universes[index]
+
+    def _next_due(self, index: int, now: int):
+        due = time.ticks_add(self._due[index], self._period)
+        if time.ticks_diff(now, due) >= 0:
+            # called too late, don't send the missed frames in a burst
+            due = time.ticks_add(now, self._period)
+        self._due[index] = due
+
+    def service(self, refresh = None) -> int:
+        """
+        Start the frames that are due, call this frequently.
+
+        A universe still sending its previous frame is started as soon as
+        it is done, synchronised universes wait for each other.
+
+        Args:
+            refresh (Optional[Callable[[int], bool]], optional): Called with the index of a due universe to prepare its frame, a universe not needing a frame skips its tick if it returns False. Defaults to None to always send.
+
+        Returns:
+            int: Bit mask of the universes whose frames have been started.
+        """
+        now = time.ticks_us()
+        started = 0
+        if self.synchronised:
+            if time.ticks_diff(now, self._due[0]) < 0:
+                return 0
+            for dmx in self.universes:
+                if dmx.busy():
+                    return 0
+            self._next_due(0, now)
+            # fill all tx FIFOs first, then start the state machines back to back
+            for index, dmx in enumerate(self.universes):
+                if (refresh is None or refresh(index)) and dmx.send(start=False):
+                    started |= 1 << index
+            for dmx in self.universes:
+                dmx.start()
+            return started
+
+        for index, dmx in enumerate(self.universes):
+            if time.ticks_diff(now, self._due[index]) < 0 or dmx.busy():
+                continue
+            self._next_due(index, now)
+            if (refresh is None or refresh(index)) and dmx.send():
+                started |= 1 << index
+        return started
+
+    def deinit(self):
+        """
+        Stop sending and release the state machines of all universes.
+        """
+        for dmx in self.universes:
+            dmx.deinit()
+        self.universes = []
+        self._due = []
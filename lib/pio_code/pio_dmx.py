@@ -1,5 +1,60 @@
-from machine import Pin
+import time
+from array import array
+from typing import Optional
+
+import micropython
+from machine import Pin, disable_irq, enable_irq
 from rp2 import PIO, StateMachine, asm_pio
+try:
+    from rp2 import DMA
+except ImportError:  # MicroPython before v1.21
+    DMA = None
+
+# RX FIFO register of the first state machine of each PIO block, the pushed
+# byte is in the most significant byte of the word, at address + 3
+PIO_RXF0 = (0x50200020, 0x50300020)
+# DMA transfer request of the first RX FIFO of each PIO block
+DREQ_PIO_RX0 = (4, 12)
+
+# state machines used for DMX, 0-3 on PIO0 and 4-7 on PIO1
+_claimed = []
+
+
+def claim_state_machine(machine_nr: Optional[int] = None) -> int:
+    """
+    Claim a state machine for DMX.
+
+    Args:
+        machine_nr (Optional[int], optional): The state machine, None for the first free one on either PIO block. Defaults to None.
+
+    Returns:
+        int: The claimed state machine.
+
+    Raises:
+        ValueError: The state machine is already in use.
+        RuntimeError: All state machines are in use.
+    """
+    if machine_nr is None:
+        for machine_nr in range(8):
+            if machine_nr not in _claimed:
+                break
+        else:
+            raise RuntimeError("no free state machine")
+    elif machine_nr in _claimed:
+        raise ValueError("state machine {} in use".format(machine_nr))
+    _claimed.append(machine_nr)
+    return machine_nr
+
+
+def release_state_machine(machine_nr: int):
+    """
+    Release a state machine claimed for DMX.
+
+    Args:
+        machine_nr (int): The state machine.
+    """
+    if machine_nr in _claimed:
+        _claimed.remove(machine_nr)
 
 
 # fmt: off
@@ -95,6 +150,268 @@ def receive_example():
     rx_universe(universe)
     print(universe[:10])
 
+# fmt: off
+@asm_pio(
+        in_shiftdir=PIO.SHIFT_RIGHT,
+        fifo_join=PIO.JOIN_RX
+)
+def dmx_receive_frames():
+    """
+    PIO program to receive DMX frames continuously.
+
+    Input pins: 1, also used as jmp pin
+
+    Every slot is pushed as one word with the data in the most significant
+    byte. A slot without stop bit is a BREAK, nothing is pushed for it and
+    IRQ 0 (relative) is raised at the Mark-After-Break, before the start
+    code of the next frame arrives.
+    """
+    # Wait for the first BREAK of at least 88us
+    label("break_reset")
+    set(x, 29)                          # 0
+
+    label("break_loop")
+    jmp(pin, "break_reset")             # 1 | Go back to start if pin goes high during BREAK
+    jmp(x_dec, "break_loop")        [1] # 2 | wait until BREAK time over (22 loops * 4us = 88us)
+
+    label("mab")
+    wait(1, pin, 0)                     # 3 | wait for the Mark-After-Break (MAB)
+    irq(rel(0))                         # 4 | a new frame starts
+
+    wrap_target()
+    wait(0, pin, 0)                 [1] # 5 | Wait for START bit + 1+1us - measure halfway through the bit
+    set(x, 7)                       [3] # 6 | 7 more bit;  skip to halfway first bit
+
+    label("bitloop")
+    in_(pins, 1)                        # 7 | Shift data bit into ISR
+    jmp(x_dec, "bitloop")           [2] # 8 | Loop 8 times, each loop iteration is 4us
+
+    jmp(pin, "stop_bit")                # 9 | a low stop bit is a BREAK
+    jmp("mab")                          # 10
+
+    label("stop_bit")
+    push(noblock)                       # 11 | drop the slot rather than stall if the FIFO is full
+    wrap()
+# fmt: on
+
+
+class DMXReceiver:
+    """
+    Continuous DMX receiver.
+
+    The state machine runs all the time and DMA writes the slots of every
+    frame into one of two universe buffers. On each BREAK the buffers are
+    swapped in a hard interrupt, so the latest complete frame can be read
+    while the next one is received. Counters are updated in a scheduled
+    callback. The frame following one too long for the buffer is dropped.
+
+    Args:
+        dmx_rx (Pin): The pin receiving DMX data.
+        machine_nr (Optional[int], optional): The state machine, 0-3 on PIO0 and 4-7 on PIO1, None for the first free one. Defaults to None.
+        size (int, optional): The maximum number of channels. Defaults to 512.
+        start_code (int, optional): Start code of the frames to keep. Defaults to 0 for dimmer data.
+
+    Raises:
+        RuntimeError: rp2.DMA is missing, MicroPython before v1.21.
+
+    Attributes:
+        frames (int): Number of received frames with the expected start code.
+        errors (int): Number of empty frames and frames longer than the buffer.
+        ignored (int): Number of frames with another start code, e.g. RDM.
+        fps (int): Frames received during the last full second.
+
+    Methods:
+        start: Start receiving.
+        stop: Stop receiving.
+        deinit: Stop receiving and release the state machine.
+        read: Copy the latest frame.
+        get_channel: Get the value of a channel of the latest frame.
+    """
+
+    def __init__(self, dmx_rx: Pin, machine_nr: Optional[int] = None, size: int = 512, start_code: int = 0):
+        if DMA is None:
+            raise RuntimeError("DMXReceiver needs rp2.DMA, MicroPython v1.21 or later")
+        self.machine_nr = claim_state_machine(machine_nr)
+        machine_nr = self.machine_nr
+        self.start_code = start_code
+        self._size = size + 1  # 1 start code + channels
+        # one slot more, a full buffer means the frame was too long
+        self._capacity = self._size + 1
+        self._buffers = (array("B", bytes(self._capacity)), array("B", bytes(self._capacity)))
+        # slots received into each buffer
+        self._lengths = array("H", [0, 0])
+        # the buffer DMA writes to and the one with the latest frame, -1 for none
+        self._index = 0
+        self._latest = -1
+        self._synced = False
+
+        self.frames = 0
+        self.errors = 0
+        self.ignored = 0
+        self.fps = 0
+        self._second_start = time.ticks_ms()
+        self._second_frames = 0
+        # frames, errors and ignored frames not yet added to the counters
+        self._outcomes = array("H", [0, 0, 0])
+        self._overflow = False
+        self._scheduled = False
+        # bound once, the interrupt must not allocate
+        self._account_cb = self._account
+
+        self.sm_rx = StateMachine(
+            machine_nr,
+            dmx_receive_frames,
+            freq=1_000_000,
+            in_base=dmx_rx,
+            jmp_pin=dmx_rx,
+        )
+        self._dma = DMA()
+        self._dma_ctrl = self._dma.pack_ctrl(
+            size=0,
+            inc_read=False,
+            treq_sel=DREQ_PIO_RX0[machine_nr // 4] + machine_nr % 4,
+        )
+        self._rxf = PIO_RXF0[machine_nr // 4] + 4 * (machine_nr % 4) + 3
+
+    def start(self):
+        """
+        Start receiving, the first frame starts after the next BREAK.
+        """
+        self.sm_rx.active(0)
+        self.sm_rx.restart()
+        while self.sm_rx.rx_fifo():
+            self.sm_rx.get()
+        self._synced = False
+        self._overflow = False
+        self._dma.config(read=self._rxf, write=self._buffers[self._index], count=self._capacity, ctrl=self._dma_ctrl, trigger=True)
+        self.sm_rx.irq(self._on_break, hard=True)
+        self.sm_rx.active(1)
+
+    def stop(self):
+        """
+        Stop receiving, the latest frame is kept.
+        """
+        self.sm_rx.active(0)
+        self.sm_rx.irq(None)
+        self._dma.active(0)
+        self._overflow = False
+
+    def deinit(self):
+        """
+        Stop receiving and release the state machine and the DMA channel.
+        """
+        self.stop()
+        self._dma.close()
+        release_state_machine(self.machine_nr)
+
+    def _on_break(self, sm):
+        # no allocation in here, runs as hard interrupt at the MAB, at least
+        # 52us before the start code of the next frame is pushed
+        dma = self._dma
+        dma.active(0)
+        received = self._capacity - dma.count
+
+        index = self._index
+        if received > self._size:
+            # the rest of the frame is still in the FIFO, the scheduled
+            # callback drops it and restarts DMA
+            self._outcomes[1] += 1
+            self._overflow = True
+            self._synced = False
+        else:
+            if self._synced:
+                # the first BREAK only ends a partially received frame
+                if received == 0:
+                    self._outcomes[1] += 1
+                elif self._buffers[index][0] != self.start_code:
+                    self._outcomes[2] += 1
+                else:
+                    self._lengths[index] = received
+                    self._latest = index
+                    index ^= 1
+                    self._outcomes[0] += 1
+            self._synced = True
+            self._index = index
+            dma.write = self._buffers[index]
+            dma.count = self._capacity
+            dma.active(1)
+
+        if not self._scheduled:
+            self._scheduled = True
+            micropython.schedule(self._account_cb, None)
+
+    def _account(self, _):
+        state = disable_irq()
+        frames, errors, ignored = self._outcomes
+        self._outcomes[0] = self._outcomes[1] = self._outcomes[2] = 0
+        self._scheduled = False
+        if self._overflow:
+            # DMA is stopped, drop the rest of the frame too long for the
+            # buffer and resynchronise at the next BREAK
+            self._overflow = False
+            while self.sm_rx.rx_fifo():
+                self.sm_rx.get()
+            self._dma.config(read=self._rxf, write=self._buffers[self._index], count=self._capacity, ctrl=self._dma_ctrl, trigger=True)
+        enable_irq(state)
+
+        self.frames += frames
+        self.errors += errors
+        self.ignored += ignored
+        self._second_frames += frames
+
+        now = time.ticks_ms()
+        if time.ticks_diff(now, self._second_start) >= 1000:
+            self.fps = self._second_frames
+            self._second_frames = 0
+            self._second_start = now
+
+    @property
+    def length(self) -> int:
+        """
+        Get the number of slots of the latest frame, start code included.
+
+        Returns:
+            int: The number of slots, 0 if no frame has been received yet.
+        """
+        if self._latest < 0:
+            return 0
+        return self._lengths[self._latest]
+
+    def read(self, universe) -> int:
+        """
+        Copy the latest frame.
+
+        Args:
+            universe (bytearray): Buffer for the start code and the channels.
+
+        Returns:
+            int: The number of copied slots, 0 if no frame has been received yet.
+        """
+        state = disable_irq()
+        latest = self._latest
+        length = 0
+        if latest >= 0:
+            length = min(self._lengths[latest], len(universe))
+            universe[:length] = self._buffers[latest][:length]
+        enable_irq(state)
+        return length
+
+    def get_channel(self, channel: int) -> int:
+        """
+        Get the value of a channel of the latest frame.
+
+        Args:
+            channel (int): The channel number.
+
+        Returns:
+            int: The value, 0 if the channel was not part of the latest frame.
+        """
+        latest = self._latest
+        if latest < 0 or channel >= self._lengths[latest]:
+            return 0
+        return self._buffers[latest][channel]
+
+
 @asm_pio(
     #set_init=PIO.OUT_LOW,
     sideset_init=PIO.OUT_LOW,
@@ -0,0 +1,12 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+"""
+asyncio based Modbus servers and clients
+
+Use :py:class:`umodbus.asynchronous.tcp.AsyncModbusTCP` and
+:py:class:`umodbus.asynchronous.serial.AsyncModbusRTU` to serve the
+registers as task of an event loop, and
+:py:class:`umodbus.asynchronous.tcp.AsyncTCP` and
+:py:class:`umodbus.asynchronous.serial.AsyncSerial` as awaitable clients.
+"""
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+"""
+Awaitable variants of the common Modbus client functions
+
+Inherited by the asynchronous client implementations
+:py:class:`umodbus.asynchronous.tcp.AsyncTCP` and
+:py:class:`umodbus.asynchronous.serial.AsyncSerial`, which provide an
+awaitable ``_send_receive``. Requests are built and responses decoded by
+the transactions of :py:mod:`umodbus.common`, see the blocking
+:py:class:`umodbus.common.CommonModbusFunctions` for the parameters.
+"""
+
+# system packages
+try:
+    import uasyncio as asyncio
+except ImportError:
+    import asyncio
+
+# custom packages
+from .. import batch
+from .. import common
+
+# typing not natively supported on MicroPython
+from ..typing import Dict, List, Tuple, Union
+
+
+class AsyncCommonModbusFunctions(object):
+    """Common Modbus functions, awaitable"""
+    async def _transact(self, slave_addr: int, transaction: tuple):
+        """
+        Send the request of a transaction and decode its response
+
+        :param      slave_addr:   The slave address
+        :type       slave_addr:   int
+        :param      transaction:  Request PDU, count flag and response parser
+        :type       transaction:  tuple
+
+        :returns:   The decoded response
+        """
+        modbus_pdu, count, parse = transaction
+        return parse(await self._send_receive(slave_addr=slave_addr,
+                                              modbus_pdu=modbus_pdu,
+                                              count=count))
+
+    async def read_coils(self,
+                         slave_addr: int,
+                         starting_addr: int,
+                         coil_qty: int,
+                         packed: bool = False) -> Union[List[bool], bytes]:
+        """Read coils (COILS)."""
+        return await self._transact(
+            slave_addr,
+            common.read_coils_transaction(starting_addr, coil_qty, packed))
+
+    async def read_discrete_inputs(self,
+                                   slave_addr: int,
+                                   starting_addr: int,
+                                   input_qty: int,
+                                   packed: bool = False
+                                   ) -> Union[List[bool], bytes]:
+        """Read discrete inputs (ISTS)."""
+        return await self._transact(
+            slave_addr,
+            common.read_discrete_inputs_transaction(starting_addr,
+                                                    input_qty,
+                                                    packed))
+
+    async def read_holding_registers(self,
+                                     slave_addr: int,
+                                     starting_addr: int,
+                                     register_qty: int,
+                                     signed: bool = True) -> Tuple[int, ...]:
+        """Read holding registers (HREGS)."""
+        return await self._transact(
+            slave_addr,
+            common.read_holding_registers_transaction(starting_addr,
+                                                      register_qty,
+                                                      signed))
+
+    async def read_input_registers(self,
+                                   slave_addr: int,
+                                   starting_addr: int,
+                                   register_qty: int,
+                                   signed: bool = True) -> Tuple[int, ...]:
+        """Read input registers (IREGS)."""
+        return await self._transact(
+            slave_addr,
+            common.read_input_registers_transaction(starting_addr,
+                                                    register_qty,
+                                                    signed))
+
+    async def write_single_coil(self,
+                                slave_addr: int,
+                                output_address: int,
+                                output_value: Union[int, bool]) -> bool:
+        """Update a single coil."""
+        return await self._transact(
+            slave_addr,
+            common.write_single_coil_transaction(output_address,
+                                                 output_value))
+
+    async def write_single_register(self,
+                                    slave_addr: int,
+                                    register_address: int,
+                                    register_value: int,
+                                    signed: bool = True) -> bool:
+        """Update a single register."""
+        return await self._transact(
+            slave_addr,
+            common.write_single_register_transaction(register_address,
+                                                     register_value,
+                                                     signed))
+
+    async def write_multiple_coils(self,
+                                   slave_addr: int,
+                                   starting_address: int,
+                                   output_values: List[Union[int, bool]]
+                                   ) -> bool:
+        """Update multiple coils."""
+        return await self._transact(
+            slave_addr,
+            common.write_multiple_coils_transaction(starting_address,
+                                                    output_values))
+
+    async def write_multiple_registers(self,
+                                       slave_addr: int,
+                                       starting_address: int,
+                                       register_values: List[int],
+                                       signed: bool = True) -> bool:
+        """Update multiple registers."""
+        return await self._transact(
+            slave_addr,
+            common.write_multiple_registers_transaction(starting_address,
+                                                        register_values,
+                                                        signed))
+
+    async def read_write_multiple_registers(self,
+                                            slave_addr: int,
+                                            read_address: int,
+                                            read_qty: int,
+                                            write_address: int,
+                                            register_values: List[int],
+                                            signed: bool = True
+                                            ) -> Tuple[int, ...]:
+        """Update multiple registers and read registers in one transaction."""
+        return await self._transact(
+            slave_addr,
+            common.read_write_multiple_registers_transaction(read_address,
+                                                             read_qty,
+                                                             write_address,
+                                                             register_values,
+                                                             signed))
+
+    async def read_batch(self,
+                         slave_addr: int,
+                         reads: List[Tuple[str, int, int]],
+                         max_gap: int = 0,
+                         signed: bool = True) -> Dict[tuple, list]:
+        """Read several ranges with as few requests as possible."""
+        results = {}
+
+        for request in batch.plan_reads(reads=reads, max_gap=max_gap):
+            values = await self._transact(
+                slave_addr,
+                common.batch_read_transaction(request, signed))
+            results.update(batch.split_results(request, values))
+
+        return results
+
+
+async def wait_for_us(awaitable, timeout: int):
+    """
+    Wait for an awaitable with a timeout in microseconds
+
+    :param      awaitable:  The awaitable
+    :type       awaitable:  Awaitable
+    :param      timeout:    The timeout in microseconds
+    :type       timeout:    int
+
+    :raises     asyncio.TimeoutError:  If the timeout expired
+    :returns:   Result of the awaitable
+    """
+    return await asyncio.wait_for(awaitable, timeout / 1000000)
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+"""
+asyncio based Modbus RTU server and client
+
+Frames are received by an :py:class:`umodbus.serial.RTUFrameAssembler` in
+the background, the tasks only sleep until a frame is complete. The
+transmit side does not busy wait for the frame to leave the wire either.
+"""
+
+# system packages
+try:
+    import uasyncio as asyncio
+except ImportError:
+    import asyncio
+from machine import Pin
+import struct
+import time
+
+# custom packages
+from .. import const as Const
+from ..crc import crc16
+from ..modbus import Modbus
+from ..serial import Serial
+from .common import AsyncCommonModbusFunctions, wait_for_us
+
+# typing not natively supported on MicroPython
+from ..typing import List, Optional, Union
+
+
+class AsyncModbusRTU(Modbus):
+    """
+    Modbus RTU client class, served as asyncio task
+
+    :param      addr:        The address of this device on the bus
+    :type       addr:        int
+    :param      baudrate:    The baudrate, default 9600
+    :type       baudrate:    int
+    :param      data_bits:   The data bits, default 8
+    :type       data_bits:   int
+    :param      stop_bits:   The stop bits, default 1
+    :type       stop_bits:   int
+    :param      parity:      The parity, default None
+    :type       parity:      Optional[int]
+    :param      pins:        The pins as list [TX, RX]
+    :type       pins:        List[Union[int, Pin], Union[int, Pin]]
+    :param      ctrl_pin:    The control pin
+    :type       ctrl_pin:    int
+    :param      uart_id:     The ID of the used UART
+    :type       uart_id:     int
+    """
+    def __init__(self,
+                 addr: int,
+                 baudrate: int = 9600,
+                 data_bits: int = 8,
+                 stop_bits: int = 1,
+                 parity: Optional[int] = None,
+                 pins: List[Union[int, Pin], Union[int, Pin]] = None,
+                 ctrl_pin: int = None,
+                 uart_id: int = 1):
+        super().__init__(
+            # set itf to AsyncSerial object, addr_list to [addr]
+            AsyncSerial(uart_id=uart_id,
+                        baudrate=baudrate,
+                        data_bits=data_bits,
+                        stop_bits=stop_bits,
+                        parity=parity,
+                        pins=pins,
+                        ctrl_pin=ctrl_pin),
+            [addr]
+        )
+        self._running = False
+
+    async def serve(self) -> None:
+        """
+        Serve requests until :py:meth:`close` is called
+
+        Meant to be run as task, e.g. ``asyncio.create_task(client.serve())``
+        """
+        self._running = True
+        while self._running:
+            frame, crc_valid = await self._itf.read_frame()
+            if frame is None:
+                continue
+
+            request = self._itf._decode_request(req=frame,
+                                                crc_valid=crc_valid,
+                                                unit_addr_list=self._addr_list)
+            if request is not None:
+                self._process_request(request)
+
+            # the response, if any, has to leave the wire before the next
+            # request can be received
+            await self._itf.finish_send()
+
+    def close(self) -> None:
+        """Stop serving after the current request"""
+        self._running = False
+
+
+class AsyncSerial(AsyncCommonModbusFunctions, Serial):
+    """
+    Awaitable Modbus RTU host
+
+    :param      uart_id:     The ID of the used UART
+    :type       uart_id:     int
+    :param      baudrate:    The baudrate, default 9600
+    :type       baudrate:    int
+    :param      data_bits:   The data bits, default 8
+    :type       data_bits:   int
+    :param      stop_bits:   The stop bits, default 1
+    :type       stop_bits:   int
+    :param      parity:      The parity, default None
+    :type       parity:      Optional[int]
+    :param      pins:        The pins as list [TX, RX]
+    :type       pins:        List[Union[int, Pin], Union[int, Pin]]
+    :param      ctrl_pin:    The control pin
+    :type       ctrl_pin:    int
+    """
+    def __init__(self,
+                 uart_id: int = 1,
+                 baudrate: int = 9600,
+                 data_bits: int = 8,
+                 stop_bits: int = 1,
+                 parity=None,
+                 pins: List[Union[int, Pin], Union[int, Pin]] = None,
+                 ctrl_pin: int = None):
+        super().__init__(uart_id=uart_id,
+                         baudrate=baudrate,
+                         data_bits=data_bits,
+                         stop_bits=stop_bits,
+                         parity=parity,
+                         pins=pins,
+                         ctrl_pin=ctrl_pin,
+                         rx_engine=True)
+
+        # time at which the last written frame has left the wire
+        self._tx_end_us = time.ticks_us()
+        self._tx_pending = False
+        self._lock = asyncio.Lock()
+
+    def _write_adu(self, length: int) -> None:
+        """
+        Append the CRC to the frame in the transmit buffer and start sending
+
+        Unlike :py:meth:`umodbus.serial.Serial._write_adu` this returns right
+        after the frame has been handed to the UART, :py:meth:`finish_send`
+        releases the control pin once the frame is out.
+
+        :param      length:  The length of the frame without CRC
+        :type       length:  int
+        """
+        struct.pack_into('<H',
+                         self._tx_buf,
+                         length,
+                         crc16(self._tx_buf, 0, length))
+        length += Const.CRC_LENGTH
+
+        if self._ctrlPin:
+            self._ctrlPin.on()
+            # wait until the control pin really changed
+            time.sleep_us(200)
+
+        self._uart.write(self._tx_view[:length])
+        self._tx_end_us = time.ticks_add(time.ticks_us(),
+                                         self._t1char * (length + 1) + 100)
+        self._tx_pending = True
+
+    async def finish_send(self) -> None:
+        """Wait until the last written frame is sent, release the ctrl pin"""
+        if not self._tx_pending:
+            return
+
+        remaining = time.ticks_diff(self._tx_end_us, time.ticks_us())
+        if remaining > 0:
+            await asyncio.sleep(remaining / 1000000)
+
+        if self._ctrlPin:
+            self._ctrlPin.off()
+        self._tx_pending = False
+
+    async def read_frame(self, timeout: Optional[int] = None) -> tuple:
+        """
+        Wait for the next complete frame
+
+        :param      timeout:  Time to wait in microseconds, None for ever
+        :type       timeout:  Optional[int]
+
+        :returns:   Frame including CRC and CRC state, (None, False) on
+                    timeout
+        :rtype:     tuple
+        """
+        if timeout is None:
+            await self._wait_frame()
+        else:
+            try:
+                await wait_for_us(self._wait_frame(), timeout)
+            except asyncio.TimeoutError:
+                return None, False
+
+        frame = self._rx.get_frame()
+        return frame, self._rx.last_crc_valid
+
+    async def _wait_frame(self) -> None:
+        # the assembler completes frames from interrupts, poll its queue
+        # at the rate the assembler itself runs
+        period = max(1, self._inter_frame_delay // 2000) / 1000
+        while not self._rx.pending:
+            await asyncio.sleep(period)
+
+    async def _send_receive(self,
+                            modbus_pdu: bytes,
+                            slave_addr: int,
+                            count: bool) -> bytes:
+        """
+        Send a modbus message and receive the reponse.
+
+        Requests of several tasks are serialized on the bus.
+
+        :param      modbus_pdu:  The modbus Protocol Data Unit
+        :type       modbus_pdu:  bytes
+        :param      slave_addr:  The slave address
+        :type       slave_addr:  int
+        :param      count:       The count
+        :type       count:       bool
+
+        :returns:   Validated response content
+        :rtype:     bytes
+        """
+        async with self._lock:
+            self._rx.clear()
+            self._send(modbus_pdu=modbus_pdu, slave_addr=slave_addr)
+            await self.finish_send()
+
+            response, _ = await self.read_frame(timeout=self._response_timeout)
+
+        return self._validate_resp_hdr(response=response or bytearray(),
+                                       slave_addr=slave_addr,
+                                       function_code=modbus_pdu[0],
+                                       count=count)
@@ -0,0 +1,444 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+"""
+asyncio based Modbus TCP server and client
+
+The server answers each client from its own task, so it runs next to any
+other task of the same event loop without a polling loop.
+"""
+
+# system packages
+try:
+    import uasyncio as asyncio
+except ImportError:
+    import asyncio
+import struct
+import time
+
+# custom packages
+from .. import const as Const
+from ..common import Request, ModbusException
+from ..modbus import Modbus
+from ..tcp import TCP, TCPConnection
+from .common import AsyncCommonModbusFunctions
+
+# typing not natively supported on MicroPython
+from ..typing import Optional
+
+
+class AsyncModbusTCP(Modbus):
+    """
+    Modbus TCP client class, served as asyncio task
+
+    :param      addr_list:  List of addresses to answer, None for all
+    :type       addr_list:  Optional[List[int]]
+    """
+    def __init__(self, addr_list: Optional[list] = None) -> None:
+        super().__init__(
+            # set itf to AsyncTCPServer object
+            AsyncTCPServer(),
+            addr_list
+        )
+        self._itf.set_request_handler(self._process_request)
+        self._itf.unit_addr_list = addr_list
+
+    async def bind(self,
+                   local_ip: str,
+                   local_port: int = 502,
+                   max_connections: int = 10,
+                   idle_timeout: Optional[int] = None) -> None:
+        """
+        Bind IP and port and start accepting clients
+
+        :param      local_ip:         IP of this device listening for requests
+        :type       local_ip:         str
+        :param      local_port:       Port of this device
+        :type       local_port:       int
+        :param      max_connections:  Number of maximum connections
+        :type       max_connections:  int
+        :param      idle_timeout:     Time in milliseconds after which a
+                                      client without requests is closed,
+                                      None to keep clients connected
+        :type       idle_timeout:     Optional[int]
+        """
+        await self._itf.bind(local_ip, local_port, max_connections, idle_timeout)
+
+    def get_bound_status(self) -> bool:
+        """
+        Get the IP and port binding status.
+
+        :returns:   The bound status, True if already bound, False otherwise.
+        :rtype:     bool
+        """
+        return self._itf.is_bound
+
+    async def serve(self,
+                    local_ip: str,
+                    local_port: int = 502,
+                    max_connections: int = 10,
+                    idle_timeout: Optional[int] = None) -> None:
+        """
+        Bind and serve requests until the server is closed
+
+        Meant to be run as task, e.g. ``asyncio.create_task(client.serve(ip))``
+
+        :param      local_ip:         IP of this device listening for requests
+        :type       local_ip:         str
+        :param      local_port:       Port of this device
+        :type       local_port:       int
+        :param      max_connections:  Number of maximum connections
+        :type       max_connections:  int
+        :param      idle_timeout:     Time in milliseconds after which a
+                                      client without requests is closed,
+                                      None to keep clients connected
+        :type       idle_timeout:     Optional[int]
+        """
+        await self.bind(local_ip, local_port, max_connections, idle_timeout)
+        await self._itf.wait_closed()
+
+    def close(self) -> None:
+        """Stop accepting clients and close all connections"""
+        self._itf.close()
+
+
+class AsyncTCPConnection(TCPConnection):
+    """
+    Client connection of an :py:class:`AsyncTCPServer`
+
+    :param      server:   The server which accepted the connection
+    :type       server:   AsyncTCPServer
+    :param      reader:   The stream to read requests from
+    :type       reader:   asyncio.StreamReader
+    :param      writer:   The stream to write responses to
+    :type       writer:   asyncio.StreamWriter
+    """
+    def __init__(self, server, reader, writer) -> None:
+        super().__init__(server, writer, writer.get_extra_info('peername'))
+        self.reader = reader
+        self.writer = writer
+
+    def _write_adu(self, pdu_length: int, slave_addr: int) -> None:
+        """
+        Prepend the MBAP header to the PDU in the transmit buffer and write
+        it to the stream, see :py:meth:`AsyncTCPServer._serve_client` for
+        draining the stream.
+
+        :param      pdu_length:  The length of the PDU in the transmit buffer
+        :type       pdu_length:  int
+        :param      slave_addr:  The slave address
+        :type       slave_addr:  int
+        """
+        struct.pack_into('>HHHB',
+                         self._server._tx_buf,
+                         0,
+                         self._req_tid,
+                         0,
+                         pdu_length + 1,
+                         slave_addr)
+        # the stream copies whatever it can not send right away
+        self.writer.write(
+            self._server._tx_view[:Const.MBAP_HDR_LENGTH + pdu_length])
+
+    async def read_adu(self, idle_timeout: Optional[int]) -> bytes:
+        """
+        Read the next ADU from the stream
+
+        :param      idle_timeout:  Time in milliseconds to wait for the next
+                                   request, None to wait forever
+        :type       idle_timeout:  Optional[int]
+
+        :raises     OSError:  If the connection is broken or invalid data has
+                              been received
+        :returns:   The unit ID and PDU of the request
+        :rtype:     bytes
+        """
+        header = self.reader.readexactly(Const.MBAP_HDR_LENGTH - 1)
+        if idle_timeout is not None:
+            header = asyncio.wait_for(header, idle_timeout / 1000)
+        header = await header
+
+        self._req_tid, req_pid, req_len = struct.unpack('>HHH', header)
+
+        if (req_pid != 0):
+            raise OSError('Modbus request error: PID not 0')
+
+        if not (2 <= req_len <= Const.TCP_ADU_MAX_LENGTH - Const.MBAP_HDR_LENGTH + 1):
+            raise OSError('Modbus request error: invalid length')
+
+        req_uid_and_pdu = await self.reader.readexactly(req_len)
+        self.last_active = time.ticks_ms()
+
+        return req_uid_and_pdu
+
+
+class AsyncTCPServer(object):
+    """Modbus TCP host class, based on asyncio streams"""
+    def __init__(self):
+        self._server = None
+        self._is_bound = False
+        self._clients = []
+        self._max_connections = 10
+        self._idle_timeout = None
+        self._request_handler = None
+        self.unit_addr_list = None
+
+        # preallocated transmit buffer, MBAP header + PDU
+        self._tx_buf = bytearray(Const.TCP_ADU_MAX_LENGTH)
+        self._tx_view = memoryview(self._tx_buf)
+
+    @property
+    def is_bound(self) -> bool:
+        """
+        Get the IP and port binding status
+
+        :returns:   True if bound to IP and port, False otherwise
+        :rtype:     bool
+        """
+        return self._is_bound
+
+    @property
+    def connections(self) -> list:
+        """
+        Get the currently connected clients
+
+        :returns:   The client connections
+        :rtype:     List[AsyncTCPConnection]
+        """
+        return self._clients
+
+    @property
+    def pending(self) -> int:
+        """
+        Get the amount of received requests waiting to be processed
+
+        :returns:   Always 0, requests are handled as they arrive
+        :rtype:     int
+        """
+        return 0
+
+    def set_request_handler(self, handler) -> None:
+        """
+        Set the function called with each received request
+
+        :param      handler:  The handler
+        :type       handler:  Callable[[Request], None]
+        """
+        self._request_handler = handler
+
+    async def bind(self,
+                   local_ip: str,
+                   local_port: int = 502,
+                   max_connections: int = 10,
+                   idle_timeout: Optional[int] = None) -> None:
+        """
+        Bind IP and port and start accepting clients
+
+        :param      local_ip:         IP of this device listening for requests
+        :type       local_ip:         str
+        :param      local_port:       Port of this device
+        :type       local_port:       int
+        :param      max_connections:  Number of maximum connections
+        :type       max_connections:  int
+        :param      idle_timeout:     Time in milliseconds after which a
+                                      client without requests is closed,
+                                      None to keep clients connected
+        :type       idle_timeout:     Optional[int]
+        """
+        self.close()
+
+        self._max_connections = max_connections
+        self._idle_timeout = idle_timeout
+        self._server = await asyncio.start_server(self._serve_client,
+                                                  local_ip,
+                                                  local_port,
+                                                  backlog=max_connections)
+        self._is_bound = True
+
+    def get_request(self,
+                    unit_addr_list: Optional[list] = None,
+                    timeout: int = None) -> None:
+        """
+        Requests are pushed to the request handler, nothing to poll
+
+        :returns:   Always None
+        :rtype:     None
+        """
+        return None
+
+    async def wait_closed(self) -> None:
+        """Wait until the server has been closed"""
+        if self._server is not None:
+            await self._server.wait_closed()
+
+    def close(self) -> None:
+        """Stop accepting clients and close all connections"""
+        for conn in self._clients:
+            conn.close()
+        self._clients = []
+
+        if self._server is not None:
+            self._server.close()
+            self._server = None
+
+        self._is_bound = False
+
+    async def _serve_client(self, reader, writer) -> None:
+        """
+        Answer the requests of one client until it disconnects
+
+        :param      reader:   The stream to read requests from
+        :type       reader:   asyncio.StreamReader
+        :param      writer:   The stream to write responses to
+        :type       writer:   asyncio.StreamWriter
+        """
+        if len(self._clients) >= self._max_connections:
+            oldest = self._clients[0]
+            for conn in self._clients:
+                if time.ticks_diff(oldest.last_active, conn.last_active) > 0:
+                    oldest = conn
+            oldest.close()
+
+        conn = AsyncTCPConnection(self, reader, writer)
+        self._clients.append(conn)
+
+        try:
+            while True:
+                try:
+                    req_uid_and_pdu = await conn.read_adu(self._idle_timeout)
+                except (OSError, EOFError, ValueError, asyncio.TimeoutError):
+                    # disconnected, idle timeout or invalid MBAP header,
+                    # a partial ADU ends with an EOFError subclass
+                    break
+
+                if ((self.unit_addr_list is not None) and
+                        (req_uid_and_pdu[0] not in self.unit_addr_list)):
+                    continue
+
+                try:
+                    request = Request(conn, req_uid_and_pdu)
+                except ModbusException as e:
+                    conn.send_exception_response(req_uid_and_pdu[0],
+                                                 e.function_code,
+                                                 e.exception_code)
+                else:
+                    self._request_handler(request)
+
+                try:
+                    await writer.drain()
+                except OSError:
+                    # client went away before the response was sent
+                    break
+        finally:
+            conn.close()
+            if conn in self._clients:
+                self._clients.remove(conn)
+
+
+class AsyncTCP(AsyncCommonModbusFunctions, TCP):
+    """
+    Awaitable Modbus TCP client
+
+    Call :py:meth:`connect` before the first request.
+
+    :param      slave_ip:    IP of the slave
+    :type       slave_ip:    str
+    :param      slave_port:  Port of the slave
+    :type       slave_port:  int
+    :param      timeout:     Response timeout in seconds
+    :type       timeout:     float
+    """
+    def __init__(self,
+                 slave_ip: str,
+                 slave_port: int = 502,
+                 timeout: float = 5.0):
+        self._slave_ip = slave_ip
+        self._slave_port = slave_port
+        self.timeout = timeout
+        self.trans_id_ctr = 0
+        self._reader = None
+        self._writer = None
+        self._lock = asyncio.Lock()
+
+    async def connect(self) -> None:
+        """Open the connection to the slave"""
+        self._reader, self._writer = await asyncio.open_connection(
+            self._slave_ip,
+            self._slave_port)
+
+    async def close(self) -> None:
+        """Close the connection to the slave"""
+        if self._writer is not None:
+            self._writer.close()
+            await self._writer.wait_closed()
+        self._reader = None
+        self._writer = None
+
+    def _drop_connection(self) -> None:
+        """Close the connection to the slave without waiting for it"""
+        if self._writer is not None:
+            self._writer.close()
+        self._reader = None
+        self._writer = None
+
+    async def _send_receive(self,
+                            slave_addr: int,
+                            modbus_pdu: bytes,
+                            count: bool) -> bytes:
+        """
+        Send a modbus message and receive the reponse.
+
+        Requests of several tasks are serialized on the connection.
+
+        :param      slave_addr:  The slave identifier
+        :type       slave_addr:  int
+        :param      modbus_pdu:  The modbus PDU
+        :type       modbus_pdu:  bytes
+        :param      count:       The count
+        :type       count:       bool
+
+        :returns:   Modbus data
+        :rtype:     bytes
+        """
+        async with self._lock:
+            if self._writer is None:
+                await self.connect()
+
+            mbap_hdr, trans_id = self._create_mbap_hdr(slave_addr=slave_addr,
+                                                       modbus_pdu=modbus_pdu)
+            self._writer.write(mbap_hdr + modbus_pdu)
+            await self._writer.drain()
+
+            # the timeout covers skipping responses of other transactions
+            deadline = time.ticks_add(time.ticks_ms(),
+                                      int(self.timeout * 1000))
+            try:
+                while True:
+                    remaining = time.ticks_diff(deadline, time.ticks_ms())
+                    if remaining <= 0:
+                        raise asyncio.TimeoutError()
+                    response = await asyncio.wait_for(self._read_response(),
+                                                      remaining / 1000)
+                    if struct.unpack_from('>H', response, 0)[0] == trans_id:
+                        break
+            except (OSError, EOFError, asyncio.TimeoutError):
+                # the late response would answer the next request, reconnect
+                self._drop_connection()
+                raise
+
+        return self._validate_resp_hdr(response=response,
+                                       trans_id=trans_id,
+                                       slave_addr=slave_addr,
+                                       function_code=modbus_pdu[0],
+                                       count=count)
+
+    async def _read_response(self) -> bytes:
+        """
+        Read one complete ADU from the stream
+
+        :returns:   MBAP header and PDU
+        :rtype:     bytes
+        """
+        header = await self._reader.readexactly(Const.MBAP_HDR_LENGTH - 1)
+        length = struct.unpack_from('>H', header, 4)[0]
+        return header + await self._reader.readexactly(length)
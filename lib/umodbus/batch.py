@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+"""
+Batch read planner
+
+Merges many small reads of one slave into as few requests as the Modbus
+quantity limits allow. Used by
+:py:meth:`umodbus.common.CommonModbusFunctions.read_batch`.
+"""
+
+# custom packages
+from . import const as Const
+
+# typing not natively supported on MicroPython
+from .typing import Dict, List, Tuple
+
+#: Function code and maximum quantity per register type
+READ_LIMITS = {
+    'COILS': (Const.READ_COILS, 2000),
+    'ISTS': (Const.READ_DISCRETE_INPUTS, 2000),
+    'HREGS': (Const.READ_HOLDING_REGISTERS, 125),
+    'IREGS': (Const.READ_INPUT_REGISTER, 125),
+}
+
+
+def plan_reads(reads: List[Tuple[str, int, int]],
+               max_gap: int = 0) -> List[list]:
+    """
+    Merge reads into the fewest requests within the quantity limits
+
+    Reads of the same register type are merged if they overlap, touch or
+    are at most ``max_gap`` addresses apart. Bridged gaps are read as well,
+    so only use a gap if the slave answers reads of those addresses.
+
+    :param      reads:    The reads as (register type, address, quantity)
+                          tuples, register type is one of 'COILS', 'ISTS',
+                          'HREGS' or 'IREGS'
+    :type       reads:    List[Tuple[str, int, int]]
+    :param      max_gap:  Maximum amount of unrequested addresses between
+                          two merged reads
+    :type       max_gap:  int
+
+    :raises     ValueError:  Unknown register type or invalid quantity
+    :returns:   Requests as [register type, address, quantity, reads]
+    :rtype:     List[list]
+    """
+    plan = []
+
+    for read in sorted(set(reads), key=lambda x: (x[0], x[1], x[2])):
+        reg_type, address, quantity = read
+        if reg_type not in READ_LIMITS:
+            raise ValueError('Unknown register type: {}'.format(reg_type))
+        limit = READ_LIMITS[reg_type][1]
+        if not (1 <= quantity <= limit):
+            raise ValueError('Invalid quantity: {}'.format(quantity))
+
+        if plan:
+            last = plan[-1]
+            end = last[1] + last[2]
+            new_end = max(end, address + quantity)
+            if (last[0] == reg_type and
+                    address <= end + max_gap and
+                    new_end - last[1] <= limit):
+                last[2] = new_end - last[1]
+                last[3].append(read)
+                continue
+
+        plan.append([reg_type, address, quantity, [read]])
+
+    return plan
+
+
+def split_results(request: list, values: list) -> Dict[tuple, list]:
+    """
+    Split the values read by a planned request into the results of its reads
+
+    :param      request:  The request as returned by :py:func:`plan_reads`
+    :type       request:  list
+    :param      values:   The values read
+    :type       values:   list
+
+    :returns:   The values of each read of the request
+    :rtype:     Dict[tuple, list]
+    """
+    results = {}
+    base = request[1]
+    for read in request[3]:
+        offset = read[1] - base
+        results[read] = values[offset:offset + read[2]]
+    return results
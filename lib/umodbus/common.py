@@ -12,19 +12,52 @@
 import struct
 
 # custom packages
+from . import batch
 from . import const as Const
 from . import functions
 
 # typing not natively supported on MicroPython
-from .typing import List, Optional, Tuple, Union
+from .typing import Dict, List, Optional, Tuple, Union
+
+#: Minimum length of unit address and PDU of the decoded function codes
+_MIN_REQUEST_LENGTH = {
+    Const.READ_COILS: 6,
+    Const.READ_DISCRETE_INPUTS: 6,
+    Const.READ_HOLDING_REGISTERS: 6,
+    Const.READ_INPUT_REGISTER: 6,
+    Const.WRITE_SINGLE_COIL: 6,
+    Const.WRITE_SINGLE_REGISTER: 6,
+    Const.WRITE_MULTIPLE_COILS: 7,
+    Const.WRITE_MULTIPLE_REGISTERS: 7,
+    Const.MASK_WRITE_REGISTER: 8,
+    Const.READ_WRITE_MULTIPLE_REGISTERS: 11,
+}
 
 
 class Request(object):
-    """Deconstruct request data received via TCP or Serial"""
+    """
+    Deconstruct request data received via TCP or Serial
+
+    :raises     ModbusException:  If the request is too short or invalid
+    """
     def __init__(self, interface, data: bytearray) -> None:
         self._itf = interface
+        self._raw = data
+
+        if len(data) < 2:
+            raise ModbusException(0, Const.ILLEGAL_FUNCTION)
+
         self.unit_addr = data[0]
-        self.function, self.register_addr = struct.unpack_from('>BH', data, 1)
+        self.function = data[1]
+
+        if len(data) < _MIN_REQUEST_LENGTH.get(self.function, 0):
+            raise ModbusException(self.function, Const.ILLEGAL_DATA_VALUE)
+
+        # function codes like 0x07 or 0x11 carry no register address
+        if len(data) >= 4:
+            self.register_addr = struct.unpack_from('>H', data, 2)[0]
+        else:
+            self.register_addr = None
 
         if self.function in [Const.READ_COILS, Const.READ_DISCRETE_INPUTS]:
             self.quantity = struct.unpack_from('>H', data, 4)[0]
@@ -65,11 +98,52 @@ class Request(object):
             self.data = data[7:]
             if len(self.data) != self.quantity * 2:
                 raise ModbusException(self.function, Const.ILLEGAL_DATA_VALUE)
+        elif self.function == Const.READ_WRITE_MULTIPLE_REGISTERS:
+            # register_addr and quantity describe the read part
+            self.quantity = struct.unpack_from('>H', data, 4)[0]
+            if self.quantity < 0x0001 or self.quantity > 0x007D:
+                raise ModbusException(self.function, Const.ILLEGAL_DATA_VALUE)
+            self.write_addr, self.write_quantity, byte_count = \
+                struct.unpack_from('>HHB', data, 6)
+            if (self.write_quantity < 0x0001 or
+                    self.write_quantity > 0x0079 or
+                    byte_count != self.write_quantity * 2):
+                raise ModbusException(self.function, Const.ILLEGAL_DATA_VALUE)
+            self.data = data[11:]
+            if len(self.data) != byte_count:
+                raise ModbusException(self.function, Const.ILLEGAL_DATA_VALUE)
+        elif self.function == Const.MASK_WRITE_REGISTER:
+            self.quantity = None
+            self.data = data[4:8]
+            # AND mask and OR mask, all values allowed
+            if len(self.data) != 4:
+                raise ModbusException(self.function, Const.ILLEGAL_DATA_VALUE)
         else:
             # Not implemented functions
             self.quantity = None
             self.data = data[4:]
 
+    @property
+    def pdu(self) -> bytes:
+        """
+        Get the complete Protocol Data Unit of this request.
+
+        Useful for handlers of function codes not decoded by this class.
+
+        :returns:   Function code followed by the request data
+        :rtype:     bytes
+        """
+        return self._raw[1:]
+
+    def send_pdu(self, modbus_pdu: bytes) -> None:
+        """
+        Send an already constructed response Protocol Data Unit.
+
+        :param      modbus_pdu:  The modbus Protocol Data Unit
+        :type       modbus_pdu:  bytes
+        """
+        self._itf._send(modbus_pdu=modbus_pdu, slave_addr=self.unit_addr)
+
     def send_response(self,
                       values: Optional[list] = None,
                       signed: bool = True) -> None:
@@ -89,6 +163,19 @@ class Request(object):
                                 values,
                                 signed)
 
+    def send_read_response(self, bank) -> None:
+        """
+        Send a read response with the values taken from a register bank.
+
+        :param      bank:    The register bank of the requested type
+        :type       bank:    umodbus.registers.RegisterBank
+        """
+        self._itf.send_read_response(self.unit_addr,
+                                     self.function,
+                                     self.register_addr,
+                                     self.quantity,
+                                     bank)
+
     def send_exception(self, exception_code: int) -> None:
         """
         Send an exception response.
@@ -108,15 +195,241 @@ class ModbusException(Exception):
         self.exception_code = exception_code
 
 
+def _parse_bits(bit_qty: int, packed: bool):
+    """Get the parser of a coil or discrete input read response"""
+    def parse(response):
+        if packed:
+            return bytes(response)
+        return functions.bytes_to_bool(byte_list=response, bit_qty=bit_qty)
+    return parse
+
+
+def _parse_registers(signed: bool):
+    """Get the parser of a register read response"""
+    def parse(response):
+        return functions.to_short(byte_array=response, signed=signed)
+    return parse
+
+
+def _parse_write(**expected):
+    """Get the parser of a write response echoing the expected data"""
+    def parse(response):
+        if response is None:
+            return False
+        return functions.validate_resp_data(data=response, **expected)
+    return parse
+
+
+# The transactions below build the request PDU of a client function and
+# tell how to decode its response. They are shared by the blocking
+# CommonModbusFunctions and the awaitable AsyncCommonModbusFunctions, which
+# only differ in how they call _send_receive.
+
+
+def read_coils_transaction(starting_addr: int,
+                           coil_qty: int,
+                           packed: bool = False) -> tuple:
+    """
+    Get the transaction reading coils (COILS)
+
+    :returns:   Request PDU, count flag and response parser
+    :rtype:     tuple
+    """
+    return (functions.read_coils(starting_address=starting_addr,
+                                 quantity=coil_qty),
+            True,
+            _parse_bits(coil_qty, packed))
+
+
+def read_discrete_inputs_transaction(starting_addr: int,
+                                     input_qty: int,
+                                     packed: bool = False) -> tuple:
+    """
+    Get the transaction reading discrete inputs (ISTS)
+
+    :returns:   Request PDU, count flag and response parser
+    :rtype:     tuple
+    """
+    return (functions.read_discrete_inputs(starting_address=starting_addr,
+                                           quantity=input_qty),
+            True,
+            _parse_bits(input_qty, packed))
+
+
+def read_holding_registers_transaction(starting_addr: int,
+                                       register_qty: int,
+                                       signed: bool = True) -> tuple:
+    """
+    Get the transaction reading holding registers (HREGS)
+
+    :returns:   Request PDU, count flag and response parser
+    :rtype:     tuple
+    """
+    return (functions.read_holding_registers(starting_address=starting_addr,
+                                             quantity=register_qty),
+            True,
+            _parse_registers(signed))
+
+
+def read_input_registers_transaction(starting_addr: int,
+                                     register_qty: int,
+                                     signed: bool = True) -> tuple:
+    """
+    Get the transaction reading input registers (IREGS)
+
+    :returns:   Request PDU, count flag and response parser
+    :rtype:     tuple
+    """
+    return (functions.read_input_registers(starting_address=starting_addr,
+                                           quantity=register_qty),
+            True,
+            _parse_registers(signed))
+
+
+def write_single_coil_transaction(output_address: int,
+                                  output_value: Union[int, bool]) -> tuple:
+    """
+    Get the transaction updating a single coil
+
+    :returns:   Request PDU, count flag and response parser
+    :rtype:     tuple
+    """
+    return (functions.write_single_coil(output_address=output_address,
+                                        output_value=output_value),
+            False,
+            _parse_write(function_code=Const.WRITE_SINGLE_COIL,
+                         address=output_address,
+                         value=output_value,
+                         signed=False))
+
+
+def write_single_register_transaction(register_address: int,
+                                      register_value: int,
+                                      signed: bool = True) -> tuple:
+    """
+    Get the transaction updating a single register
+
+    :returns:   Request PDU, count flag and response parser
+    :rtype:     tuple
+    """
+    return (functions.write_single_register(register_address=register_address,
+                                            register_value=register_value,
+                                            signed=signed),
+            False,
+            _parse_write(function_code=Const.WRITE_SINGLE_REGISTER,
+                         address=register_address,
+                         value=register_value,
+                         signed=signed))
+
+
+def write_multiple_coils_transaction(starting_address: int,
+                                     output_values: List[Union[int, bool]]
+                                     ) -> tuple:
+    """
+    Get the transaction updating multiple coils
+
+    :returns:   Request PDU, count flag and response parser
+    :rtype:     tuple
+    """
+    return (functions.write_multiple_coils(starting_address=starting_address,
+                                           value_list=output_values),
+            False,
+            _parse_write(function_code=Const.WRITE_MULTIPLE_COILS,
+                         address=starting_address,
+                         quantity=len(output_values)))
+
+
+def write_multiple_registers_transaction(starting_address: int,
+                                         register_values: List[int],
+                                         signed: bool = True) -> tuple:
+    """
+    Get the transaction updating multiple registers
+
+    :returns:   Request PDU, count flag and response parser
+    :rtype:     tuple
+    """
+    return (functions.write_multiple_registers(
+                starting_address=starting_address,
+                register_values=register_values,
+                signed=signed),
+            False,
+            _parse_write(function_code=Const.WRITE_MULTIPLE_REGISTERS,
+                         address=starting_address,
+                         quantity=len(register_values),
+                         signed=signed))
+
+
+def read_write_multiple_registers_transaction(read_address: int,
+                                              read_qty: int,
+                                              write_address: int,
+                                              register_values: List[int],
+                                              signed: bool = True) -> tuple:
+    """
+    Get the transaction updating and reading registers at once
+
+    :returns:   Request PDU, count flag and response parser
+    :rtype:     tuple
+    """
+    return (functions.read_write_multiple_registers(
+                read_address=read_address,
+                read_qty=read_qty,
+                write_address=write_address,
+                register_values=register_values,
+                signed=signed),
+            True,
+            _parse_registers(signed))
+
+
+def batch_read_transaction(request: tuple, signed: bool = True) -> tuple:
+    """
+    Get the transaction of a request planned by
+    :py:func:`umodbus.batch.plan_reads`
+
+    :param      request:  The planned request, register type, address and
+                          quantity first
+    :type       request:  tuple
+    :param      signed:   Indicates if registers are signed
+    :type       signed:   bool
+
+    :returns:   Request PDU, count flag and response parser
+    :rtype:     tuple
+    """
+    reg_type, address, quantity = request[0], request[1], request[2]
+    if reg_type == 'COILS':
+        return read_coils_transaction(address, quantity)
+    elif reg_type == 'ISTS':
+        return read_discrete_inputs_transaction(address, quantity)
+    elif reg_type == 'HREGS':
+        return read_holding_registers_transaction(address, quantity, signed)
+    return read_input_registers_transaction(address, quantity, signed)
+
+
 class CommonModbusFunctions(object):
     """Common Modbus functions"""
     def __init__(self):
         pass
 
+    def _transact(self, slave_addr: int, transaction: tuple):
+        """
+        Send the request of a transaction and decode its response
+
+        :param      slave_addr:   The slave address
+        :type       slave_addr:   int
+        :param      transaction:  Request PDU, count flag and response parser
+        :type       transaction:  tuple
+
+        :returns:   The decoded response
+        """
+        modbus_pdu, count, parse = transaction
+        return parse(self._send_receive(slave_addr=slave_addr,
+                                        modbus_pdu=modbus_pdu,
+                                        count=count))
+
     def read_coils(self,
                    slave_addr: int,
                    starting_addr: int,
-                   coil_qty: int) -> List[bool]:
+                   coil_qty: int,
+                   packed: bool = False) -> Union[List[bool], bytes]:
         """
         Read coils (COILS).
 
@@ -126,26 +439,23 @@ class CommonModbusFunctions(object):
         :type       starting_addr:  int
         :param      coil_qty:       The amount of coils to read
         :type       coil_qty:       int
+        :param      packed:         Return the packed bits as received
+                                    instead of a list, see
+                                    :py:func:`umodbus.functions.packed_bit`
+        :type       packed:         bool
 
-        :returns:   State of read coils as list
-        :rtype:     List[bool]
+        :returns:   State of read coils as list or packed bits
+        :rtype:     Union[List[bool], bytes]
         """
-        modbus_pdu = functions.read_coils(starting_address=starting_addr,
-                                          quantity=coil_qty)
-
-        response = self._send_receive(slave_addr=slave_addr,
-                                      modbus_pdu=modbus_pdu,
-                                      count=True)
-
-        status_pdu = functions.bytes_to_bool(byte_list=response,
-                                             bit_qty=coil_qty)
-
-        return status_pdu
+        return self._transact(
+            slave_addr,
+            read_coils_transaction(starting_addr, coil_qty, packed))
 
     def read_discrete_inputs(self,
                              slave_addr: int,
                              starting_addr: int,
-                             input_qty: int) -> List[bool]:
+                             input_qty: int,
+                             packed: bool = False) -> Union[List[bool], bytes]:
         """
         Read discrete inputs (ISTS).
 
@@ -155,22 +465,18 @@ class CommonModbusFunctions(object):
         :type       starting_addr:  int
         :param      input_qty:      The amount of discrete inputs to read
         :type       input_qty:      int
-
-        :returns:   State of read discrete inputs as list
-        :rtype:     List[bool]
+        :param      packed:         Return the packed bits as received
+                                    instead of a list, see
+                                    :py:func:`umodbus.functions.packed_bit`
+        :type       packed:         bool
+
+        :returns:   State of read discrete inputs as list or packed
+                    bits
+        :rtype:     Union[List[bool], bytes]
         """
-        modbus_pdu = functions.read_discrete_inputs(
-            starting_address=starting_addr,
-            quantity=input_qty)
-
-        response = self._send_receive(slave_addr=slave_addr,
-                                      modbus_pdu=modbus_pdu,
-                                      count=True)
-
-        status_pdu = functions.bytes_to_bool(byte_list=response,
-                                             bit_qty=input_qty)
-
-        return status_pdu
+        return self._transact(
+            slave_addr,
+            read_discrete_inputs_transaction(starting_addr, input_qty, packed))
 
     def read_holding_registers(self,
                                slave_addr: int,
@@ -192,17 +498,11 @@ class CommonModbusFunctions(object):
         :returns:   State of read holding register as tuple
         :rtype:     Tuple[int, ...]
         """
-        modbus_pdu = functions.read_holding_registers(
-            starting_address=starting_addr,
-            quantity=register_qty)
-
-        response = self._send_receive(slave_addr=slave_addr,
-                                      modbus_pdu=modbus_pdu,
-                                      count=True)
-
-        register_value = functions.to_short(byte_array=response, signed=signed)
-
-        return register_value
+        return self._transact(
+            slave_addr,
+            read_holding_registers_transaction(starting_addr,
+                                               register_qty,
+                                               signed))
 
     def read_input_registers(self,
                              slave_addr: int,
@@ -224,17 +524,11 @@ class CommonModbusFunctions(object):
         :returns:   State of read input register as tuple
         :rtype:     Tuple[int, ...]
         """
-        modbus_pdu = functions.read_input_registers(
-            starting_address=starting_addr,
-            quantity=register_qty)
-
-        response = self._send_receive(slave_addr=slave_addr,
-                                      modbus_pdu=modbus_pdu,
-                                      count=True)
-
-        register_value = functions.to_short(byte_array=response, signed=signed)
-
-        return register_value
+        return self._transact(
+            slave_addr,
+            read_input_registers_transaction(starting_addr,
+                                             register_qty,
+                                             signed))
 
     def write_single_coil(self,
                           slave_addr: int,
@@ -253,24 +547,9 @@ class CommonModbusFunctions(object):
         :returns:   Result of operation
         :rtype:     bool
         """
-        modbus_pdu = functions.write_single_coil(output_address=output_address,
-                                                 output_value=output_value)
-
-        response = self._send_receive(slave_addr=slave_addr,
-                                      modbus_pdu=modbus_pdu,
-                                      count=False)
-
-        if response is None:
-            return False
-
-        operation_status = functions.validate_resp_data(
-            data=response,
-            function_code=Const.WRITE_SINGLE_COIL,
-            address=output_address,
-            value=output_value,
-            signed=False)
-
-        return operation_status
+        return self._transact(
+            slave_addr,
+            write_single_coil_transaction(output_address, output_value))
 
     def write_single_register(self,
                               slave_addr: int,
@@ -292,26 +571,11 @@ class CommonModbusFunctions(object):
         :returns:   Result of operation
         :rtype:     bool
         """
-        modbus_pdu = functions.write_single_register(
-            register_address=register_address,
-            register_value=register_value,
-            signed=signed)
-
-        response = self._send_receive(slave_addr=slave_addr,
-                                      modbus_pdu=modbus_pdu,
-                                      count=False)
-
-        if response is None:
-            return False
-
-        operation_status = functions.validate_resp_data(
-            data=response,
-            function_code=Const.WRITE_SINGLE_REGISTER,
-            address=register_address,
-            value=register_value,
-            signed=signed)
-
-        return operation_status
+        return self._transact(
+            slave_addr,
+            write_single_register_transaction(register_address,
+                                              register_value,
+                                              signed))
 
     def write_multiple_coils(self,
                              slave_addr: int,
@@ -330,24 +594,9 @@ class CommonModbusFunctions(object):
         :returns:   Result of operation
         :rtype:     bool
         """
-        modbus_pdu = functions.write_multiple_coils(
-            starting_address=starting_address,
-            value_list=output_values)
-
-        response = self._send_receive(slave_addr=slave_addr,
-                                      modbus_pdu=modbus_pdu,
-                                      count=False)
-
-        if response is None:
-            return False
-
-        operation_status = functions.validate_resp_data(
-            data=response,
-            function_code=Const.WRITE_MULTIPLE_COILS,
-            address=starting_address,
-            quantity=len(output_values))
-
-        return operation_status
+        return self._transact(
+            slave_addr,
+            write_multiple_coils_transaction(starting_address, output_values))
 
     def write_multiple_registers(self,
                                  slave_addr: int,
@@ -369,24 +618,80 @@ class CommonModbusFunctions(object):
         :returns:   Result of operation
         :rtype:     bool
         """
-        modbus_pdu = functions.write_multiple_registers(
-            starting_address=starting_address,
-            register_values=register_values,
-            signed=signed)
-
-        response = self._send_receive(slave_addr=slave_addr,
-                                      modbus_pdu=modbus_pdu,
-                                      count=False)
+        return self._transact(
+            slave_addr,
+            write_multiple_registers_transaction(starting_address,
+                                                 register_values,
+                                                 signed))
+
+    def read_write_multiple_registers(self,
+                                      slave_addr: int,
+                                      read_address: int,
+                                      read_qty: int,
+                                      write_address: int,
+                                      register_values: List[int],
+                                      signed: bool = True) -> Tuple[int, ...]:
+        """
+        Update multiple registers and read registers in one transaction.
+
+        The slave performs the write before the read.
+
+        :param      slave_addr:       The slave address
+        :type       slave_addr:       int
+        :param      read_address:     The holding register starting address
+                                      to read from
+        :type       read_address:     int
+        :param      read_qty:         The amount of holding registers to read
+        :type       read_qty:         int
+        :param      write_address:    The holding register starting address
+                                      to write to
+        :type       write_address:    int
+        :param      register_values:  The register values to write
+        :type       register_values:  List[int]
+        :param      signed:           Indicates if signed
+        :type       signed:           bool
 
-        if response is None:
-            return False
+        :returns:   State of read holding register as tuple
+        :rtype:     Tuple[int, ...]
+        """
+        return self._transact(
+            slave_addr,
+            read_write_multiple_registers_transaction(read_address,
+                                                      read_qty,
+                                                      write_address,
+                                                      register_values,
+                                                      signed))
+
+    def read_batch(self,
+                   slave_addr: int,
+                   reads: List[Tuple[str, int, int]],
+                   max_gap: int = 0,
+                   signed: bool = True) -> Dict[tuple, list]:
+        """
+        Read several ranges with as few requests as possible.
+
+        See :py:func:`umodbus.batch.plan_reads` for how reads are merged.
+
+        :param      slave_addr:  The slave address
+        :type       slave_addr:  int
+        :param      reads:       The reads as (register type, address,
+                                 quantity) tuples, register type is one of
+                                 'COILS', 'ISTS', 'HREGS' or 'IREGS'
+        :type       reads:       List[Tuple[str, int, int]]
+        :param      max_gap:     Maximum amount of unrequested addresses
+                                 read to merge two reads
+        :type       max_gap:     int
+        :param      signed:      Indicates if registers are signed
+        :type       signed:      bool
+
+        :returns:   The values of each read, keyed by its tuple
+        :rtype:     Dict[tuple, list]
+        """
+        results = {}
 
-        operation_status = functions.validate_resp_data(
-            data=response,
-            function_code=Const.WRITE_MULTIPLE_REGISTERS,
-            address=starting_address,
-            quantity=len(register_values),
-            signed=signed
-        )
+        for request in batch.plan_reads(reads=reads, max_gap=max_gap):
+            values = self._transact(slave_addr,
+                                    batch_read_transaction(request, signed))
+            results.update(batch.split_results(request, values))
 
-        return operation_status
+        return results
@@ -103,6 +103,16 @@ ERROR_RESP_LEN = const(0x05)
 FIXED_RESP_LEN = const(0x08)
 #: Modbus Application Protocol High Data Response length
 MBAP_HDR_LENGTH = const(0x07)
+#: Maximum length of a Modbus RTU Application Data Unit
+RTU_ADU_MAX_LENGTH = const(256)
+#: Maximum length of a Modbus TCP Application Data Unit
+TCP_ADU_MAX_LENGTH = const(260)
+#: Amount of received Modbus TCP requests waiting to be processed
+TCP_REQUEST_QUEUE_LENGTH = const(16)
+#: Size of the receive buffer of a Modbus TCP client connection
+TCP_RX_BUFFER_LENGTH = const(1040)
+#: Maximum of response bytes a Modbus TCP client connection has not taken yet
+TCP_TX_BUFFER_LENGTH = const(1040)
 
 #: CRC16 lookup table
 CRC16_TABLE = (
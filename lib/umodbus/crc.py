@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+"""
+Modbus CRC16 engine
+
+The CRC can be updated incrementally over any buffer, e.g. a memoryview of a
+receive buffer, as bytes arrive. Running the CRC over a complete frame
+including its appended CRC yields zero for a valid frame, so a received
+frame can be validated without slicing off the checksum.
+
+A native viper implementation is used if the port supports it, otherwise a
+pure Python fallback based on :py:data:`umodbus.const.CRC16_TABLE`.
+"""
+
+# system packages
+import struct
+
+# custom packages
+from . import const as Const
+
+# typing not natively supported on MicroPython
+from .typing import Optional, Union
+
+#: Initial value of a Modbus CRC16
+CRC16_INIT = 0xFFFF
+
+
+def _crc16_update(crc: int, data, start: int, end: int) -> int:
+    """
+    Update a Modbus CRC16 with a range of bytes
+
+    :param      crc:    The current CRC value
+    :type       crc:    int
+    :param      data:   The data
+    :type       data:   Union[bytes, bytearray, memoryview]
+    :param      start:  Index of the first byte
+    :type       start:  int
+    :param      end:    Index after the last byte
+    :type       end:    int
+
+    :returns:   The updated CRC value
+    :rtype:     int
+    """
+    # the lookup table beats bit shifting in bytecode
+    table = Const.CRC16_TABLE
+    for idx in range(start, end):
+        crc = (crc >> 8) ^ table[(crc ^ data[idx]) & 0xFF]
+    return crc
+
+
+try:
+    from .crc_viper import crc16_update
+    # a stand-in micropython module on CPython lacks viper or fails once
+    # called
+    crc16_update(CRC16_INIT, b'\x00', 0, 1)
+except (AttributeError, ImportError, NameError, SyntaxError, TypeError):
+    # no native emitter on this port or not running on MicroPython
+    crc16_update = _crc16_update
+
+
+def crc16(data: Union[bytes, bytearray, memoryview],
+          start: int = 0,
+          end: Optional[int] = None) -> int:
+    """
+    Calculate the Modbus CRC16 of a range of bytes
+
+    :param      data:   The data
+    :type       data:   Union[bytes, bytearray, memoryview]
+    :param      start:  Index of the first byte
+    :type       start:  int
+    :param      end:    Index after the last byte, default end of data
+    :type       end:    Optional[int]
+
+    :returns:   The CRC value
+    :rtype:     int
+    """
+    if end is None:
+        end = len(data)
+    return crc16_update(CRC16_INIT, data, start, end)
+
+
+class CRC16(object):
+    """Incremental Modbus CRC16"""
+    def __init__(self) -> None:
+        self.crc = CRC16_INIT
+
+    def reset(self) -> None:
+        """Restart the calculation for a new frame"""
+        self.crc = CRC16_INIT
+
+    def update(self,
+               data: Union[bytes, bytearray, memoryview],
+               start: int = 0,
+               end: Optional[int] = None) -> int:
+        """
+        Add a range of bytes to the calculation
+
+        :param      data:   The data
+        :type       data:   Union[bytes, bytearray, memoryview]
+        :param      start:  Index of the first byte
+        :type       start:  int
+        :param      end:    Index after the last byte, default end of data
+        :type       end:    Optional[int]
+
+        :returns:   The current CRC value
+        :rtype:     int
+        """
+        if end is None:
+            end = len(data)
+        self.crc = crc16_update(self.crc, data, start, end)
+        return self.crc
+
+    @property
+    def valid(self) -> bool:
+        """
+        Get the frame state, if the CRC of the frame has been added as well
+
+        :returns:   True if the data so far ends with its own valid CRC
+        :rtype:     bool
+        """
+        return self.crc == 0
+
+    def pack_into(self, buf: bytearray, offset: int) -> None:
+        """
+        Write the current CRC value in Modbus byte order into a buffer
+
+        :param      buf:     The buffer
+        :type       buf:     bytearray
+        :param      offset:  The offset of the first CRC byte
+        :type       offset:  int
+        """
+        struct.pack_into('<H', buf, offset, self.crc)
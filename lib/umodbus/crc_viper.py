@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+"""
+Native CRC16 implementation
+
+Kept in its own module as ports without a native emitter refuse to compile
+any module containing a viper function. Use :py:mod:`umodbus.crc` instead
+of importing this module directly.
+"""
+
+# system packages
+import micropython
+
+
+@micropython.viper
+def crc16_update(crc: int, data, start: int, end: int) -> int:
+    """
+    Update a Modbus CRC16 with a range of bytes, table free
+
+    :param      crc:    The current CRC value
+    :type       crc:    int
+    :param      data:   The data
+    :type       data:   Union[bytes, bytearray, memoryview]
+    :param      start:  Index of the first byte
+    :type       start:  int
+    :param      end:    Index after the last byte
+    :type       end:    int
+
+    :returns:   The updated CRC value
+    :rtype:     int
+    """
+    buf = ptr8(data)     # noqa: F821
+    value = uint(crc)    # noqa: F821
+    idx = start
+    while idx < end:
+        value ^= buf[idx]
+        bit = 0
+        while bit < 8:
+            if value & 1:
+                value = (value >> 1) ^ 0xA001
+            else:
+                value = value >> 1
+            bit += 1
+        idx += 1
+    return int(value)
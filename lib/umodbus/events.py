@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+"""
+Change events of registers written by a remote device
+
+Every write request results in one event covering the written range. The
+events are kept in a bounded :py:class:`ChangeQueue`, subscriptions to an
+address range are notified by callback or wake a waiting coroutine.
+"""
+
+# system packages
+try:
+    import uasyncio as asyncio
+except ImportError:
+    import asyncio
+from collections import deque
+import time
+
+# typing not natively supported on MicroPython
+from .typing import Callable, List, Optional, Union
+
+
+class Subscription(object):
+    """
+    Subscription to changes of an address range
+
+    :param      reg_type:  The register type, 'COILS' or 'HREGS'
+    :type       reg_type:  str
+    :param      address:   The first address of the range
+    :type       address:   int
+    :param      quantity:  The amount of addresses
+    :type       quantity:  int
+    :param      callback:  Function called on every change, with the same
+                           arguments as an ``on_set_cb``
+    :type       callback:  Optional[Callable[[str, int, list], None]]
+    :param      maxlen:    Amount of events kept until fetched
+    :type       maxlen:    int
+    """
+    def __init__(self,
+                 reg_type: str,
+                 address: int,
+                 quantity: int = 1,
+                 callback: Optional[Callable[[str, int, list], None]] = None,
+                 maxlen: int = 8) -> None:
+        self.reg_type = reg_type
+        self.address = address
+        self.quantity = quantity
+        self.callback = callback
+        self._events = deque((), maxlen)
+        self._flag = asyncio.Event()
+
+    def matches(self, reg_type: str, address: int, quantity: int) -> bool:
+        """
+        Check whether a range overlaps the subscribed range
+
+        :param      reg_type:  The register type
+        :type       reg_type:  str
+        :param      address:   The first address of the range
+        :type       address:   int
+        :param      quantity:  The amount of addresses
+        :type       quantity:  int
+
+        :returns:   True if the ranges overlap, False otherwise
+        :rtype:     bool
+        """
+        return (self.reg_type == reg_type and
+                address < self.address + self.quantity and
+                self.address < address + quantity)
+
+    def notify(self, event: list) -> None:
+        """
+        Pass an event to the subscriber
+
+        :param      event:  The event as [reg_type, address, values, time]
+        :type       event:  list
+        """
+        self._events.append(event)
+        self._flag.set()
+
+        if self.callback is not None:
+            self.callback(reg_type=event[0], address=event[1], val=event[2])
+
+    @property
+    def pending(self) -> int:
+        """
+        Get the amount of events not fetched yet
+
+        :returns:   Amount of events
+        :rtype:     int
+        """
+        return len(self._events)
+
+    def get(self) -> Optional[list]:
+        """
+        Get the oldest event not fetched yet
+
+        :returns:   The event as [reg_type, address, values, time], None if
+                    there is none
+        :rtype:     Optional[list]
+        """
+        if not len(self._events):
+            self._flag.clear()
+            return None
+
+        event = self._events.popleft()
+        if not len(self._events):
+            self._flag.clear()
+        return event
+
+    async def wait(self) -> list:
+        """
+        Wait for the next event
+
+        :returns:   The event as [reg_type, address, values, time]
+        :rtype:     list
+        """
+        while not len(self._events):
+            await self._flag.wait()
+            if not len(self._events):
+                self._flag.clear()
+
+        return self.get()
+
+
+class ChangeQueue(object):
+    """
+    Bounded queue of change events
+
+    An event is a list of [reg_type, address, values, time], with time in
+    milliseconds. If the queue is full the oldest event is dropped.
+
+    :param      maxlen:  Maximum amount of events
+    :type       maxlen:  int
+    """
+    def __init__(self, maxlen: int = 32) -> None:
+        self._maxlen = maxlen
+        self._events = []
+        self._subscriptions = []
+        #: Amount of events dropped since the queue has been created
+        self.dropped = 0
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    @property
+    def events(self) -> List[list]:
+        """
+        Get all queued events, oldest first
+
+        :returns:   The events
+        :rtype:     List[list]
+        """
+        return self._events
+
+    def append(self,
+               reg_type: str,
+               address: int,
+               values: Union[bool, int, List[bool], List[int]]) -> None:
+        """
+        Queue the change of a range and notify its subscribers
+
+        :param      reg_type:  The register type
+        :type       reg_type:  str
+        :param      address:   The first address of the range
+        :type       address:   int
+        :param      values:    The new value or values of the range
+        :type       values:    Union[bool, int, List[bool], List[int]]
+        """
+        if not isinstance(values, list):
+            values = list(values) if isinstance(values, tuple) else [values]
+
+        event = [reg_type, address, values, time.ticks_ms()]
+
+        if len(self._events) >= self._maxlen:
+            self._events.pop(0)
+            self.dropped += 1
+        self._events.append(event)
+
+        for subscription in self._subscriptions:
+            if subscription.matches(reg_type, address, len(values)):
+                subscription.notify(event)
+
+    def get(self) -> Optional[list]:
+        """
+        Get and remove the oldest event
+
+        :returns:   The event, None if the queue is empty
+        :rtype:     Optional[list]
+        """
+        if not self._events:
+            return None
+        return self._events.pop(0)
+
+    def clear(self) -> None:
+        """Remove all queued events"""
+        self._events = []
+
+    def remove(self, reg_type: str, address: int, timestamp: int) -> bool:
+        """
+        Remove a single address from the events of all changes up to a time
+
+        Older changes of the address are handled along with the given one,
+        so they do not show up in :py:meth:`latest` again. A later change
+        stays queued.
+
+        :param      reg_type:   The register type
+        :type       reg_type:   str
+        :param      address:    The address
+        :type       address:    int
+        :param      timestamp:  The time of the change in milliseconds
+        :type       timestamp:  int
+
+        :returns:   True if the address has been removed, False otherwise
+        :rtype:     bool
+        """
+        removed = False
+        for event in list(self._events):
+            offset = address - event[1]
+            if (event[0] == reg_type and
+                    time.ticks_diff(event[3], timestamp) <= 0 and
+                    0 <= offset < len(event[2]) and
+                    event[2][offset] is not None):
+                # keep the record, mark the address as handled
+                event[2][offset] = None
+                if all(val is None for val in event[2]):
+                    self._events.remove(event)
+                removed = True
+
+        return removed
+
+    def latest(self, reg_type: str) -> dict:
+        """
+        Get the latest queued change per address
+
+        :param      reg_type:  The register type
+        :type       reg_type:  str
+
+        :returns:   Dictionary of address and {'val': value, 'time': time}
+        :rtype:     dict
+        """
+        result = dict()
+        for event in self._events:
+            if event[0] != reg_type:
+                continue
+            for offset, val in enumerate(event[2]):
+                if val is not None:
+                    result[event[1] + offset] = {'val': val, 'time': event[3]}
+        return result
+
+    def subscribe(self,
+                  reg_type: str,
+                  address: int,
+                  quantity: int = 1,
+                  callback: Optional[Callable[[str, int, list], None]] = None
+                  ) -> Subscription:
+        """
+        Subscribe to changes of an address range
+
+        :param      reg_type:  The register type, 'COILS' or 'HREGS'
+        :type       reg_type:  str
+        :param      address:   The first address of the range
+        :type       address:   int
+        :param      quantity:  The amount of addresses
+        :type       quantity:  int
+        :param      callback:  Function called on every change, with the
+                               same arguments as an ``on_set_cb``
+        :type       callback:  Optional[Callable[[str, int, list], None]]
+
+        :returns:   The subscription
+        :rtype:     Subscription
+        """
+        subscription = Subscription(reg_type=reg_type,
+                                    address=address,
+                                    quantity=quantity,
+                                    callback=callback)
+        self._subscriptions.append(subscription)
+
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """
+        Cancel a subscription
+
+        :param      subscription:  The subscription
+        :type       subscription:  Subscription
+        """
+        if subscription in self._subscriptions:
+            self._subscriptions.remove(subscription)
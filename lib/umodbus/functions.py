@@ -167,29 +167,14 @@ def write_multiple_coils(starting_address: int,
     if not (1 <= len(value_list) <= 0x07B0):
         raise ValueError('Invalid quantity of outputs')
 
-    sectioned_list = [value_list[i:i + 8] for i in range(0, len(value_list), 8)]    # noqa: E501
-
-    output_value = []
-    for index, byte in enumerate(sectioned_list):
-        # see https://github.com/brainelectronics/micropython-modbus/issues/22
-        # output = sum(v << i for i, v in enumerate(byte))
-        output = 0
-        for bit in byte:
-            output = (output << 1) | bit
-        output_value.append(output)
-
-    fmt = 'B' * len(output_value)
     quantity = len(value_list)
-    byte_count = quantity // 8
-    if quantity % 8:
-        byte_count += 1
+    packed = pack_bits(value_list)
 
-    return struct.pack('>BHHB' + fmt,
+    return struct.pack('>BHHB',
                        Const.WRITE_MULTIPLE_COILS,
                        starting_address,
                        quantity,
-                       byte_count,
-                       *output_value)
+                       len(packed)) + packed
 
 
 def write_multiple_registers(starting_address: int,
@@ -223,6 +208,47 @@ def write_multiple_registers(starting_address: int,
                        *register_values)
 
 
+def read_write_multiple_registers(read_address: int,
+                                  read_qty: int,
+                                  write_address: int,
+                                  register_values: List[int],
+                                  signed: bool = True) -> bytes:
+    """
+    Create Modbus message to update and read multiple registers
+
+    :param      read_address:     The starting address to read from
+    :type       read_address:     int
+    :param      read_qty:         Quantity of registers to read
+    :type       read_qty:         int
+    :param      write_address:    The starting address to write to
+    :type       write_address:    int
+    :param      register_values:  The list of output values
+    :type       register_values:  List[int]
+    :param      signed:           Flag whether data is signed or not
+    :type       signed:           bool
+
+    :returns:   Packed Modbus message
+    :rtype:     bytes
+    """
+    if not (1 <= read_qty <= 125):
+        raise ValueError('Invalid number of registers to read')
+
+    if not (1 <= len(register_values) <= 121):
+        raise ValueError('Invalid number of registers to write')
+
+    quantity = len(register_values)
+    fmt = ('h' if signed else 'H') * quantity
+
+    return struct.pack('>BHHHHB' + fmt,
+                       Const.READ_WRITE_MULTIPLE_REGISTERS,
+                       read_address,
+                       read_qty,
+                       write_address,
+                       quantity,
+                       quantity * 2,
+                       *register_values)
+
+
 def validate_resp_data(data: bytes,
                        function_code: int,
                        address: int,
@@ -301,23 +327,8 @@ def response(function_code: int,
     :rtype:     bytes
     """
     if function_code in [Const.READ_COILS, Const.READ_DISCRETE_INPUTS]:
-        sectioned_list = [value_list[i:i + 8] for i in range(0, len(value_list), 8)]    # noqa: E501
-
-        output_value = []
-        for index, byte in enumerate(sectioned_list):
-            # see https://github.com/brainelectronics/micropython-modbus/issues/22
-            # output = sum(v << i for i, v in enumerate(byte))
-            # see https://github.com/brainelectronics/micropython-modbus/issues/38
-            output = 0
-            for bit in byte:
-                output = (output << 1) | bit
-            output_value.append(output)
-
-        fmt = 'B' * len(output_value)
-        return struct.pack('>BB' + fmt,
-                           function_code,
-                           ((len(value_list) - 1) // 8) + 1,
-                           *output_value)
+        packed = pack_bits(value_list)
+        return struct.pack('>BB', function_code, len(packed)) + packed
 
     elif function_code in [Const.READ_HOLDING_REGISTERS,
                            Const.READ_INPUT_REGISTER]:
@@ -352,6 +363,47 @@ def response(function_code: int,
                            request_register_addr,
                            request_register_qty)
 
+    elif function_code == Const.MASK_WRITE_REGISTER:
+        return struct.pack('>BHBBBB',
+                           function_code,
+                           request_register_addr,
+                           *request_data)
+
+
+def read_response_into(buf: bytearray,
+                       offset: int,
+                       function_code: int,
+                       bank,
+                       register_addr: int,
+                       quantity: int) -> int:
+    """
+    Construct a read response Protocol Data Unit in place
+
+    Writes function code, byte count and the packed register values straight
+    from a register bank into a preallocated buffer, without creating any
+    intermediate value list.
+
+    :param      buf:            The buffer
+    :type       buf:            bytearray
+    :param      offset:         The offset of the PDU in the buffer
+    :type       offset:         int
+    :param      function_code:  The function code
+    :type       function_code:  int
+    :param      bank:           The register bank to read from
+    :type       bank:           umodbus.registers.RegisterBank
+    :param      register_addr:  The address of the first register
+    :type       register_addr:  int
+    :param      quantity:       The amount of registers
+    :type       quantity:       int
+
+    :returns:   Length of the Protocol Data Unit
+    :rtype:     int
+    """
+    byte_count = bank.pack_into(buf, offset + 2, register_addr, quantity)
+    struct.pack_into('>BB', buf, offset, function_code, byte_count)
+
+    return byte_count + 2
+
 
 def exception_response(function_code: int, exception_code: int) -> bytes:
     """
@@ -368,6 +420,63 @@ def exception_response(function_code: int, exception_code: int) -> bytes:
     return struct.pack('>BB', Const.ERROR_BIAS + function_code, exception_code)
 
 
+def pack_bits(value_list: List[Union[int, bool]]) -> bytearray:
+    """
+    Pack a list of bits into bytes
+
+    Each group of eight values is packed with its first value as most
+    significant bit, a last group of less than eight values ends at the
+    least significant bit. :py:func:`bytes_to_bool` reverses this.
+
+    :param      value_list:  The bit values
+    :type       value_list:  List[Union[int, bool]]
+
+    :returns:   The packed bits
+    :rtype:     bytearray
+    """
+    # see https://github.com/brainelectronics/micropython-modbus/issues/22
+    # see https://github.com/brainelectronics/micropython-modbus/issues/38
+    quantity = len(value_list)
+    packed = bytearray((quantity + 7) >> 3)
+    full = quantity & ~7
+
+    for idx in range(0, full, 8):
+        v = value_list[idx:idx + 8]
+        packed[idx >> 3] = ((v[0] and 0x80) | (v[1] and 0x40) |
+                            (v[2] and 0x20) | (v[3] and 0x10) |
+                            (v[4] and 0x08) | (v[5] and 0x04) |
+                            (v[6] and 0x02) | (v[7] and 0x01))
+
+    if full < quantity:
+        output = 0
+        for idx in range(full, quantity):
+            output = (output << 1) | (1 if value_list[idx] else 0)
+        packed[full >> 3] = output
+
+    return packed
+
+
+def packed_bit(byte_list: bytes, index: int, bit_qty: int) -> bool:
+    """
+    Get a single bit of packed bits without unpacking all of them
+
+    :param      byte_list:  The packed bits, e.g. a read coils response
+    :type       byte_list:  bytes
+    :param      index:      The index of the bit
+    :type       index:      int
+    :param      bit_qty:    Amount of packed bits
+    :type       bit_qty:    int
+
+    :returns:   The bit value
+    :rtype:     bool
+    """
+    byte_idx = index >> 3
+    # the bits of a shorter last group end at the least significant bit
+    group_qty = min(8, bit_qty - (byte_idx << 3))
+
+    return bool((byte_list[byte_idx] >> (group_qty - 1 - (index & 7))) & 1)
+
+
 def bytes_to_bool(byte_list: bytes, bit_qty: Optional[int] = 1) -> List[bool]:
     """
     Convert bytes to list of boolean values
@@ -382,16 +491,17 @@ def bytes_to_bool(byte_list: bytes, bit_qty: Optional[int] = 1) -> List[bool]:
     """
     bool_list = []
 
-    for index, byte in enumerate(byte_list):
-        this_qty = bit_qty
-
-        if this_qty >= 8:
-            this_qty = 8
-
-        # evil hack for missing keyword support in MicroPython format()
-        fmt = '{:0' + str(this_qty) + 'b}'
-
-        bool_list.extend([bool(int(x)) for x in fmt.format(byte)])
+    for byte in byte_list:
+        # each byte yields at least the bits up to its highest set one, as
+        # formatting it as binary string of bit_qty digits did
+        width = 1
+        while byte >> width:
+            width += 1
+        if bit_qty > width:
+            width = 8 if bit_qty >= 8 else bit_qty
+
+        for shift in range(width - 1, -1, -1):
+            bool_list.append(bool((byte >> shift) & 1))
 
         bit_qty -= 8
 
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+"""
+Modbus TCP to RTU gateway
+
+Requests of the TCP clients are forwarded by unit ID to the slaves on the
+serial line, one transaction at a time, and the slave responses are
+returned to the requesting client. The request PDUs are forwarded as
+received, so function codes the server does not decode pass through too.
+"""
+
+# system packages
+import struct
+import time
+
+# custom packages
+from . import const as Const
+from .common import Request
+from .tcp import TCPServer
+
+# typing not natively supported on MicroPython
+from .typing import List, Optional
+
+#: Function codes of which the responses may be cached
+CACHEABLE_FUNCTIONS = (
+    Const.READ_COILS,
+    Const.READ_DISCRETE_INPUTS,
+    Const.READ_HOLDING_REGISTERS,
+    Const.READ_INPUT_REGISTER,
+)
+
+#: PDU length of the cacheable reads, function code, address and quantity
+CACHEABLE_PDU_LENGTH = 5
+
+
+class RawRequest(Request):
+    """
+    Request forwarded as received
+
+    Only unit ID, function code and, if present, the register address are
+    decoded, any PDU of at least the function code is accepted.
+
+    :param      interface:  The interface the request has been received by
+    :type       interface:  TCPConnection
+    :param      data:       Unit ID and PDU of at least the function code
+    :type       data:       bytearray
+    """
+    def __init__(self, interface, data: bytearray) -> None:
+        self._itf = interface
+        self._raw = data
+        self.unit_addr = data[0]
+        self.function = data[1]
+        if len(data) >= 4:
+            self.register_addr = struct.unpack_from('>H', data, 2)[0]
+        else:
+            self.register_addr = None
+        self.quantity = None
+        self.data = data[2:]
+
+
+class ModbusTCPGateway(object):
+    """
+    Modbus TCP server forwarding requests to Modbus RTU slaves
+
+    :param      serial:          The serial host of the RTU line
+    :type       serial:          umodbus.serial.Serial
+    :param      unit_addr_list:  Unit IDs of the slaves on the line, None for
+                                 all valid slave addresses 1 to 247
+    :type       unit_addr_list:  Optional[List[int]]
+    :param      cache_ttl:       Time in milliseconds read responses are
+                                 answered from the cache, None to disable
+    :type       cache_ttl:       Optional[int]
+    :param      cache_size:      Maximum amount of cached read responses
+    :type       cache_size:      int
+    """
+    def __init__(self,
+                 serial,
+                 unit_addr_list: Optional[List[int]] = None,
+                 cache_ttl: Optional[int] = None,
+                 cache_size: int = 32) -> None:
+        self._itf = TCPServer(request_class=RawRequest)
+        self._serial = serial
+        self._unit_addr_list = unit_addr_list
+        self._cache_ttl = cache_ttl
+        self._cache_size = cache_size
+        # (unit ID, request PDU) -> (response PDU, time of response)
+        self._cache = dict()
+
+    def bind(self,
+             local_ip: str,
+             local_port: int = 502,
+             max_connections: int = 10,
+             idle_timeout: Optional[int] = None) -> None:
+        """
+        Bind IP and port for incomming requests
+
+        :param      local_ip:         IP of this device listening for requests
+        :type       local_ip:         str
+        :param      local_port:       Port of this device
+        :type       local_port:       int
+        :param      max_connections:  Number of maximum connections
+        :type       max_connections:  int
+        :param      idle_timeout:     Time in milliseconds after which a
+                                      client without requests is closed,
+                                      None to keep clients connected
+        :type       idle_timeout:     Optional[int]
+        """
+        self._itf.bind(local_ip, local_port, max_connections, idle_timeout)
+
+    def get_bound_status(self) -> bool:
+        """
+        Get the IP and port binding status.
+
+        :returns:   The bound status, True if already bound, False otherwise.
+        :rtype:     bool
+        """
+        try:
+            return self._itf.get_is_bound()
+        except Exception:
+            return False
+
+    def clear_cache(self) -> None:
+        """Drop all cached read responses"""
+        self._cache = dict()
+
+    def process(self) -> bool:
+        """
+        Forward the requests received from the TCP clients.
+
+        Requests of all clients are queued by the TCP server and forwarded
+        in order of arrival, see :py:meth:`umodbus.modbus.Modbus.process`.
+
+        :returns:   Result of processing, True on success, False otherwise
+        :rtype:     bool
+        """
+        request = self._itf.get_request(unit_addr_list=None, timeout=0)
+        if request is None:
+            return False
+
+        while request is not None:
+            self._forward(request=request)
+
+            if not self._itf.pending:
+                break
+            request = self._itf.get_request(unit_addr_list=None, timeout=0)
+
+        return True
+
+    def _forward(self, request: RawRequest) -> None:
+        """
+        Forward a request to its slave and send back the response
+
+        :param      request:  The request
+        :type       request:  RawRequest
+        """
+        unit_addr = request.unit_addr
+        if self._unit_addr_list is None:
+            reachable = 1 <= unit_addr <= 247
+        else:
+            reachable = unit_addr in self._unit_addr_list
+        if not reachable:
+            request.send_exception(Const.GATEWAY_PATH_UNAVAILABLE)
+            return
+
+        pdu = bytes(request.pdu)
+        # a malformed read is forwarded for the slave to answer, not cached
+        cacheable = (self._cache_ttl is not None and
+                     request.function in CACHEABLE_FUNCTIONS and
+                     len(pdu) == CACHEABLE_PDU_LENGTH)
+        now = time.ticks_ms()
+
+        if cacheable:
+            cached = self._cache.get((unit_addr, pdu), None)
+            if (cached is not None and
+                    time.ticks_diff(now, cached[1]) < self._cache_ttl):
+                request.send_pdu(cached[0])
+                return
+
+        try:
+            response = self._serial.forward_pdu(modbus_pdu=pdu,
+                                                slave_addr=unit_addr)
+        except OSError:
+            request.send_exception(Const.DEVICE_FAILED_TO_RESPOND)
+            return
+
+        if request.function not in CACHEABLE_FUNCTIONS:
+            # a write may change what the cached reads of this slave return
+            self._invalidate(unit_addr)
+        elif cacheable and not response[0] & Const.ERROR_BIAS:
+            self._store(unit_addr, pdu, response, now)
+
+        request.send_pdu(response)
+
+    def _store(self, unit_addr: int, pdu: bytes, response: bytes,
+               now: int) -> None:
+        if len(self._cache) >= self._cache_size:
+            # drop the oldest response
+            oldest = None
+            for key, value in self._cache.items():
+                if (oldest is None or
+                        time.ticks_diff(self._cache[oldest][1], value[1]) > 0):
+                    oldest = key
+            del self._cache[oldest]
+
+        self._cache[(unit_addr, pdu)] = (response, now)
+
+    def _invalidate(self, unit_addr: int) -> None:
+        for key in [key for key in self._cache if key[0] == unit_addr]:
+            del self._cache[key]
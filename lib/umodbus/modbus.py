@@ -12,16 +12,15 @@ This class is inherited by the Modbus client implementations
 :py:class:`umodbus.serial.ModbusRTU` and :py:class:`umodbus.tcp.ModbusTCP`
 """
 
-# system packages
-import time
-
 # custom packages
 from . import functions
 from . import const as Const
 from .common import Request
+from .events import ChangeQueue, Subscription
+from .registers import BitBank, CallbackIndex, WordBank
 
 # typing not natively supported on MicroPython
-from .typing import Callable, dict_keys, List, Optional, Union
+from .typing import Callable, List, Optional, Union
 
 
 class Modbus(object):
@@ -30,145 +29,276 @@ class Modbus(object):
 
     :param      itf:        Abstraction interface
     :type       itf:        Callable
-    :param      addr_list:  List of addresses
-    :type       addr_list:  List[int]
+    :param      addr_list:    List of addresses
+    :type       addr_list:    List[int]
+    :param      max_changes:  Maximum amount of queued change events
+    :type       max_changes:  int
     """
-    def __init__(self, itf, addr_list: List[int]) -> None:
+    def __init__(self,
+                 itf,
+                 addr_list: List[int],
+                 max_changes: int = 32) -> None:
         self._itf = itf
         self._addr_list = addr_list
 
         # modbus register types with their default value
         self._available_register_types = ['COILS', 'HREGS', 'IREGS', 'ISTS']
-        self._register_dict = dict()
+        self._register_dict = {
+            'COILS': BitBank(),
+            'HREGS': WordBank(),
+            'IREGS': WordBank(),
+            'ISTS': BitBank(),
+        }
+        # interval index of register ranges with callbacks, per register type
+        self._register_cbs = dict()
         for reg_type in self._available_register_types:
-            self._register_dict[reg_type] = dict()
+            self._register_cbs[reg_type] = CallbackIndex()
         self._default_vals = dict(zip(self._available_register_types,
                                       [False, 0, 0, False]))
 
         # registers which can be set by remote device
         self._changeable_register_types = ['COILS', 'HREGS']
-        self._changed_registers = dict()
-        for reg_type in self._changeable_register_types:
-            self._changed_registers[reg_type] = dict()
+        # one event per remote write, oldest dropped if full
+        self._changes = ChangeQueue(maxlen=max_changes)
+
+        # function code dispatch table, function code -> handler(request)
+        self._handlers = dict()
+        self._setup_handlers()
 
     def process(self) -> bool:
         """
         Process the Modbus requests.
 
+        The handler of the requested function code is looked up in the
+        function code dispatch table, see :py:meth:`set_handler`. All
+        requests already received by the interface, e.g. several pipelined
+        requests of a TCP client, are processed in order.
+
         :returns:   Result of processing, True on success, False otherwise
         :rtype:     bool
         """
-        reg_type = None
-        req_type = None
-
         request = self._itf.get_request(unit_addr_list=self._addr_list,
                                         timeout=0)
         if request is None:
             return False
 
-        if request.function == Const.READ_COILS:
-            # Coils (setter+getter) [0, 1]
-            # function 01 - read single register
-            reg_type = 'COILS'
-            req_type = 'READ'
-        elif request.function == Const.READ_DISCRETE_INPUTS:
-            # Ists (only getter) [0, 1]
-            # function 02 - read input status (discrete inputs/digital input)
-            reg_type = 'ISTS'
-            req_type = 'READ'
-        elif request.function == Const.READ_HOLDING_REGISTERS:
-            # Hregs (setter+getter) [0, 65535]
-            # function 03 - read holding register
-            reg_type = 'HREGS'
-            req_type = 'READ'
-        elif request.function == Const.READ_INPUT_REGISTER:
-            # Iregs (only getter) [0, 65535]
-            # function 04 - read input registers
-            reg_type = 'IREGS'
-            req_type = 'READ'
-        elif (request.function == Const.WRITE_SINGLE_COIL or
-                request.function == Const.WRITE_MULTIPLE_COILS):
-            # Coils (setter+getter) [0, 1]
-            # function 05 - write single coil
-            # function 15 - write multiple coil
-            reg_type = 'COILS'
-            req_type = 'WRITE'
-        elif (request.function == Const.WRITE_SINGLE_REGISTER or
-                request.function == Const.WRITE_MULTIPLE_REGISTERS):
-            # Hregs (setter+getter) [0, 65535]
-            # function 06 - write holding register
-            # function 16 - write multiple holding register
-            reg_type = 'HREGS'
-            req_type = 'WRITE'
-        else:
-            request.send_exception(Const.ILLEGAL_FUNCTION)
+        while request is not None:
+            self._process_request(request=request)
 
-        if reg_type:
-            if req_type == 'READ':
-                self._process_read_access(request=request, reg_type=reg_type)
-            elif req_type == 'WRITE':
-                self._process_write_access(request=request, reg_type=reg_type)
+            if not self._itf.pending:
+                break
+            request = self._itf.get_request(unit_addr_list=self._addr_list,
+                                            timeout=0)
 
         return True
 
-    def _create_response(self,
-                         request: Request,
-                         reg_type: str) -> Union[List[bool], List[int]]:
+    def _process_request(self, request: Request) -> None:
+        """
+        Call the handler of the function code of a request
+
+        :param      request:  The request
+        :type       request:  Request
+        """
+        handler = self._handlers.get(request.function, None)
+        if handler is None:
+            request.send_exception(Const.ILLEGAL_FUNCTION)
+        else:
+            handler(request)
+
+    def set_handler(self,
+                    function_code: int,
+                    handler: Callable[[Request], None]) -> None:
+        """
+        Set the handler of a function code in the dispatch table.
+
+        The handler is called with the :py:class:`umodbus.common.Request`
+        and has to send either a response or an exception. Built-in handlers
+        can be replaced the same way.
+
+        :param      function_code:  The function code
+        :type       function_code:  int
+        :param      handler:        The handler
+        :type       handler:        Callable[[Request], None]
+        """
+        self._handlers[function_code] = handler
+
+    def remove_handler(self,
+                       function_code: int) -> Optional[Callable[[Request],
+                                                                None]]:
+        """
+        Remove the handler of a function code from the dispatch table.
+
+        Requests with this function code are answered with an illegal
+        function exception afterwards.
+
+        :param      function_code:  The function code
+        :type       function_code:  int
+
+        :returns:   The removed handler, None if there was none
+        :rtype:     Optional[Callable[[Request], None]]
+        """
+        return self._handlers.pop(function_code, None)
+
+    def _setup_handlers(self) -> None:
+        """Register the built-in function code handlers"""
+        # Coils (setter+getter) [0, 1]
+        # function 01 - read single register
+        self.set_handler(Const.READ_COILS, self._read_coils)
+        # Ists (only getter) [0, 1]
+        # function 02 - read input status (discrete inputs/digital input)
+        self.set_handler(Const.READ_DISCRETE_INPUTS, self._read_ists)
+        # Hregs (setter+getter) [0, 65535]
+        # function 03 - read holding register
+        self.set_handler(Const.READ_HOLDING_REGISTERS, self._read_hregs)
+        # Iregs (only getter) [0, 65535]
+        # function 04 - read input registers
+        self.set_handler(Const.READ_INPUT_REGISTER, self._read_iregs)
+        # function 05 - write single coil
+        # function 15 - write multiple coil
+        self.set_handler(Const.WRITE_SINGLE_COIL, self._write_coils)
+        self.set_handler(Const.WRITE_MULTIPLE_COILS, self._write_coils)
+        # function 06 - write holding register
+        # function 16 - write multiple holding register
+        self.set_handler(Const.WRITE_SINGLE_REGISTER, self._write_hregs)
+        self.set_handler(Const.WRITE_MULTIPLE_REGISTERS, self._write_hregs)
+        # function 22 - mask write holding register
+        self.set_handler(Const.MASK_WRITE_REGISTER, self._mask_write_hreg)
+        # function 23 - read/write multiple holding registers
+        self.set_handler(Const.READ_WRITE_MULTIPLE_REGISTERS,
+                         self._read_write_hregs)
+
+    def _read_coils(self, request: Request) -> None:
+        self._process_read_access(request=request, reg_type='COILS')
+
+    def _read_ists(self, request: Request) -> None:
+        self._process_read_access(request=request, reg_type='ISTS')
+
+    def _read_hregs(self, request: Request) -> None:
+        self._process_read_access(request=request, reg_type='HREGS')
+
+    def _read_iregs(self, request: Request) -> None:
+        self._process_read_access(request=request, reg_type='IREGS')
+
+    def _write_coils(self, request: Request) -> None:
+        self._process_write_access(request=request, reg_type='COILS')
+
+    def _write_hregs(self, request: Request) -> None:
+        self._process_write_access(request=request, reg_type='HREGS')
+
+    def _mask_write_hreg(self, request: Request) -> None:
         """
-        Create a response.
+        Process a mask write access to a holding register
+
+        The new value is ``(current AND and_mask) OR (or_mask AND NOT
+        and_mask)``, see chapter 6.16 of the Modbus application protocol.
 
         :param      request:   The request
         :type       request:   Request
+        """
+        address = request.register_addr
+        bank = self._register_dict['HREGS']
+
+        if address not in bank:
+            request.send_exception(Const.ILLEGAL_DATA_ADDRESS)
+            return
+
+        and_mask, or_mask = functions.to_short(byte_array=request.data,
+                                               signed=False)
+        val = (bank.get(address) & and_mask) | (or_mask & ~and_mask & 0xFFFF)
+        self.set_hreg(address=address, value=val)
+
+        request.send_response()
+        self._set_changed_register(reg_type='HREGS',
+                                   address=address,
+                                   value=val)
+        self._call_set_cbs(reg_type='HREGS', address=address, val=[val])
+
+    def _read_write_hregs(self, request: Request) -> None:
+        """
+        Process a combined write and read access to holding registers
+
+        The write is performed before the read, so the response contains
+        the holding registers after the update.
+
+        :param      request:   The request
+        :type       request:   Request
+        """
+        bank = self._register_dict['HREGS']
+        read_address = request.register_addr
+        write_address = request.write_addr
+
+        if read_address not in bank or write_address not in bank:
+            request.send_exception(Const.ILLEGAL_DATA_ADDRESS)
+            return
+
+        val = list(functions.to_short(byte_array=request.data, signed=False))
+        self.set_hreg(address=write_address, value=val)
+        self._set_changed_register(reg_type='HREGS',
+                                   address=write_address,
+                                   value=val)
+
+        self._call_set_cbs(reg_type='HREGS', address=write_address, val=val)
+        self._call_get_cbs(reg_type='HREGS',
+                           address=read_address,
+                           quantity=request.quantity)
+
+        request.send_read_response(bank=bank)
+
+    def _call_set_cbs(self,
+                      reg_type: str,
+                      address: int,
+                      val: Union[List[bool], List[int]]) -> None:
+        """
+        Call the setter callbacks of a written range
+
+        Each callback is called once with the part of the range it covers.
+
         :param      reg_type:  The register type
         :type       reg_type:  str
-
-        :returns:   Values of this register
-        :rtype:     Union[List[bool], List[int]]
+        :param      address:   The first written address
+        :type       address:   int
+        :param      val:       The written values
+        :type       val:       Union[List[bool], List[int]]
         """
-        data = []
-        default_value = {'val': 0}
-        reg_dict = self._register_dict[reg_type]
+        spans = self._register_cbs[reg_type].spans(address=address,
+                                                   quantity=len(val),
+                                                   key='on_set_cb')
+        for _cb, first, quantity in spans:
+            offset = first - address
+            _cb(reg_type=reg_type,
+                address=first,
+                val=val[offset:offset + quantity])
 
-        if reg_type in ['COILS', 'ISTS']:
-            default_value = {'val': False}
+    def _call_get_cbs(self,
+                      reg_type: str,
+                      address: int,
+                      quantity: int) -> None:
+        """
+        Call the getter callbacks of a read range
 
-        for addr in range(request.register_addr,
-                          request.register_addr + request.quantity):
-            value = reg_dict.get(addr, default_value)['val']
+        Each callback is called once with the part of the range it covers.
+        The values are only read if there is a callback to pass them to.
 
-            if isinstance(value, (list, tuple)):
-                data.extend(value)
-            else:
-                data.append(value)
-
-        # caution LSB vs MSB
-        # [
-        #   1, 0, 1, 1, 0, 0, 1, 1,     # 0xB3
-        #   1, 1, 0, 1, 0, 1, 1, 0,     # 0xD6
-        #   1, 0, 1                     # 0x5
-        # ]
-        # but should be, documented at #38, see
-        # https://github.com/brainelectronics/micropython-modbus/issues/38
-        # this is only an issue of data provisioning as client/slave,
-        # it has thereby NOT to be fixed in
-        # :py:function:`umodbus.functions.bytes_to_bool`
-        # [
-        #   1, 1, 0, 0, 1, 1, 0, 1,     # 0xCD
-        #   0, 1, 1, 0, 1, 0, 1, 1,     # 0x6B
-        #   1, 0, 1                     # 0x5
-        # ]
-        #       27 .... 20
-        # CD    1100 1101
-        #
-        #       35 .... 28
-        # 6B    0110 1011
-        #
-        #       43 .... 36
-        # 05    0000 0101
-        #
-        # 1011 0011   1101 0110   1010 0000
-
-        return data
+        :param      reg_type:  The register type
+        :type       reg_type:  str
+        :param      address:   The first read address
+        :type       address:   int
+        :param      quantity:  The amount of read registers
+        :type       quantity:  int
+        """
+        spans = self._register_cbs[reg_type].spans(address=address,
+                                                   quantity=quantity,
+                                                   key='on_get_cb')
+        if not spans:
+            return
+
+        vals = self._register_dict[reg_type].read(address=address,
+                                                  quantity=quantity)
+        for _cb, first, count in spans:
+            offset = first - address
+            _cb(reg_type=reg_type,
+                address=first,
+                val=vals[offset:offset + count])
 
     def _process_read_access(self, request: Request, reg_type: str) -> None:
         """
@@ -182,15 +312,11 @@ class Modbus(object):
         address = request.register_addr
 
         if address in self._register_dict[reg_type]:
+            self._call_get_cbs(reg_type=reg_type,
+                               address=address,
+                               quantity=request.quantity)
 
-            if self._register_dict[reg_type][address].get('on_get_cb', 0):
-                vals = self._create_response(request=request,
-                                             reg_type=reg_type)
-                _cb = self._register_dict[reg_type][address]['on_get_cb']
-                _cb(reg_type=reg_type, address=address, val=vals)
-
-            vals = self._create_response(request=request, reg_type=reg_type)
-            request.send_response(vals)
+            request.send_read_response(bank=self._register_dict[reg_type])
         else:
             request.send_exception(Const.ILLEGAL_DATA_ADDRESS)
 
@@ -247,9 +373,7 @@ class Modbus(object):
                 self._set_changed_register(reg_type=reg_type,
                                            address=address,
                                            value=val)
-                if self._register_dict[reg_type][address].get('on_set_cb', 0):
-                    _cb = self._register_dict[reg_type][address]['on_set_cb']
-                    _cb(reg_type=reg_type, address=address, val=val)
+                self._call_set_cbs(reg_type=reg_type, address=address, val=val)
         else:
             request.send_exception(Const.ILLEGAL_DATA_ADDRESS)
 
@@ -325,12 +449,12 @@ class Modbus(object):
                                      address=address)
 
     @property
-    def coils(self) -> dict_keys:
+    def coils(self) -> List[int]:
         """
         Get the configured coils.
 
-        :returns:   The dictionary keys.
-        :rtype:     dict_keys
+        :returns:   The configured addresses.
+        :rtype:     List[int]
         """
         return self._get_regs_of_dict(reg_type='COILS')
 
@@ -396,12 +520,12 @@ class Modbus(object):
                                      address=address)
 
     @property
-    def hregs(self) -> dict_keys:
+    def hregs(self) -> List[int]:
         """
         Get the configured holding registers.
 
-        :returns:   The dictionary keys.
-        :rtype:     dict_keys
+        :returns:   The configured addresses.
+        :rtype:     List[int]
         """
         return self._get_regs_of_dict(reg_type='HREGS')
 
@@ -467,12 +591,12 @@ class Modbus(object):
                                      address=address)
 
     @property
-    def ists(self) -> dict_keys:
+    def ists(self) -> List[int]:
         """
         Get the configured discrete input registers.
 
-        :returns:   The dictionary keys.
-        :rtype:     dict_keys
+        :returns:   The configured addresses.
+        :rtype:     List[int]
         """
         return self._get_regs_of_dict(reg_type='ISTS')
 
@@ -538,12 +662,12 @@ class Modbus(object):
                                      address=address)
 
     @property
-    def iregs(self) -> dict_keys:
+    def iregs(self) -> List[int]:
         """
         Get the configured input registers.
 
-        :returns:   The dictionary keys.
-        :rtype:     dict_keys
+        :returns:   The configured addresses.
+        :rtype:     List[int]
         """
         return self._get_regs_of_dict(reg_type='IREGS')
 
@@ -558,7 +682,7 @@ class Modbus(object):
                                                               List[int]]],
                                              None] = None) -> None:
         """
-        Set the register value in the dictionary of registers.
+        Set the register value in the register bank.
 
         :param      reg_type:   The register type
         :type       reg_type:   str
@@ -583,81 +707,27 @@ class Modbus(object):
             raise KeyError('{} is not a valid register type of {}'.
                            format(reg_type, self._available_register_types))
 
+        self._register_dict[reg_type].set(address, value)
+
+        if not (callable(on_set_cb) or callable(on_get_cb)):
+            return
+
         if isinstance(value, (list, tuple)):
-            # flatten the list and add single registers only
-            for idx, val in enumerate(value):
-                this_addr = address + idx
-                self._set_single_reg_in_dict(reg_type=reg_type,
-                                             address=this_addr,
-                                             value=val,
-                                             on_set_cb=on_set_cb,
-                                             on_get_cb=on_get_cb)
+            quantity = len(value)
         else:
-            self._set_single_reg_in_dict(reg_type=reg_type,
-                                         address=address,
-                                         value=value,
+            quantity = 1
+
+        # one callback entry for the whole range
+        self._register_cbs[reg_type].add(address=address,
+                                         quantity=quantity,
                                          on_set_cb=on_set_cb,
                                          on_get_cb=on_get_cb)
 
-    def _set_single_reg_in_dict(self,
-                                reg_type: str,
-                                address: int,
-                                value: Union[bool, int],
-                                on_set_cb: Callable[
-                                    [str, int, Union[List[bool], List[int]]],
-                                    None
-                                ] = None,
-                                on_get_cb: Callable[
-                                    [str, int, Union[List[bool], List[int]]],
-                                    None
-                                ] = None) -> None:
-        """
-        Set a register value in the dictionary of registers.
-
-        :param      reg_type:   The register type
-        :type       reg_type:   str
-        :param      address:    The address (ID) of the register
-        :type       address:    int
-        :param      value:      The value of the register
-        :type       value:      Union[bool, int]
-        :param      on_set_cb:  Callback on setting the register
-        :type       on_get_cb:  Callable[
-            [str, int, Union[List[bool], List[int]]],
-            None
-            ]
-        :param      on_get_cb:  Callback on getting the register
-        :type       on_get_cb:  Callable[
-            [str, int, Union[List[bool], List[int]]],
-            None
-            ]
-        """
-        data = {'val': value}
-
-        # if the register exists already in the register dict a "set_*"
-        # function might have called this functions
-        if address in self._register_dict[reg_type]:
-            # try to get the (already) registered callback function from the
-            # register dict of this address with the this time call function
-            # parameter callback value as fallback
-            on_set_cb = self._register_dict[reg_type][address].get('on_set_cb',
-                                                                   on_set_cb)
-
-            on_get_cb = self._register_dict[reg_type][address].get('on_get_cb',
-                                                                   on_get_cb)
-
-        if callable(on_set_cb):
-            data['on_set_cb'] = on_set_cb
-
-        if callable(on_get_cb):
-            data['on_get_cb'] = on_get_cb
-
-        self._register_dict[reg_type][address] = data
-
     def _remove_reg_from_dict(self,
                               reg_type: str,
-                              address: int) -> Union[None, bool, int, List[bool], List[int]]:
+                              address: int) -> Union[None, bool, int]:
         """
-        Remove the register from the dictionary of registers.
+        Remove the register from the register bank.
 
         :param      reg_type:  The register type
         :type       reg_type:  str
@@ -665,20 +735,22 @@ class Modbus(object):
         :type       address:   int
 
         :raise      KeyError:  No register at specified address found
-        :returns:   Register value, None if register did not exist in dict
-        :rtype:     Union[None, bool, int, List[bool], List[int]]
+        :returns:   Register value, None if register did not exist in bank
+        :rtype:     Union[None, bool, int]
         """
         if not self._check_valid_register(reg_type=reg_type):
             raise KeyError('{} is not a valid register type of {}'.
                            format(reg_type, self._available_register_types))
 
-        return self._register_dict[reg_type].pop(address, None)
+        self._register_cbs[reg_type].remove(address)
+
+        return self._register_dict[reg_type].remove(address)
 
     def _get_reg_in_dict(self,
                          reg_type: str,
-                         address: int) -> Union[bool, int, List[bool], List[int]]:
+                         address: int) -> Union[bool, int]:
         """
-        Get the register value from the dictionary of registers.
+        Get the register value from the register bank.
 
         :param      reg_type:  The register type
         :type       reg_type:  str
@@ -687,19 +759,19 @@ class Modbus(object):
 
         :raise      KeyError:  No register at specified address found
         :returns:   Register value
-        :rtype:     Union[bool, int, List[bool], List[int]]
+        :rtype:     Union[bool, int]
         """
         if not self._check_valid_register(reg_type=reg_type):
             raise KeyError('{} is not a valid register type of {}'.
                            format(reg_type, self._available_register_types))
 
         if address in self._register_dict[reg_type]:
-            return self._register_dict[reg_type][address]['val']
+            return self._register_dict[reg_type].get(address)
         else:
             raise KeyError('No {} available for the register address {}'.
                            format(reg_type, address))
 
-    def _get_regs_of_dict(self, reg_type: str) -> dict_keys:
+    def _get_regs_of_dict(self, reg_type: str) -> List[int]:
         """
         Get all configured registers of specified register type.
 
@@ -708,13 +780,13 @@ class Modbus(object):
 
         :raise      KeyError:  No register at specified address found
         :returns:   The configured registers of the specified register type.
-        :rtype:     dict_keys
+        :rtype:     List[int]
         """
         if not self._check_valid_register(reg_type=reg_type):
             raise KeyError('{} is not a valid register type of {}'.
                            format(reg_type, self._available_register_types))
 
-        return self._register_dict[reg_type].keys()
+        return self._register_dict[reg_type].addresses()
 
     def _check_valid_register(self, reg_type: str) -> bool:
         """
@@ -731,15 +803,73 @@ class Modbus(object):
         else:
             return False
 
+    @property
+    def changes(self) -> ChangeQueue:
+        """
+        Get the queue of changes made by remote devices.
+
+        Each write request results in one event of the whole written range.
+
+        :returns:   The change queue.
+        :rtype:     ChangeQueue
+        """
+        return self._changes
+
+    def subscribe(self,
+                  reg_type: str,
+                  address: int,
+                  quantity: int = 1,
+                  callback: Optional[Callable[[str, int, list], None]] = None
+                  ) -> Subscription:
+        """
+        Subscribe to changes of registers made by remote devices.
+
+        Use the callback, poll the subscription or await its ``wait()`` to
+        get the change events of the range.
+
+        :param      reg_type:  The register type, 'COILS' or 'HREGS'
+        :type       reg_type:  str
+        :param      address:   The first address of the range
+        :type       address:   int
+        :param      quantity:  The amount of addresses
+        :type       quantity:  int
+        :param      callback:  Function called on every change, with the
+                               same arguments as an ``on_set_cb``
+        :type       callback:  Optional[Callable[[str, int, list], None]]
+
+        :raise      KeyError:  Register can not be changed externally
+        :returns:   The subscription
+        :rtype:     Subscription
+        """
+        if reg_type not in self._changeable_register_types:
+            raise KeyError('{} can not be changed externally'.format(reg_type))
+
+        return self._changes.subscribe(reg_type=reg_type,
+                                       address=address,
+                                       quantity=quantity,
+                                       callback=callback)
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """
+        Cancel a subscription to changes of registers.
+
+        :param      subscription:  The subscription
+        :type       subscription:  Subscription
+        """
+        self._changes.unsubscribe(subscription)
+
     @property
     def changed_registers(self) -> dict:
         """
         Get the changed registers.
 
+        Built from the queued change events, see :py:attr:`changes`.
+
         :returns:   The changed registers.
         :rtype:     dict
         """
-        return self._changed_registers
+        return {reg_type: self._changes.latest(reg_type)
+                for reg_type in self._changeable_register_types}
 
     @property
     def changed_coils(self) -> dict:
@@ -749,7 +879,7 @@ class Modbus(object):
         :returns:   The changed coil registers.
         :rtype:     dict
         """
-        return self._changed_registers['COILS']
+        return self._changes.latest('COILS')
 
     @property
     def changed_hregs(self) -> dict:
@@ -759,18 +889,18 @@ class Modbus(object):
         :returns:   The changed holding registers.
         :rtype:     dict
         """
-        return self._changed_registers['HREGS']
+        return self._changes.latest('HREGS')
 
     def _set_changed_register(self,
                               reg_type: str,
                               address: int,
                               value: Union[bool, int, List[bool], List[int]]) -> None:
         """
-        Set the register value in the dictionary of changed registers.
+        Queue the change of a register or range of registers.
 
         :param      reg_type:  The register type
         :type       reg_type:  str
-        :param      address:   The address (ID) of the register
+        :param      address:   The address (ID) of the first register
         :type       address:   int
         :param      value:     The value
         :type       value:     Union[bool, int, List[bool], List[int]]
@@ -778,13 +908,9 @@ class Modbus(object):
         :raise      KeyError:  Register can not be changed externally
         """
         if reg_type in self._changeable_register_types:
-            if isinstance(value, (list, tuple)):
-                for idx, val in enumerate(value):
-                    content = {'val': val, 'time': time.ticks_ms()}
-                    self._changed_registers[reg_type][address + idx] = content
-            else:
-                content = {'val': value, 'time': time.ticks_ms()}
-                self._changed_registers[reg_type][address] = content
+            self._changes.append(reg_type=reg_type,
+                                 address=address,
+                                 values=value)
         else:
             raise KeyError('{} can not be changed externally'.format(reg_type))
 
@@ -793,7 +919,7 @@ class Modbus(object):
                                  address: int,
                                  timestamp: int) -> bool:
         """
-        Remove the register from the dictionary of changed registers.
+        Remove the register from the changed registers.
 
         :param      reg_type:  The register type
         :type       reg_type:  str
@@ -802,24 +928,18 @@ class Modbus(object):
         :param      timestamp: The timestamp of the change in milliseconds
         :type       timestamp: int
 
-        :raise      KeyError:  No register at specified address found
-        :returns:   Result of removing register from dict
+        :raise      KeyError:  Register type can not be changed externally
+        :returns:   Result of removing register from the changes
         :rtype:     bool
         """
-        result = False
-
         if reg_type in self._changeable_register_types:
-            _changed_register_timestamp = self._changed_registers[reg_type][address]['time']
-
-            if _changed_register_timestamp == timestamp:
-                self._changed_registers[reg_type].pop(address, None)
-                result = True
+            return self._changes.remove(reg_type=reg_type,
+                                        address=address,
+                                        timestamp=timestamp)
         else:
             raise KeyError('{} is not a valid register type of {}'.
                            format(reg_type, self._changeable_register_types))
 
-        return result
-
     def setup_registers(self,
                         registers: dict = dict(),
                         use_default_vals: Optional[bool] = False) -> None:
@@ -0,0 +1,687 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+"""
+Contiguous register bank
+
+Stores the values of one Modbus register type in as few contiguous blocks as
+possible. Holding and input registers are kept in ``array('H')`` blocks,
+coils and discrete inputs in packed bit blocks. The callbacks of register
+ranges are kept in a :py:class:`CallbackIndex` per register type.
+"""
+
+# system packages
+from array import array
+
+# typing not natively supported on MicroPython
+from .typing import Callable, List, Optional, Union
+
+
+class RegisterBank(object):
+    """
+    Base class of a register bank made of sorted, non-adjacent blocks
+
+    Every address covered by a block is a configured register. Adding a
+    register next to or inside an existing block grows that block, so a
+    register map set up as ranges ends up as one block per range.
+    """
+    #: Value of an address not covered by any block
+    default = 0
+
+    def __init__(self) -> None:
+        self._bases = []
+        self._lengths = []
+        self._blocks = []
+
+    def _alloc(self, length: int):
+        raise NotImplementedError()
+
+    def _get(self, block, idx: int) -> Union[bool, int]:
+        raise NotImplementedError()
+
+    def _put(self, block, idx: int, value: Union[bool, int]) -> None:
+        raise NotImplementedError()
+
+    def _find(self, address: int) -> int:
+        """
+        Find the index of the last block starting at or before an address
+
+        :param      address:  The address
+        :type       address:  int
+
+        :returns:   Block index, -1 if all blocks start after the address
+        :rtype:     int
+        """
+        # no bisect module on MicroPython
+        lo = 0
+        hi = len(self._bases)
+        while lo < hi:
+            mid = (lo + hi) >> 1
+            if self._bases[mid] <= address:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo - 1
+
+    def _locate(self, address: int) -> int:
+        """
+        Get the index of the block covering an address
+
+        :param      address:  The address
+        :type       address:  int
+
+        :returns:   Block index, -1 if the address is not configured
+        :rtype:     int
+        """
+        idx = self._find(address)
+        if idx >= 0 and address < self._bases[idx] + self._lengths[idx]:
+            return idx
+        return -1
+
+    def __contains__(self, address: int) -> bool:
+        return self._locate(address) >= 0
+
+    def __len__(self) -> int:
+        return sum(self._lengths)
+
+    def addresses(self) -> List[int]:
+        """
+        Get all configured addresses in ascending order
+
+        :returns:   The configured addresses
+        :rtype:     List[int]
+        """
+        result = []
+        for base, length in zip(self._bases, self._lengths):
+            result.extend(range(base, base + length))
+        return result
+
+    def ranges(self) -> List[tuple]:
+        """
+        Get all configured blocks as (address, quantity) tuples
+
+        :returns:   The configured blocks
+        :rtype:     List[tuple]
+        """
+        return list(zip(self._bases, self._lengths))
+
+    def get(self, address: int) -> Union[bool, int]:
+        """
+        Get the value of a single configured register
+
+        :param      address:  The address
+        :type       address:  int
+
+        :raise      KeyError:  No register at specified address found
+        :returns:   Register value
+        :rtype:     Union[bool, int]
+        """
+        idx = self._locate(address)
+        if idx < 0:
+            raise KeyError(address)
+        return self._get(self._blocks[idx], address - self._bases[idx])
+
+    def set(self,
+            address: int,
+            values: Union[bool, int, List[bool], List[int]]) -> None:
+        """
+        Set one or several consecutive registers, adding missing ones
+
+        :param      address:  The address of the first register
+        :type       address:  int
+        :param      values:   The value or values
+        :type       values:   Union[bool, int, List[bool], List[int]]
+        """
+        if not isinstance(values, (list, tuple, array, bytes, bytearray)):
+            values = (values, )
+        quantity = len(values)
+        if not quantity:
+            return
+
+        idx = self._locate(address)
+        if (idx >= 0 and
+                address + quantity <= self._bases[idx] + self._lengths[idx]):
+            self._write(self._blocks[idx],
+                        address - self._bases[idx],
+                        values)
+            return
+
+        self._insert(address, quantity)
+        idx = self._locate(address)
+        self._write(self._blocks[idx], address - self._bases[idx], values)
+
+    def _write(self, block, offset: int, values) -> None:
+        for value in values:
+            self._put(block, offset, value)
+            offset += 1
+
+    def _insert(self, address: int, quantity: int) -> None:
+        """
+        Make sure a range of addresses is covered by exactly one block
+
+        All blocks overlapping or touching the range are merged into a new
+        block, which keeps the blocks sorted and non-adjacent.
+
+        :param      address:   The first address
+        :type       address:   int
+        :param      quantity:  The amount of addresses
+        :type       quantity:  int
+        """
+        lo = address
+        hi = address + quantity
+        first = self._find(address)
+        if first < 0 or self._bases[first] + self._lengths[first] < lo:
+            first += 1
+        last = first
+        while last < len(self._bases) and self._bases[last] <= hi:
+            last += 1
+
+        if last > first:
+            lo = min(lo, self._bases[first])
+            hi = max(hi, self._bases[last - 1] + self._lengths[last - 1])
+
+        block = self._alloc(hi - lo)
+        for idx in range(first, last):
+            self._copy(src=self._blocks[idx],
+                       dst=block,
+                       offset=self._bases[idx] - lo,
+                       length=self._lengths[idx])
+
+        self._bases[first:last] = [lo]
+        self._lengths[first:last] = [hi - lo]
+        self._blocks[first:last] = [block]
+
+    def _copy(self, src, dst, offset: int, length: int) -> None:
+        for idx in range(length):
+            self._put(dst, offset + idx, self._get(src, idx))
+
+    def remove(self, address: int) -> Union[None, bool, int]:
+        """
+        Remove a single register, splitting its block if needed
+
+        :param      address:  The address
+        :type       address:  int
+
+        :returns:   Register value, None if register was not configured
+        :rtype:     Union[None, bool, int]
+        """
+        idx = self._locate(address)
+        if idx < 0:
+            return None
+
+        base = self._bases[idx]
+        length = self._lengths[idx]
+        block = self._blocks[idx]
+        offset = address - base
+        value = self._get(block, offset)
+
+        bases = []
+        lengths = []
+        blocks = []
+        if offset:
+            head = self._alloc(offset)
+            self._copy(src=block, dst=head, offset=0, length=offset)
+            bases.append(base)
+            lengths.append(offset)
+            blocks.append(head)
+        tail_len = length - offset - 1
+        if tail_len:
+            tail = self._alloc(tail_len)
+            for pos in range(tail_len):
+                self._put(tail, pos, self._get(block, offset + 1 + pos))
+            bases.append(address + 1)
+            lengths.append(tail_len)
+            blocks.append(tail)
+
+        self._bases[idx:idx + 1] = bases
+        self._lengths[idx:idx + 1] = lengths
+        self._blocks[idx:idx + 1] = blocks
+
+        return value
+
+    def read(self, address: int, quantity: int) -> Union[List[bool], array]:
+        """
+        Read consecutive registers, unconfigured ones read as default
+
+        :param      address:   The address of the first register
+        :type       address:   int
+        :param      quantity:  The amount of registers
+        :type       quantity:  int
+
+        :returns:   The register values
+        :rtype:     Union[List[bool], array]
+        """
+        raise NotImplementedError()
+
+
+class WordBank(RegisterBank):
+    """
+    Register bank of 16 bit words, used for HREGS and IREGS
+
+    Negative values are stored as their two's complement. The addresses last
+    set to a negative value are remembered, so :py:meth:`get` returns them
+    signed as they have been set.
+    """
+    default = 0
+
+    def __init__(self) -> None:
+        super().__init__()
+        # sparse, addresses last set to a negative value
+        self._signed = set()
+
+    def get(self, address: int) -> int:
+        """
+        Get the value of a single configured register
+
+        :param      address:  The address
+        :type       address:  int
+
+        :raise      KeyError:  No register at specified address found
+        :returns:   Register value, negative if it has been set negative
+        :rtype:     int
+        """
+        value = super().get(address)
+        if self._signed and address in self._signed and value & 0x8000:
+            value -= 0x10000
+        return value
+
+    def set(self,
+            address: int,
+            values: Union[int, List[int]]) -> None:
+        """
+        Set one or several consecutive registers, adding missing ones
+
+        :param      address:  The address of the first register
+        :type       address:  int
+        :param      values:   The value or values
+        :type       values:   Union[int, List[int]]
+        """
+        if not isinstance(values, (list, tuple, array, bytes, bytearray)):
+            values = (values, )
+        super().set(address, values)
+
+        signed = self._signed
+        for pos, value in enumerate(values):
+            if value < 0:
+                signed.add(address + pos)
+            elif signed:
+                signed.discard(address + pos)
+
+    def remove(self, address: int) -> Union[None, int]:
+        """
+        Remove a single register, splitting its block if needed
+
+        :param      address:  The address
+        :type       address:  int
+
+        :returns:   Register value, None if register was not configured
+        :rtype:     Union[None, int]
+        """
+        value = self.get(address) if address in self else None
+        super().remove(address)
+        self._signed.discard(address)
+        return value
+
+    def _alloc(self, length: int) -> array:
+        return array('H', bytes(2 * length))
+
+    def _get(self, block: array, idx: int) -> int:
+        return block[idx]
+
+    def _put(self, block: array, idx: int, value: int) -> None:
+        # negative values are stored as their two's complement
+        block[idx] = value & 0xFFFF
+
+    def _copy(self, src: array, dst: array, offset: int, length: int) -> None:
+        dst[offset:offset + length] = src[0:length]
+
+    def read(self, address: int, quantity: int) -> array:
+        """
+        Read consecutive registers, unconfigured ones read as 0
+
+        A range inside a single block is returned as a slice copy of it.
+
+        :param      address:   The address of the first register
+        :type       address:   int
+        :param      quantity:  The amount of registers
+        :type       quantity:  int
+
+        :returns:   The register values
+        :rtype:     array
+        """
+        idx = self._locate(address)
+        if idx >= 0:
+            offset = address - self._bases[idx]
+            if offset + quantity <= self._lengths[idx]:
+                return self._blocks[idx][offset:offset + quantity]
+
+        data = self._alloc(quantity)
+        for pos in range(quantity):
+            idx = self._locate(address + pos)
+            if idx >= 0:
+                data[pos] = self._blocks[idx][address + pos - self._bases[idx]]
+        return data
+
+    def pack_into(self,
+                  buf: bytearray,
+                  offset: int,
+                  address: int,
+                  quantity: int) -> int:
+        """
+        Write consecutive registers big endian into a buffer
+
+        :param      buf:       The buffer
+        :type       buf:       bytearray
+        :param      offset:    The offset of the first byte in the buffer
+        :type       offset:    int
+        :param      address:   The address of the first register
+        :type       address:   int
+        :param      quantity:  The amount of registers
+        :type       quantity:  int
+
+        :returns:   Amount of bytes written
+        :rtype:     int
+        """
+        base = 0
+        end = 0
+        block = None
+        for addr in range(address, address + quantity):
+            if not (base <= addr < end):
+                idx = self._locate(addr)
+                if idx >= 0:
+                    base = self._bases[idx]
+                    end = base + self._lengths[idx]
+                    block = self._blocks[idx]
+                else:
+                    base = end = 0
+                    block = None
+            if block is None:
+                value = 0
+            else:
+                value = block[addr - base]
+            buf[offset] = value >> 8
+            buf[offset + 1] = value & 0xFF
+            offset += 2
+        return 2 * quantity
+
+
+class BitBank(RegisterBank):
+    """Register bank of packed bits, used for COILS and ISTS"""
+    default = False
+
+    def _alloc(self, length: int) -> bytearray:
+        return bytearray((length + 7) >> 3)
+
+    def _get(self, block: bytearray, idx: int) -> bool:
+        return bool(block[idx >> 3] & (1 << (idx & 7)))
+
+    def _put(self, block: bytearray, idx: int, value: bool) -> None:
+        if value:
+            block[idx >> 3] |= 1 << (idx & 7)
+        else:
+            block[idx >> 3] &= ~(1 << (idx & 7)) & 0xFF
+
+    def read(self, address: int, quantity: int) -> List[bool]:
+        """
+        Read consecutive bits, unconfigured ones read as False
+
+        :param      address:   The address of the first bit
+        :type       address:   int
+        :param      quantity:  The amount of bits
+        :type       quantity:  int
+
+        :returns:   The bit states
+        :rtype:     List[bool]
+        """
+        data = [False] * quantity
+        idx = self._locate(address)
+        pos = 0
+        while pos < quantity:
+            if idx < 0:
+                idx = self._locate(address + pos)
+                if idx < 0:
+                    pos += 1
+                    continue
+            block = self._blocks[idx]
+            offset = address + pos - self._bases[idx]
+            end = min(self._lengths[idx], offset + quantity - pos)
+            while offset < end:
+                data[pos] = bool(block[offset >> 3] & (1 << (offset & 7)))
+                offset += 1
+                pos += 1
+            idx = -1
+        return data
+
+    def pack_into(self,
+                  buf: bytearray,
+                  offset: int,
+                  address: int,
+                  quantity: int) -> int:
+        """
+        Write consecutive bits packed into a buffer
+
+        The bits are packed in the same order as
+        :py:func:`umodbus.functions.response` does, the first bit of each
+        group of eight ends up as most significant one.
+
+        :param      buf:       The buffer
+        :type       buf:       bytearray
+        :param      offset:    The offset of the first byte in the buffer
+        :type       offset:    int
+        :param      address:   The address of the first bit
+        :type       address:   int
+        :param      quantity:  The amount of bits
+        :type       quantity:  int
+
+        :returns:   Amount of bytes written
+        :rtype:     int
+        """
+        base = 0
+        end = 0
+        block = None
+        output = 0
+        pos = 0
+        for addr in range(address, address + quantity):
+            if not (base <= addr < end):
+                idx = self._locate(addr)
+                if idx >= 0:
+                    base = self._bases[idx]
+                    end = base + self._lengths[idx]
+                    block = self._blocks[idx]
+                else:
+                    base = end = 0
+                    block = None
+            output <<= 1
+            if block is not None:
+                bit = addr - base
+                output |= (block[bit >> 3] >> (bit & 7)) & 1
+            pos += 1
+            if not pos & 7:
+                buf[offset] = output
+                offset += 1
+                output = 0
+        if pos & 7:
+            buf[offset] = output
+        return (quantity + 7) >> 3
+
+
+class CallbackIndex(object):
+    """
+    Interval index of register callbacks
+
+    Each entry covers a range of addresses with one dict of callbacks,
+    ``{'on_set_cb': ..., 'on_get_cb': ...}``, shared by the whole range
+    instead of being copied for every address. Entries are sorted and do
+    not overlap.
+    """
+    def __init__(self) -> None:
+        self._starts = []
+        self._ends = []
+        self._cbs = []
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+    def _find(self, address: int) -> int:
+        """
+        Find the index of the last entry starting at or before an address
+
+        :param      address:  The address
+        :type       address:  int
+
+        :returns:   Entry index, -1 if all entries start after the address
+        :rtype:     int
+        """
+        lo = 0
+        hi = len(self._starts)
+        while lo < hi:
+            mid = (lo + hi) >> 1
+            if self._starts[mid] <= address:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo - 1
+
+    def get(self, address: int) -> Optional[dict]:
+        """
+        Get the callbacks of an address
+
+        :param      address:  The address
+        :type       address:  int
+
+        :returns:   The callbacks, None if there are none
+        :rtype:     Optional[dict]
+        """
+        idx = self._find(address)
+        if idx >= 0 and address < self._ends[idx]:
+            return self._cbs[idx]
+        return None
+
+    def _split(self, address: int) -> None:
+        # make address the start of an entry, if it is covered by one
+        idx = self._find(address)
+        if idx >= 0 and self._starts[idx] < address < self._ends[idx]:
+            self._starts.insert(idx + 1, address)
+            self._ends.insert(idx + 1, self._ends[idx])
+            self._cbs.insert(idx + 1, self._cbs[idx])
+            self._ends[idx] = address
+
+    def add(self,
+            address: int,
+            quantity: int,
+            on_set_cb: Optional[Callable] = None,
+            on_get_cb: Optional[Callable] = None) -> None:
+        """
+        Add callbacks to a range of addresses
+
+        Callbacks already registered for an address are kept, the given
+        ones are only used where there are none.
+
+        :param      address:    The first address
+        :type       address:    int
+        :param      quantity:   The amount of addresses
+        :type       quantity:   int
+        :param      on_set_cb:  Callback on setting the registers
+        :type       on_set_cb:  Optional[Callable]
+        :param      on_get_cb:  Callback on getting the registers
+        :type       on_get_cb:  Optional[Callable]
+        """
+        new = dict()
+        if callable(on_set_cb):
+            new['on_set_cb'] = on_set_cb
+        if callable(on_get_cb):
+            new['on_get_cb'] = on_get_cb
+        if not new or quantity < 1:
+            return
+
+        end = address + quantity
+        self._split(address)
+        self._split(end)
+
+        idx = self._find(address)
+        if idx < 0 or self._ends[idx] <= address:
+            idx += 1
+
+        pos = address
+        merged = {}
+        while pos < end:
+            if idx < len(self._starts) and self._starts[idx] == pos:
+                # covered part, complete the existing callbacks
+                cbs = self._cbs[idx]
+                if any(key not in cbs for key in new):
+                    key = id(cbs)
+                    if key not in merged:
+                        merged[key] = dict(new)
+                        merged[key].update(cbs)
+                    self._cbs[idx] = merged[key]
+                pos = self._ends[idx]
+                idx += 1
+            else:
+                # uncovered part up to the next entry
+                gap_end = end
+                if idx < len(self._starts):
+                    gap_end = min(end, self._starts[idx])
+                self._starts.insert(idx, pos)
+                self._ends.insert(idx, gap_end)
+                self._cbs.insert(idx, new)
+                pos = gap_end
+                idx += 1
+
+    def remove(self, address: int) -> None:
+        """
+        Remove the callbacks of a single address
+
+        :param      address:  The address
+        :type       address:  int
+        """
+        if self.get(address) is None:
+            return
+
+        self._split(address)
+        self._split(address + 1)
+        idx = self._find(address)
+        del self._starts[idx]
+        del self._ends[idx]
+        del self._cbs[idx]
+
+    def spans(self, address: int, quantity: int, key: str) -> List[tuple]:
+        """
+        Get the callbacks of a kind called for an access to a range
+
+        Each callback is returned once with the part of the range it covers.
+
+        :param      address:   The first address of the access
+        :type       address:   int
+        :param      quantity:  The amount of addresses
+        :type       quantity:  int
+        :param      key:       The kind of callback, 'on_set_cb' or
+                               'on_get_cb'
+        :type       key:       str
+
+        :returns:   Tuples of (callback, first address, quantity)
+        :rtype:     List[tuple]
+        """
+        end = address + quantity
+        result = []
+        idx = self._find(address)
+        if idx < 0 or self._ends[idx] <= address:
+            idx += 1
+
+        last_cbs = None
+        while idx < len(self._starts) and self._starts[idx] < end:
+            cbs = self._cbs[idx]
+            cb = cbs.get(key, None)
+            if cb is not None:
+                lo = max(address, self._starts[idx])
+                hi = min(end, self._ends[idx])
+                if cbs is last_cbs and result[-1][1] + result[-1][2] == lo:
+                    # continuation of the same range
+                    result[-1] = (cb, result[-1][1], hi - result[-1][1])
+                else:
+                    result.append((cb, lo, hi - lo))
+                last_cbs = cbs
+            else:
+                last_cbs = None
+            idx += 1
+
+        return result
@@ -0,0 +1,403 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+"""
+Polling scheduler for a Modbus host talking to several slaves
+
+Runs one transaction per :py:meth:`PollScheduler.service` call on a shared
+bus. Queued writes go before reads, reads are polled at their own period
+and slaves not responding are polled less often until they answer again.
+"""
+
+# system packages
+from collections import deque
+import time
+
+# typing not natively supported on MicroPython
+from .typing import List, Optional, Union
+
+
+class PollJob(object):
+    """
+    Periodic read of a register range of a slave
+
+    :param      slave_addr:  The slave address
+    :type       slave_addr:  int
+    :param      reg_type:    The register type, one of 'COILS', 'ISTS',
+                             'HREGS' or 'IREGS'
+    :type       reg_type:    str
+    :param      address:     The address of the first register
+    :type       address:     int
+    :param      quantity:    The amount of registers
+    :type       quantity:    int
+    :param      period:      The poll period in milliseconds
+    :type       period:      int
+    :param      signed:      Indicates if registers are signed
+    :type       signed:      bool
+    """
+    def __init__(self,
+                 slave_addr: int,
+                 reg_type: str,
+                 address: int,
+                 quantity: int,
+                 period: int,
+                 signed: bool = True) -> None:
+        self.slave_addr = slave_addr
+        self.reg_type = reg_type
+        self.address = address
+        self.quantity = quantity
+        self.period = period
+        self.signed = signed
+        self.due = time.ticks_ms()
+
+        #: Latest values read, None until the first successful read
+        self.values = None
+        #: Time of the latest successful read in milliseconds
+        self.timestamp = None
+        #: Error of the latest read, None if it succeeded
+        self.error = None
+
+    def covers(self,
+               slave_addr: int,
+               reg_type: str,
+               address: int,
+               quantity: int = 1) -> bool:
+        """
+        Check whether this job reads a range of registers
+
+        :param      slave_addr:  The slave address
+        :type       slave_addr:  int
+        :param      reg_type:    The register type
+        :type       reg_type:    str
+        :param      address:     The address of the first register
+        :type       address:     int
+        :param      quantity:    The amount of registers
+        :type       quantity:    int
+
+        :returns:   True if the whole range is read by this job
+        :rtype:     bool
+        """
+        return (self.slave_addr == slave_addr and
+                self.reg_type == reg_type and
+                self.address <= address and
+                address + quantity <= self.address + self.quantity)
+
+
+class PollScheduler(object):
+    """
+    Schedule reads and writes of several slaves on one Modbus host
+
+    :param      host:         The Modbus host, e.g. a
+                              :py:class:`umodbus.serial.Serial` object
+    :type       host:         CommonModbusFunctions
+    :param      backoff:      Time in milliseconds a slave is skipped after
+                              its first failed transaction
+    :type       backoff:      int
+    :param      max_backoff:  Maximum time in milliseconds a slave is skipped,
+                              the time doubles with every failure
+    :type       max_backoff:  int
+    :param      max_writes:   Maximum amount of queued writes
+    :type       max_writes:   int
+    """
+    def __init__(self,
+                 host,
+                 backoff: int = 1000,
+                 max_backoff: int = 60000,
+                 max_writes: int = 32) -> None:
+        self._host = host
+        self._backoff = backoff
+        self._max_backoff = max_backoff
+        self._jobs = []
+        self._max_writes = max_writes
+        self._writes = deque((), max_writes)
+        # slave address -> [failure count, time of next attempt]
+        self._slaves = {}
+
+        # silence to keep between two transactions in microseconds
+        self._inter_frame_delay = getattr(host, '_inter_frame_delay', 0)
+        self._bus_free_us = time.ticks_us()
+
+    @property
+    def jobs(self) -> List[PollJob]:
+        """
+        Get the poll jobs
+
+        :returns:   The poll jobs
+        :rtype:     List[PollJob]
+        """
+        return self._jobs
+
+    def add_poll(self,
+                 slave_addr: int,
+                 reg_type: str,
+                 address: int,
+                 quantity: int,
+                 period: int,
+                 signed: bool = True) -> PollJob:
+        """
+        Add a periodic read of a register range
+
+        :param      slave_addr:  The slave address
+        :type       slave_addr:  int
+        :param      reg_type:    The register type, one of 'COILS', 'ISTS',
+                                 'HREGS' or 'IREGS'
+        :type       reg_type:    str
+        :param      address:     The address of the first register
+        :type       address:     int
+        :param      quantity:    The amount of registers
+        :type       quantity:    int
+        :param      period:      The poll period in milliseconds
+        :type       period:      int
+        :param      signed:      Indicates if registers are signed
+        :type       signed:      bool
+
+        :raises     ValueError:  Unknown register type
+        :returns:   The poll job
+        :rtype:     PollJob
+        """
+        if reg_type not in ('COILS', 'ISTS', 'HREGS', 'IREGS'):
+            raise ValueError('Unknown register type: {}'.format(reg_type))
+
+        job = PollJob(slave_addr=slave_addr,
+                      reg_type=reg_type,
+                      address=address,
+                      quantity=quantity,
+                      period=period,
+                      signed=signed)
+        self._jobs.append(job)
+
+        return job
+
+    def remove_poll(self, job: PollJob) -> None:
+        """
+        Remove a periodic read
+
+        :param      job:  The poll job
+        :type       job:  PollJob
+        """
+        if job in self._jobs:
+            self._jobs.remove(job)
+
+    def write(self,
+              slave_addr: int,
+              reg_type: str,
+              address: int,
+              values: Union[bool, int, List[bool], List[int]],
+              signed: bool = True,
+              callback=None) -> None:
+        """
+        Queue a write, sent before any pending read
+
+        :param      slave_addr:  The slave address
+        :type       slave_addr:  int
+        :param      reg_type:    The register type, 'COILS' or 'HREGS'
+        :type       reg_type:    str
+        :param      address:     The address of the first register
+        :type       address:     int
+        :param      values:      The value or values to write
+        :type       values:      Union[bool, int, List[bool], List[int]]
+        :param      signed:      Indicates if registers are signed
+        :type       signed:      bool
+        :param      callback:    Function called with the result of the
+                                 write, True or the raised exception
+        :type       callback:    Optional[Callable[[Union[bool, Exception]], None]]
+
+        :raises     ValueError:  Register type not writable
+        :raises     IndexError:  Write queue full
+        """
+        if reg_type not in ('COILS', 'HREGS'):
+            raise ValueError('Register type not writable: {}'.format(reg_type))
+
+        if len(self._writes) >= self._max_writes:
+            raise IndexError('write queue full')
+
+        self._writes.append((slave_addr, reg_type, address, values, signed,
+                             callback))
+
+    def get(self,
+            slave_addr: int,
+            reg_type: str,
+            address: int,
+            quantity: int = 1) -> Optional[list]:
+        """
+        Get the latest polled values of a register range
+
+        :param      slave_addr:  The slave address
+        :type       slave_addr:  int
+        :param      reg_type:    The register type
+        :type       reg_type:    str
+        :param      address:     The address of the first register
+        :type       address:     int
+        :param      quantity:    The amount of registers
+        :type       quantity:    int
+
+        :returns:   The values, None if the range has not been read yet
+        :rtype:     Optional[list]
+        """
+        latest = None
+        for job in self._jobs:
+            if (job.values is not None and
+                    job.covers(slave_addr, reg_type, address, quantity)):
+                if (latest is None or
+                        time.ticks_diff(job.timestamp, latest.timestamp) > 0):
+                    latest = job
+
+        if latest is None:
+            return None
+
+        offset = address - latest.address
+        return list(latest.values[offset:offset + quantity])
+
+    def is_online(self, slave_addr: int) -> bool:
+        """
+        Check whether the last transaction with a slave succeeded
+
+        :param      slave_addr:  The slave address
+        :type       slave_addr:  int
+
+        :returns:   False if the slave failed to respond, True otherwise
+        :rtype:     bool
+        """
+        return slave_addr not in self._slaves
+
+    def _available(self, slave_addr: int, now: int) -> bool:
+        state = self._slaves.get(slave_addr, None)
+        return state is None or time.ticks_diff(now, state[1]) >= 0
+
+    def _succeeded(self, slave_addr: int) -> None:
+        self._slaves.pop(slave_addr, None)
+
+    def _failed(self, slave_addr: int, now: int) -> None:
+        failures = self._slaves.get(slave_addr, (0, 0))[0] + 1
+        backoff = min(self._max_backoff,
+                      self._backoff << min(failures - 1, 16))
+        self._slaves[slave_addr] = [failures, time.ticks_add(now, backoff)]
+
+    def _next_write(self, now: int) -> Optional[tuple]:
+        # keep the order of writes to the same slave, skip unavailable ones
+        for _ in range(len(self._writes)):
+            write = self._writes.popleft()
+            if self._available(write[0], now):
+                return write
+            self._writes.append(write)
+        return None
+
+    def _next_poll(self, now: int) -> Optional[PollJob]:
+        # the most overdue job of an available slave
+        next_job = None
+        for job in self._jobs:
+            if (time.ticks_diff(now, job.due) >= 0 and
+                    self._available(job.slave_addr, now)):
+                if (next_job is None or
+                        time.ticks_diff(next_job.due, job.due) > 0):
+                    next_job = job
+        return next_job
+
+    def service(self) -> bool:
+        """
+        Run the next transaction, if any is due
+
+        Call this frequently, e.g. from the main loop or a task.
+
+        :returns:   True if a transaction has been run, False otherwise
+        :rtype:     bool
+        """
+        if time.ticks_diff(time.ticks_us(), self._bus_free_us) < 0:
+            return False
+
+        now = time.ticks_ms()
+        write = self._next_write(now)
+        if write is not None:
+            self._run_write(write, now)
+        else:
+            job = self._next_poll(now)
+            if job is None:
+                return False
+            self._run_poll(job, now)
+
+        self._bus_free_us = time.ticks_add(time.ticks_us(),
+                                           self._inter_frame_delay)
+        return True
+
+    def _run_write(self, write: tuple, now: int) -> None:
+        slave_addr, reg_type, address, values, signed, callback = write
+        host = self._host
+
+        try:
+            if isinstance(values, (list, tuple)):
+                if reg_type == 'COILS':
+                    result = host.write_multiple_coils(slave_addr,
+                                                       address,
+                                                       values)
+                else:
+                    result = host.write_multiple_registers(slave_addr,
+                                                           address,
+                                                           values,
+                                                           signed)
+                quantity = len(values)
+            else:
+                if reg_type == 'COILS':
+                    result = host.write_single_coil(slave_addr,
+                                                    address,
+                                                    values)
+                else:
+                    result = host.write_single_register(slave_addr,
+                                                        address,
+                                                        values,
+                                                        signed)
+                quantity = 1
+        except OSError as e:
+            # no or corrupted response, the write is dropped
+            self._failed(slave_addr, now)
+            result = e
+        except ValueError as e:
+            # rejected write, e.g. an exception response, the slave health
+            # is left as it is
+            result = e
+        else:
+            self._succeeded(slave_addr)
+            # refresh polled copies of the written registers
+            for job in self._jobs:
+                if (job.slave_addr == slave_addr and
+                        job.reg_type == reg_type and
+                        job.address < address + quantity and
+                        address < job.address + job.quantity):
+                    job.due = now
+
+        if callback is not None:
+            callback(result)
+
+    def _run_poll(self, job: PollJob, now: int) -> None:
+        host = self._host
+        job.due = time.ticks_add(now, job.period)
+
+        try:
+            if job.reg_type == 'COILS':
+                values = host.read_coils(job.slave_addr,
+                                         job.address,
+                                         job.quantity)
+            elif job.reg_type == 'ISTS':
+                values = host.read_discrete_inputs(job.slave_addr,
+                                                   job.address,
+                                                   job.quantity)
+            elif job.reg_type == 'HREGS':
+                values = host.read_holding_registers(job.slave_addr,
+                                                     job.address,
+                                                     job.quantity,
+                                                     job.signed)
+            else:
+                values = host.read_input_registers(job.slave_addr,
+                                                   job.address,
+                                                   job.quantity,
+                                                   job.signed)
+        except OSError as e:
+            self._failed(job.slave_addr, now)
+            job.error = e
+        except ValueError as e:
+            # rejected read, the slave health is left as it is
+            job.error = e
+        else:
+            self._succeeded(job.slave_addr)
+            job.values = values
+            job.timestamp = now
+            job.error = None
@@ -11,12 +11,15 @@
 # system packages
 from machine import UART
 from machine import Pin
+from machine import Timer
+import machine
 import struct
 import time
 
 # custom packages
 from . import const as Const
 from . import functions
+from .crc import crc16, CRC16
 from .common import Request, CommonModbusFunctions
 from .common import ModbusException
 from .modbus import Modbus
@@ -45,6 +48,8 @@ class ModbusRTU(Modbus):
     :type       ctrl_pin:    int
     :param      uart_id:     The ID of the used UART
     :type       uart_id:     int
+    :param      rx_engine:   Receive frames in the background, default False
+    :type       rx_engine:   bool
     """
     def __init__(self,
                  addr: int,
@@ -54,7 +59,8 @@ class ModbusRTU(Modbus):
                  parity: Optional[int] = None,
                  pins: List[Union[int, Pin], Union[int, Pin]] = None,
                  ctrl_pin: int = None,
-                 uart_id: int = 1):
+                 uart_id: int = 1,
+                 rx_engine: bool = False):
         super().__init__(
             # set itf to Serial object, addr_list to [addr]
             Serial(uart_id=uart_id,
@@ -63,7 +69,8 @@ class ModbusRTU(Modbus):
                    stop_bits=stop_bits,
                    parity=parity,
                    pins=pins,
-                   ctrl_pin=ctrl_pin),
+                   ctrl_pin=ctrl_pin,
+                   rx_engine=rx_engine),
             [addr]
         )
 
@@ -76,7 +83,8 @@ class Serial(CommonModbusFunctions):
                  stop_bits: int = 1,
                  parity=None,
                  pins: List[Union[int, Pin], Union[int, Pin]] = None,
-                 ctrl_pin: int = None):
+                 ctrl_pin: int = None,
+                 rx_engine: bool = False):
         """
         Setup Serial/RTU Modbus
 
@@ -94,6 +102,11 @@ class Serial(CommonModbusFunctions):
         :type       pins:        List[Union[int, Pin], Union[int, Pin]]
         :param      ctrl_pin:    The control pin
         :type       ctrl_pin:    int
+        :param      rx_engine:   Receive frames in the background with an
+                                 :py:class:`RTUFrameAssembler` instead of
+                                 polling the UART on each request, default
+                                 False
+        :type       rx_engine:   bool
         """
         # UART flush function is introduced in Micropython v1.20.0
         self._has_uart_flush = callable(getattr(UART, "flush", None))
@@ -113,6 +126,13 @@ class Serial(CommonModbusFunctions):
         else:
             self._ctrlPin = None
 
+        # CRC of the frame being received, updated as bytes arrive
+        self._rx_crc = CRC16()
+
+        # preallocated transmit buffer, slave address + PDU + CRC
+        self._tx_buf = bytearray(Const.RTU_ADU_MAX_LENGTH)
+        self._tx_view = memoryview(self._tx_buf)
+
         # timing of 1 character in microseconds (us)
         self._t1char = (1000000 * (data_bits + stop_bits + 2)) // baudrate
 
@@ -124,6 +144,28 @@ class Serial(CommonModbusFunctions):
         else:
             self._inter_frame_delay = 1750
 
+        # time to wait for a slave response, as the former fixed loop did
+        self._response_timeout = 120 * self._inter_frame_delay
+
+        if rx_engine:
+            self._rx = RTUFrameAssembler(uart=self._uart,
+                                         inter_frame_delay=self._inter_frame_delay)
+            self._rx.start()
+        else:
+            self._rx = None
+
+    @property
+    def pending(self) -> int:
+        """
+        Get the amount of received frames waiting to be processed
+
+        :returns:   Amount of queued frames, always 0 without receive engine
+        :rtype:     int
+        """
+        if self._rx is None:
+            return 0
+        return self._rx.pending
+
     def _calculate_crc16(self, data: bytearray) -> bytes:
         """
         Calculates the CRC16.
@@ -134,12 +176,7 @@ class Serial(CommonModbusFunctions):
         :returns:   The crc 16.
         :rtype:     bytes
         """
-        crc = 0xFFFF
-
-        for char in data:
-            crc = (crc >> 8) ^ Const.CRC16_TABLE[((crc) ^ char) & 0xFF]
-
-        return struct.pack('<H', crc)
+        return struct.pack('<H', crc16(data))
 
     def _exit_read(self, response: bytearray) -> bool:
         """
@@ -156,7 +193,8 @@ class Serial(CommonModbusFunctions):
         if response_len >= 2 and response[1] >= Const.ERROR_BIAS:
             if response_len < Const.ERROR_RESP_LEN:
                 return False
-        elif response_len >= 3 and (Const.READ_COILS <= response[1] <= Const.READ_INPUT_REGISTER):
+        elif response_len >= 3 and (Const.READ_COILS <= response[1] <= Const.READ_INPUT_REGISTER or
+                                    response[1] == Const.READ_WRITE_MULTIPLE_REGISTERS):
             expected_len = Const.RESPONSE_HDR_LENGTH + 1 + response[2] + Const.CRC_LENGTH
             if response_len < expected_len:
                 return False
@@ -172,11 +210,16 @@ class Serial(CommonModbusFunctions):
         :returns:   Read content
         :rtype:     bytearray
         """
+        if self._rx is not None:
+            frame = self._rx.get_frame(timeout=self._response_timeout)
+            if frame is None:
+                return bytearray()
+            return frame
+
         response = bytearray()
+        start_us = time.ticks_us()
 
-        # TODO: use some kind of hint or user-configurable delay
-        #       to determine this loop counter
-        for x in range(1, 120):
+        while time.ticks_diff(time.ticks_us(), start_us) <= self._response_timeout:
             if self._uart.any():
                 # WiPy only
                 # response.extend(self._uart.readall())
@@ -202,6 +245,7 @@ class Serial(CommonModbusFunctions):
         :rtype:     bytearray
         """
         received_bytes = bytearray()
+        self._rx_crc.reset()
 
         # set default timeout to at twice the inter-frame delay
         if timeout == 0 or timeout is None:
@@ -228,6 +272,7 @@ class Serial(CommonModbusFunctions):
                     if r is not None:
                         # append the new read stuff to the buffer
                         received_bytes.extend(r)
+                        self._rx_crc.update(r)
 
                         # update the timestamp of the last byte being read
                         last_byte_ts = time.ticks_us()
@@ -252,10 +297,23 @@ class Serial(CommonModbusFunctions):
         """
         # modbus_adu: Modbus Application Data Unit
         # consists of the Modbus PDU, with slave address prepended and checksum appended
-        modbus_adu = bytearray()
-        modbus_adu.append(slave_addr)
-        modbus_adu.extend(modbus_pdu)
-        modbus_adu.extend(self._calculate_crc16(modbus_adu))
+        pdu_length = len(modbus_pdu)
+        self._tx_buf[0] = slave_addr
+        self._tx_buf[1:1 + pdu_length] = modbus_pdu
+        self._write_adu(length=1 + pdu_length)
+
+    def _write_adu(self, length: int) -> None:
+        """
+        Append the CRC to the frame in the transmit buffer and send it
+
+        :param      length:  The length of the frame without CRC
+        :type       length:  int
+        """
+        struct.pack_into('<H',
+                         self._tx_buf,
+                         length,
+                         crc16(self._tx_buf, 0, length))
+        length += Const.CRC_LENGTH
 
         if self._ctrlPin:
             self._ctrlPin.on()
@@ -272,7 +330,7 @@ class Serial(CommonModbusFunctions):
 
         send_start_time = time.ticks_us()
         # 360-400us @ 9600-115200 baud (measured) (ESP32 @ 160/240MHz)
-        self._uart.write(modbus_adu)
+        self._uart.write(self._tx_view[:length])
         send_finish_time = time.ticks_us()
 
         if self._has_uart_flush:
@@ -280,7 +338,7 @@ class Serial(CommonModbusFunctions):
             time.sleep_us(self._t1char)
         else:
             sleep_time_us = (
-                self._t1char * len(modbus_adu) -    # total frame time in us
+                self._t1char * length -    # total frame time in us
                 time.ticks_diff(send_finish_time, send_start_time) +
                 100     # only required at baudrates above 57600, but hey 100us
             )
@@ -307,7 +365,10 @@ class Serial(CommonModbusFunctions):
         :rtype:     bytes
         """
         # flush the Rx FIFO buffer
-        self._uart.read()
+        if self._rx is not None:
+            self._rx.clear()
+        else:
+            self._uart.read()
 
         self._send(modbus_pdu=modbus_pdu, slave_addr=slave_addr)
 
@@ -316,6 +377,43 @@ class Serial(CommonModbusFunctions):
                                        function_code=modbus_pdu[0],
                                        count=count)
 
+    def forward_pdu(self, modbus_pdu: bytes, slave_addr: int) -> bytes:
+        """
+        Send a request PDU as is and return the response PDU as is
+
+        Used by :py:class:`umodbus.gateway.ModbusTCPGateway`. Exception
+        responses of the slave are returned like any other response.
+
+        :param      modbus_pdu:  The modbus Protocol Data Unit
+        :type       modbus_pdu:  bytes
+        :param      slave_addr:  The slave address
+        :type       slave_addr:  int
+
+        :raises     OSError:  If no valid response has been received
+        :returns:   Function code and data of the response
+        :rtype:     bytes
+        """
+        # flush the Rx FIFO buffer
+        if self._rx is not None:
+            self._rx.clear()
+        else:
+            self._uart.read()
+
+        self._send(modbus_pdu=modbus_pdu, slave_addr=slave_addr)
+
+        response = self._uart_read()
+
+        if len(response) < Const.ERROR_RESP_LEN:
+            raise OSError('no data received from slave')
+
+        if crc16(response) != 0:
+            raise OSError('invalid response CRC')
+
+        if response[0] != slave_addr:
+            raise OSError('wrong slave address')
+
+        return bytes(response[1:len(response) - Const.CRC_LENGTH])
+
     def _validate_resp_hdr(self,
                            response: bytearray,
                            slave_addr: int,
@@ -339,13 +437,8 @@ class Serial(CommonModbusFunctions):
         if len(response) == 0:
             raise OSError('no data received from slave')
 
-        resp_crc = response[-Const.CRC_LENGTH:]
-        expected_crc = self._calculate_crc16(
-            response[0:len(response) - Const.CRC_LENGTH]
-        )
-
-        if ((resp_crc[0] is not expected_crc[0]) or
-                (resp_crc[1] is not expected_crc[1])):
+        # the CRC over a frame including its own CRC is zero
+        if crc16(response) != 0:
             raise OSError('invalid response CRC')
 
         if (response[0] != slave_addr):
@@ -395,6 +488,36 @@ class Serial(CommonModbusFunctions):
         )
         self._send(modbus_pdu=modbus_pdu, slave_addr=slave_addr)
 
+    def send_read_response(self,
+                           slave_addr: int,
+                           function_code: int,
+                           request_register_addr: int,
+                           request_register_qty: int,
+                           bank) -> None:
+        """
+        Send a read response to a client, encoded in the transmit buffer.
+
+        :param      slave_addr:             The slave address
+        :type       slave_addr:             int
+        :param      function_code:          The function code
+        :type       function_code:          int
+        :param      request_register_addr:  The request register address
+        :type       request_register_addr:  int
+        :param      request_register_qty:   The request register qty
+        :type       request_register_qty:   int
+        :param      bank:                   The register bank to read from
+        :type       bank:                   umodbus.registers.RegisterBank
+        """
+        self._tx_buf[0] = slave_addr
+        pdu_length = functions.read_response_into(
+            buf=self._tx_buf,
+            offset=1,
+            function_code=function_code,
+            bank=bank,
+            register_addr=request_register_addr,
+            quantity=request_register_qty)
+        self._write_adu(length=1 + pdu_length)
+
     def send_exception_response(self,
                                 slave_addr: int,
                                 function_code: int,
@@ -428,23 +551,50 @@ class Serial(CommonModbusFunctions):
         :returns:   A request object or None.
         :rtype:     Union[Request, None]
         """
-        req = self._uart_read_frame(timeout=timeout)
+        if self._rx is not None:
+            req = self._rx.get_frame(timeout=timeout)
+            if req is None:
+                return None
+            crc_valid = self._rx.last_crc_valid
+        else:
+            req = self._uart_read_frame(timeout=timeout)
+            crc_valid = self._rx_crc.valid
+
+        return self._decode_request(req=req,
+                                    crc_valid=crc_valid,
+                                    unit_addr_list=unit_addr_list)
+
+    def _decode_request(self,
+                        req: bytes,
+                        crc_valid: bool,
+                        unit_addr_list: List[int]) -> Union[Request, None]:
+        """
+        Decode a received frame into a request
 
+        :param      req:             The frame including its CRC
+        :type       req:             bytes
+        :param      crc_valid:       Flag whether the CRC of the frame is valid
+        :type       crc_valid:       bool
+        :param      unit_addr_list:  The unit address list
+        :type       unit_addr_list:  List[int]
+
+        :returns:   A request object or None.
+        :rtype:     Union[Request, None]
+        """
         if len(req) < 8:
             return None
 
         if req[0] not in unit_addr_list:
             return None
 
-        req_crc = req[-Const.CRC_LENGTH:]
-        req_no_crc = req[:-Const.CRC_LENGTH]
-        expected_crc = self._calculate_crc16(req_no_crc)
-
-        if (req_crc[0] != expected_crc[0]) or (req_crc[1] != expected_crc[1]):
+        # CRC has been calculated while the frame was received
+        if not crc_valid:
             return None
 
         try:
-            request = Request(interface=self, data=req_no_crc)
+            request = Request(
+                interface=self,
+                data=memoryview(req)[:len(req) - Const.CRC_LENGTH])
         except ModbusException as e:
             self.send_exception_response(
                 slave_addr=req[0],
@@ -453,3 +603,168 @@ class Serial(CommonModbusFunctions):
             return None
 
         return request
+
+
+class RTUFrameAssembler(object):
+    """
+    Background receiver of Modbus RTU frames
+
+    A timer, and the UART RX interrupt where the port offers one, drain the
+    UART into a frame buffer and update the frame CRC as bytes arrive. A
+    silence of the inter-frame delay (t3.5) after the last byte completes
+    the frame, which is then queued for :py:meth:`get_frame`.
+
+    Frames are received into a ring of preallocated buffers, the callbacks
+    allocate no memory. A frame completed while the ring is full is dropped.
+
+    :param      uart:               The UART
+    :type       uart:               UART
+    :param      inter_frame_delay:  The inter-frame delay in microseconds
+    :type       inter_frame_delay:  int
+    :param      max_frames:         Amount of completed frames to queue
+    :type       max_frames:         int
+    :param      timer_id:           The ID of the timer, -1 for a virtual
+                                    timer as on rp2
+    :type       timer_id:           int
+    """
+    def __init__(self,
+                 uart: UART,
+                 inter_frame_delay: int,
+                 max_frames: int = 4,
+                 timer_id: int = -1) -> None:
+        self._uart = uart
+        self._inter_frame_delay = inter_frame_delay
+        self._timer_id = timer_id
+        # one more slot than queued frames, receiving into the free one
+        self._slots = [bytearray(Const.RTU_ADU_MAX_LENGTH)
+                       for _ in range(max_frames + 1)]
+        self._lengths = [0] * len(self._slots)
+        self._crc_valid = bytearray(len(self._slots))
+        # the callbacks only move the write index, get_frame the read index
+        self._write = 0
+        self._read = 0
+        self._buf = self._slots[0]
+        self._view = memoryview(self._buf)
+        self._len = 0
+        self._overflow = False
+        self._last_byte_us = 0
+        self._crc = CRC16()
+        self._timer = None
+        self.last_crc_valid = False
+
+    def start(self) -> None:
+        """Start receiving in the background"""
+        # poll at twice the rate of the inter-frame delay, 1 ms at least
+        period = max(1, self._inter_frame_delay // 2000)
+        self._timer = Timer(self._timer_id)
+        self._timer.init(mode=Timer.PERIODIC,
+                         period=period,
+                         callback=self._service)
+
+        # UART irq support differs between ports and versions
+        trigger = getattr(UART, 'IRQ_RXIDLE', None)
+        if trigger is not None and callable(getattr(self._uart, 'irq', None)):
+            self._uart.irq(handler=self._service, trigger=trigger)
+
+    def stop(self) -> None:
+        """Stop receiving in the background"""
+        if self._timer is not None:
+            self._timer.deinit()
+            self._timer = None
+        if callable(getattr(self._uart, 'irq', None)):
+            self._uart.irq(handler=None)
+
+    def clear(self) -> None:
+        """Drop all received and partially received frames"""
+        self._read = self._write
+        self._uart.read()
+        self._start_frame()
+
+    def _start_frame(self) -> None:
+        self._len = 0
+        self._overflow = False
+        self._crc.reset()
+
+    def _complete_frame(self) -> None:
+        slot = self._write
+        following = (slot + 1) % len(self._slots)
+        if following == self._read:
+            # queue full, keep receiving into the same buffer
+            return
+        self._lengths[slot] = self._len
+        self._crc_valid[slot] = self._crc.valid
+        self._buf = self._slots[following]
+        self._view = memoryview(self._buf)
+        self._write = following
+
+    def _service(self, *args) -> None:
+        """
+        Drain the UART and complete the frame after t3.5 of silence
+
+        Runs as timer and UART callback, both are soft interrupts
+        """
+        now = time.ticks_us()
+        available = self._uart.any()
+
+        if available:
+            free = len(self._buf) - self._len
+            if available > free:
+                # not a valid RTU frame, drop it until the line is silent
+                self._overflow = True
+                self._uart.read(available)
+                self._len = 0
+            elif not self._overflow:
+                received = self._uart.readinto(self._view[self._len:],
+                                               available)
+                if received:
+                    self._crc.update(self._buf, self._len, self._len + received)
+                    self._len += received
+            else:
+                self._uart.read(available)
+            self._last_byte_us = now
+        elif ((self._len or self._overflow) and
+                time.ticks_diff(now, self._last_byte_us) >= self._inter_frame_delay):
+            if not self._overflow:
+                self._complete_frame()
+            self._start_frame()
+
+    @property
+    def pending(self) -> int:
+        """
+        Get the amount of completed frames in the queue
+
+        :returns:   Amount of queued frames
+        :rtype:     int
+        """
+        return (self._write - self._read) % len(self._slots)
+
+    def get_frame(self, timeout: Optional[int] = None) -> Optional[bytes]:
+        """
+        Get the oldest completed frame
+
+        The CRC state of the returned frame is available as
+        :py:attr:`last_crc_valid`.
+
+        :param      timeout:  Time to wait for a frame in microseconds,
+                              0 or None to return immediately
+        :type       timeout:  Optional[int]
+
+        :returns:   The frame including its CRC, None if there is none
+        :rtype:     Optional[bytes]
+        """
+        if timeout:
+            start_us = time.ticks_us()
+            while self._read == self._write:
+                if time.ticks_diff(time.ticks_us(), start_us) > timeout:
+                    return None
+                # sleep until the next interrupt
+                machine.idle()
+
+        slot = self._read
+        if slot == self._write:
+            return None
+
+        frame = bytes(self._slots[slot][:self._lengths[slot]])
+        self.last_crc_valid = bool(self._crc_valid[slot])
+        self._read = (slot + 1) % len(self._slots)
+        return frame
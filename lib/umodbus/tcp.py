@@ -10,6 +10,9 @@
 
 # system packages
 # import random
+from collections import deque
+import errno
+import select
 import struct
 import socket
 import time
@@ -37,7 +40,8 @@ class ModbusTCP(Modbus):
     def bind(self,
              local_ip: str,
              local_port: int = 502,
-             max_connections: int = 10) -> None:
+             max_connections: int = 10,
+             idle_timeout: Optional[int] = None) -> None:
         """
         Bind IP and port for incomming requests
 
@@ -47,8 +51,12 @@ class ModbusTCP(Modbus):
         :type       local_port:       int
         :param      max_connections:  Number of maximum connections
         :type       max_connections:  int
+        :param      idle_timeout:     Time in milliseconds after which a
+                                      client without requests is closed,
+                                      None to keep clients connected
+        :type       idle_timeout:     Optional[int]
         """
-        self._itf.bind(local_ip, local_port, max_connections)
+        self._itf.bind(local_ip, local_port, max_connections, idle_timeout)
 
     def get_bound_status(self) -> bool:
         """
@@ -67,25 +75,117 @@ class TCP(CommonModbusFunctions):
     """
     TCP class handling socket connections and parsing the Modbus data
 
-    :param      slave_ip:    IP of this device listening for requests
-    :type       slave_ip:    str
-    :param      slave_port:  Port of this device
-    :type       slave_port:  int
-    :param      timeout:     Socket timeout in seconds
-    :type       timeout:     float
+    The connection is managed by the class. A broken connection is
+    reopened on the next request, after a failed attempt the next one is
+    made no earlier than the backoff time, which doubles with every failure
+    up to ``max_backoff``. Responses are matched by transaction ID, late
+    responses to timed out requests are discarded.
+
+    :param      slave_ip:         IP of this device listening for requests
+    :type       slave_ip:         str
+    :param      slave_port:       Port of this device
+    :type       slave_port:       int
+    :param      timeout:          Response timeout in seconds
+    :type       timeout:          float
+    :param      connect_timeout:  Connect timeout in seconds, None to use
+                                  the response timeout
+    :type       connect_timeout:  Optional[float]
+    :param      retries:          Amount of times a request is sent again
+                                  on a new connection if the connection broke
+    :type       retries:          int
+    :param      backoff:          Initial time between reconnects in seconds
+    :type       backoff:          float
+    :param      max_backoff:      Maximum time between reconnects in seconds
+    :type       max_backoff:      float
     """
     def __init__(self,
                  slave_ip: str,
                  slave_port: int = 502,
-                 timeout: float = 5.0):
-        self._sock = socket.socket()
+                 timeout: float = 5.0,
+                 connect_timeout: Optional[float] = None,
+                 retries: int = 1,
+                 backoff: float = 0.5,
+                 max_backoff: float = 30.0):
+        self._sock = None
         self.trans_id_ctr = 0
-
+        self.timeout = timeout
+        self.connect_timeout = timeout if connect_timeout is None else \
+            connect_timeout
+        self.retries = retries
+        self._backoff_min = int(backoff * 1000)
+        self._backoff_max = int(max_backoff * 1000)
+        self._backoff = 0
+        self._last_attempt = time.ticks_ms()
+        self._rx_buf = bytearray()
+
+        # resolve once, reconnects must not depend on DNS
         # print(socket.getaddrinfo(slave_ip, slave_port))
         # [(2, 1, 0, '192.168.178.47', ('192.168.178.47', 502))]
-        self._sock.connect(socket.getaddrinfo(slave_ip, slave_port)[0][-1])
+        self._slave_addr = socket.getaddrinfo(slave_ip, slave_port)[0][-1]
+
+        self.connect()
+
+    @property
+    def connected(self) -> bool:
+        """
+        Get the connection state
+
+        :returns:   True if connected, False otherwise
+        :rtype:     bool
+        """
+        return self._sock is not None
+
+    def connect(self) -> None:
+        """
+        Open the connection to the slave, closing an existing one
+
+        :raises     OSError:  If the connection could not be established
+        """
+        self.close()
+        self._last_attempt = time.ticks_ms()
+
+        sock = socket.socket()
+        try:
+            sock.settimeout(self.connect_timeout)
+            sock.connect(self._slave_addr)
+            sock.settimeout(self.timeout)
+
+            # let the stack detect dead peers between requests
+            keepalive = getattr(socket, 'SO_KEEPALIVE', None)
+            if keepalive is not None:
+                sock.setsockopt(socket.SOL_SOCKET, keepalive, 1)
+        except OSError:
+            sock.close()
+            self._backoff = min(self._backoff_max,
+                                max(self._backoff_min, 2 * self._backoff))
+            raise
+
+        self._sock = sock
+        self._backoff = 0
+
+    def close(self) -> None:
+        """Close the connection to the slave"""
+        if self._sock is not None:
+            try:
+                self._sock.close()
+            except OSError:
+                pass
+            self._sock = None
+        self._rx_buf = bytearray()
+
+    def _ensure_connected(self) -> None:
+        """
+        Reconnect if not connected and the backoff time elapsed
+
+        :raises     OSError:  If not connected
+        """
+        if self._sock is not None:
+            return
+
+        if time.ticks_diff(time.ticks_ms(), self._last_attempt) < self._backoff:
+            raise OSError(errno.ENOTCONN, 'Modbus TCP reconnect backoff')
 
-        self._sock.settimeout(timeout)
+        self.connect()
 
     def _create_mbap_hdr(self,
                          slave_addr: int,
@@ -107,7 +207,7 @@ class TCP(CommonModbusFunctions):
         # trans_id = random.getrandbits(24) & 0xFFFF
         # use incrementing counter as it's faster
         trans_id = self.trans_id_ctr
-        self.trans_id_ctr += 1
+        self.trans_id_ctr = (trans_id + 1) & 0xFFFF
 
         mbap_hdr = struct.pack(
             '>HHHB', trans_id, 0, len(modbus_pdu) + 1, slave_addr)
@@ -153,7 +253,8 @@ class TCP(CommonModbusFunctions):
             raise ValueError('slave returned exception code: {:d}'.
                              format(rec_fc))
 
-        hdr_length = (Const.MBAP_HDR_LENGTH + 2) if count else \n            (Const.MBAP_HDR_LENGTH + 1)
+        hdr_length = (Const.MBAP_HDR_LENGTH + 2) if count else \
+            (Const.MBAP_HDR_LENGTH + 1)
 
         return response[hdr_length:]
 
@@ -164,6 +265,9 @@ class TCP(CommonModbusFunctions):
         """
         Send a modbus message and receive the reponse.
 
+        If the connection is broken, the request is sent again on a new
+        connection up to :py:attr:`retries` times.
+
         :param      slave_addr:    The slave identifier
         :type       slave_addr:    int
         :param      modbus_pdu:  The modbus PDU
@@ -171,14 +275,31 @@ class TCP(CommonModbusFunctions):
         :param      count:       The count
         :type       count:       bool
 
+        :raises     OSError:  If not connected or no response has been
+                              received within the timeout
         :returns:   Modbus data
         :rtype:     bytes
         """
         mbap_hdr, trans_id = self._create_mbap_hdr(slave_addr=slave_addr,
                                                    modbus_pdu=modbus_pdu)
-        self._sock.send(mbap_hdr + modbus_pdu)
 
-        response = self._sock.recv(256)
+        attempt = 0
+        while True:
+            self._ensure_connected()
+            try:
+                self._sock.send(mbap_hdr + modbus_pdu)
+                response = self._receive(trans_id=trans_id)
+                break
+            except OSError as e:
+                if _is_timeout(e):
+                    # the connection is fine, a late response is discarded
+                    # by its transaction ID
+                    raise OSError(errno.ETIMEDOUT, 'Modbus response timeout')
+                self.close()
+                if attempt >= self.retries:
+                    raise
+                attempt += 1
+
         modbus_data = self._validate_resp_hdr(response=response,
                                               trans_id=trans_id,
                                               slave_addr=slave_addr,
@@ -187,66 +308,200 @@ class TCP(CommonModbusFunctions):
 
         return modbus_data
 
+    def _receive(self, trans_id: int) -> bytes:
+        """
+        Receive the response with a transaction ID
 
-class TCPServer(object):
-    """Modbus TCP host class"""
-    def __init__(self):
-        self._sock = None
-        self._client_sock = None
-        self._is_bound = False
+        Responses with other transaction IDs are discarded.
 
-    @property
-    def is_bound(self) -> bool:
-        """
-        Get the IP and port binding status
+        :param      trans_id:  The transaction identifier
+        :type       trans_id:  int
 
-        :returns:   True if bound to IP and port, False otherwise
-        :rtype:     bool
+        :raises     OSError:  If the connection broke or timed out
+        :returns:   MBAP header and PDU of the response
+        :rtype:     bytes
         """
-        return self._is_bound
+        deadline = time.ticks_add(time.ticks_ms(), int(self.timeout * 1000))
+        max_len = Const.TCP_ADU_MAX_LENGTH - Const.MBAP_HDR_LENGTH + 1
+
+        while True:
+            buf = self._rx_buf
+            if len(buf) >= Const.MBAP_HDR_LENGTH - 1:
+                rec_tid, rec_pid, rec_len = struct.unpack_from('>HHH', buf, 0)
+                if rec_pid != 0 or not (2 <= rec_len <= max_len):
+                    # lost track of the frames, start over on a new connection
+                    raise OSError(errno.ECONNRESET, 'invalid MBAP header')
+
+                frame_len = Const.MBAP_HDR_LENGTH - 1 + rec_len
+                if len(buf) >= frame_len:
+                    response = bytes(buf[:frame_len])
+                    self._rx_buf = buf[frame_len:]
+                    if rec_tid == trans_id:
+                        return response
+                    # stale response of a timed out request
+                    continue
+
+            remaining = time.ticks_diff(deadline, time.ticks_ms())
+            if remaining <= 0:
+                raise OSError(errno.ETIMEDOUT, 'Modbus response timeout')
+            self._sock.settimeout(remaining / 1000)
+
+            chunk = self._sock.recv(Const.TCP_ADU_MAX_LENGTH)
+            if not chunk:
+                raise OSError(errno.ECONNRESET, 'connection closed by slave')
+            self._rx_buf.extend(chunk)
+
+
+def _is_timeout(e: OSError) -> bool:
+    """
+    Check whether a socket error is a timeout
 
-    def get_is_bound(self) -> bool:
+    :param      e:    The error
+    :type       e:    OSError
+
+    :returns:   True if the error is a timeout, False otherwise
+    :rtype:     bool
+    """
+    # CPython raises socket.timeout, MicroPython OSError(ETIMEDOUT)
+    timeout_error = getattr(socket, 'timeout', None)
+    if timeout_error is not None and isinstance(e, timeout_error):
+        return True
+    return bool(e.args) and e.args[0] in (errno.ETIMEDOUT, errno.EAGAIN)
+
+
+class TCPConnection(object):
+    """
+    Client connection of a :py:class:`TCPServer`
+
+    Used as interface of the requests received on this connection, so every
+    response goes back to the client it came from, with the transaction ID
+    of its request.
+
+    :param      server:   The server which accepted the connection
+    :type       server:   TCPServer
+    :param      sock:     The client socket
+    :type       sock:     socket.socket
+    :param      address:  The client address
+    :type       address:  tuple
+    """
+    def __init__(self, server, sock: socket.socket, address: tuple) -> None:
+        self._server = server
+        self.sock = sock
+        self.address = address
+        self.last_active = time.ticks_ms()
+        self._req_tid = 0
+        self._rx_buf = bytearray()
+        # responses the non-blocking socket did not take yet
+        self._tx_pending = bytearray()
+
+        # poll() returns file descriptors instead of socket objects on CPython
+        try:
+            self.fileno = sock.fileno()
+        except Exception:
+            self.fileno = None
+
+    def close(self) -> None:
+        """Close the client socket"""
+        try:
+            self.sock.close()
+        except OSError:
+            pass
+
+    @property
+    def buffered(self) -> int:
         """
-        Get the IP and port binding status, legacy support.
+        Get the amount of received bytes not yet decoded
 
-        :returns:   True if bound to IP and port, False otherwise
-        :rtype:     bool
+        :returns:   Amount of bytes in the receive buffer
+        :rtype:     int
         """
-        return self._is_bound
+        return len(self._rx_buf)
 
-    def bind(self,
-             local_ip: str,
-             local_port: int = 502,
-             max_connections: int = 10):
+    def receive(self) -> None:
         """
-        Bind IP and port for incomming requests
+        Append the data available on the client socket to the receive buffer
 
-        :param      local_ip:         IP of this device listening for requests
-        :type       local_ip:         str
-        :param      local_port:       Port of this device
-        :type       local_port:       int
-        :param      max_connections:  Number of maximum connections
-        :type       max_connections:  int
+        Nothing is read while the receive buffer is full, the data stays in
+        the socket until the buffered requests have been processed.
+
+        :raises     OSError:  If the connection has been closed or is broken
         """
-        if self._client_sock:
-            self._client_sock.close()
+        free = Const.TCP_RX_BUFFER_LENGTH - len(self._rx_buf)
+        if free <= 0:
+            return
 
-        if self._sock:
-            self._sock.close()
+        chunk = self.sock.recv(free)
 
-        self._sock = socket.socket()
+        if len(chunk) == 0:
+            raise OSError('connection closed by client')
 
-        # print(socket.getaddrinfo(local_ip, local_port))
-        # [(2, 1, 0, '192.168.178.47', ('192.168.178.47', 502))]
-        self._sock.bind(socket.getaddrinfo(local_ip, local_port)[0][-1])
+        self.last_active = time.ticks_ms()
+        self._rx_buf.extend(chunk)
 
-        self._sock.listen(max_connections)
+    def decode(self, unit_addr_list: Optional[list], queue: deque) -> None:
+        """
+        Decode all complete ADUs of the receive buffer into a queue
 
-        self._is_bound = True
+        The MBAP length field is used to split the byte stream, so requests
+        split across TCP segments as well as several pipelined requests in
+        one segment are handled. Each queue entry is a tuple of this
+        connection, the transaction ID, the request or None and the
+        :py:class:`umodbus.common.ModbusException` to answer with or None.
+
+        :param      unit_addr_list:  The unit address list
+        :type       unit_addr_list:  Optional[list]
+        :param      queue:           The queue of decoded requests
+        :type       queue:           deque
+
+        :raises     OSError:  If an invalid MBAP header has been received
+        """
+        buf = self._rx_buf
+        start = 0
+
+        try:
+            while (len(buf) - start >= Const.MBAP_HDR_LENGTH - 1 and
+                    len(queue) < Const.TCP_REQUEST_QUEUE_LENGTH):
+                req_tid, req_pid, req_len = struct.unpack_from('>HHH', buf, start)
+
+                if (req_pid != 0):
+                    raise OSError('Modbus request error: PID not 0')
+
+                if not (2 <= req_len <= Const.TCP_ADU_MAX_LENGTH - Const.MBAP_HDR_LENGTH + 1):
+                    raise OSError('Modbus request error: invalid length')
+
+                end = start + Const.MBAP_HDR_LENGTH - 1 + req_len
+                if end > len(buf):
+                    # rest of this ADU is still on its way
+                    break
+
+                # consumed before decoding, a bad request is never seen twice
+                req_uid_and_pdu = buf[start + Const.MBAP_HDR_LENGTH - 1:end]
+                start = end
+
+                if ((unit_addr_list is not None) and (req_uid_and_pdu[0] not in unit_addr_list)):
+                    continue
+
+                try:
+                    request = self._server._request_class(self, req_uid_and_pdu)
+                except ModbusException as e:
+                    # answered in order with the other requests of this client
+                    e.unit_addr = req_uid_and_pdu[0]
+                    queue.append((self, req_tid, None, e))
+                except Exception:
+                    # undecodable PDU, must not stop the server
+                    e = ModbusException(req_uid_and_pdu[1],
+                                        Const.ILLEGAL_DATA_VALUE)
+                    e.unit_addr = req_uid_and_pdu[0]
+                    queue.append((self, req_tid, None, e))
+                else:
+                    queue.append((self, req_tid, request, None))
+        finally:
+            if start:
+                del buf[:start]
 
     def _send(self, modbus_pdu: bytes, slave_addr: int) -> None:
         """
-        Send Modbus Protocol Data Unit to slave
+        Send Modbus Protocol Data Unit to the client
 
         :param      modbus_pdu:  The Modbus Protocol Data Unit
         :type       modbus_pdu:  bytes
@@ -254,9 +509,79 @@ class TCPServer(object):
         :type       slave_addr:  int
         """
         size = len(modbus_pdu)
-        fmt = 'B' * size
-        adu = struct.pack('>HHHB' + fmt, self._req_tid, 0, size + 1, slave_addr, *modbus_pdu)
-        self._client_sock.send(adu)
+        self._server._tx_buf[Const.MBAP_HDR_LENGTH:Const.MBAP_HDR_LENGTH + size] = \
+            modbus_pdu
+        self._write_adu(pdu_length=size, slave_addr=slave_addr)
+
+    def _write_adu(self, pdu_length: int, slave_addr: int) -> None:
+        """
+        Prepend the MBAP header to the PDU in the transmit buffer and send it
+
+        :param      pdu_length:  The length of the PDU in the transmit buffer
+        :type       pdu_length:  int
+        :param      slave_addr:  The slave address
+        :type       slave_addr:  int
+        """
+        struct.pack_into('>HHHB',
+                         self._server._tx_buf,
+                         0,
+                         self._req_tid,
+                         0,
+                         pdu_length + 1,
+                         slave_addr)
+        self._transmit(
+            self._server._tx_view[:Const.MBAP_HDR_LENGTH + pdu_length])
+
+    def _transmit(self, adu: memoryview) -> None:
+        """
+        Send an ADU, the part the socket does not take is sent by
+        :py:meth:`flush` once the socket is writable again
+
+        A broken connection or a client not taking its responses is closed
+        instead of raising an error, the other clients are still served.
+
+        :param      adu:  The ADU
+        :type       adu:  memoryview
+        """
+        if not self._tx_pending:
+            try:
+                sent = self.sock.send(adu)
+            except OSError as e:
+                if not _is_timeout(e):
+                    self._server._close(self)
+                    return
+                sent = 0
+
+            if sent >= len(adu):
+                return
+            adu = adu[sent:]
+
+        if len(self._tx_pending) + len(adu) > Const.TCP_TX_BUFFER_LENGTH:
+            self._server._close(self)
+            return
+
+        self._tx_pending.extend(adu)
+        self._server._poll_writable(self, True)
+
+    def flush(self) -> bool:
+        """
+        Send the responses the socket did not take before
+
+        :returns:   True if all responses have been sent, False otherwise
+        :rtype:     bool
+
+        :raises     OSError:  If the connection is broken
+        """
+        if self._tx_pending:
+            try:
+                sent = self.sock.send(self._tx_pending)
+            except OSError as e:
+                if not _is_timeout(e):
+                    raise
+                sent = 0
+            del self._tx_pending[:sent]
+
+        return not self._tx_pending
 
     def send_response(self,
                       slave_addr: int,
@@ -292,6 +617,35 @@ class TCPServer(object):
                                         signed)
         self._send(modbus_pdu, slave_addr)
 
+    def send_read_response(self,
+                           slave_addr: int,
+                           function_code: int,
+                           request_register_addr: int,
+                           request_register_qty: int,
+                           bank) -> None:
+        """
+        Send a read response to a client, encoded in the transmit buffer.
+
+        :param      slave_addr:             The slave address
+        :type       slave_addr:             int
+        :param      function_code:          The function code
+        :type       function_code:          int
+        :param      request_register_addr:  The request register address
+        :type       request_register_addr:  int
+        :param      request_register_qty:   The request register qty
+        :type       request_register_qty:   int
+        :param      bank:                   The register bank to read from
+        :type       bank:                   umodbus.registers.RegisterBank
+        """
+        pdu_length = functions.read_response_into(
+            buf=self._server._tx_buf,
+            offset=Const.MBAP_HDR_LENGTH,
+            function_code=function_code,
+            bank=bank,
+            register_addr=request_register_addr,
+            quantity=request_register_qty)
+        self._write_adu(pdu_length=pdu_length, slave_addr=slave_addr)
+
     def send_exception_response(self,
                                 slave_addr: int,
                                 function_code: int,
@@ -310,73 +664,292 @@ class TCPServer(object):
                                                   exception_code)
         self._send(modbus_pdu, slave_addr)
 
+
+class TCPServer(object):
+    """
+    Modbus TCP host class
+
+    :param      request_class:  The class received requests are decoded with
+    :type       request_class:  type
+    """
+    def __init__(self, request_class: type = Request):
+        self._request_class = request_class
+        self._sock = None
+        self._sock_fileno = None
+        self._is_bound = False
+        self._poller = None
+        self._clients = []
+        self._max_connections = 10
+        self._idle_timeout = None
+        self._requests = deque((), Const.TCP_REQUEST_QUEUE_LENGTH)
+
+        # preallocated transmit buffer, MBAP header + PDU
+        self._tx_buf = bytearray(Const.TCP_ADU_MAX_LENGTH)
+        self._tx_view = memoryview(self._tx_buf)
+
+    @property
+    def is_bound(self) -> bool:
+        """
+        Get the IP and port binding status
+
+        :returns:   True if bound to IP and port, False otherwise
+        :rtype:     bool
+        """
+        return self._is_bound
+
+    def get_is_bound(self) -> bool:
+        """
+        Get the IP and port binding status, legacy support.
+
+        :returns:   True if bound to IP and port, False otherwise
+        :rtype:     bool
+        """
+        return self._is_bound
+
+    @property
+    def connections(self) -> list:
+        """
+        Get the currently connected clients
+
+        :returns:   The client connections
+        :rtype:     List[TCPConnection]
+        """
+        return self._clients
+
+    def bind(self,
+             local_ip: str,
+             local_port: int = 502,
+             max_connections: int = 10,
+             idle_timeout: Optional[int] = None):
+        """
+        Bind IP and port for incomming requests
+
+        :param      local_ip:         IP of this device listening for requests
+        :type       local_ip:         str
+        :param      local_port:       Port of this device
+        :type       local_port:       int
+        :param      max_connections:  Number of maximum connections
+        :type       max_connections:  int
+        :param      idle_timeout:     Time in milliseconds after which a
+                                      client without requests is closed,
+                                      None to keep clients connected
+        :type       idle_timeout:     Optional[int]
+        """
+        for conn in self._clients:
+            conn.close()
+        self._clients = []
+
+        if self._sock:
+            self._sock.close()
+
+        self._sock = socket.socket()
+
+        # print(socket.getaddrinfo(local_ip, local_port))
+        # [(2, 1, 0, '192.168.178.47', ('192.168.178.47', 502))]
+        self._sock.bind(socket.getaddrinfo(local_ip, local_port)[0][-1])
+
+        self._sock.listen(max_connections)
+        self._sock.setblocking(False)
+
+        self._max_connections = max_connections
+        self._idle_timeout = idle_timeout
+
+        self._poller = select.poll()
+        self._poller.register(self._sock, select.POLLIN)
+
+        # poll() returns file descriptors instead of socket objects on CPython
+        try:
+            self._sock_fileno = self._sock.fileno()
+        except Exception:
+            self._sock_fileno = None
+
+        self._is_bound = True
+
+    def _accept(self) -> None:
+        """Accept a new client, closing the least active one if full"""
+        try:
+            client_sock, client_address = self._sock.accept()
+        except OSError:
+            # client gone again before being accepted
+            return
+
+        if len(self._clients) >= self._max_connections:
+            oldest = self._clients[0]
+            for conn in self._clients:
+                if time.ticks_diff(oldest.last_active, conn.last_active) > 0:
+                    oldest = conn
+            self._close(oldest)
+
+        client_sock.setblocking(False)
+        self._clients.append(TCPConnection(self, client_sock, client_address))
+        self._poller.register(client_sock, select.POLLIN)
+
+    def _close(self, conn: TCPConnection) -> None:
+        """
+        Close a client connection
+
+        :param      conn:  The connection
+        :type       conn:  TCPConnection
+        """
+        try:
+            self._poller.unregister(conn.sock)
+        except Exception:
+            pass
+        conn.close()
+        if conn in self._clients:
+            self._clients.remove(conn)
+
+    def _poll_writable(self, conn: TCPConnection, writable: bool) -> None:
+        """
+        Set whether a client is polled for being writable
+
+        :param      conn:      The connection
+        :type       conn:      TCPConnection
+        :param      writable:  Poll for writable as well as for readable
+        :type       writable:  bool
+        """
+        if self._poller is None:
+            return
+
+        if writable:
+            self._poller.modify(conn.sock, select.POLLIN | select.POLLOUT)
+        else:
+            self._poller.modify(conn.sock, select.POLLIN)
+
+    def _evict_idle(self) -> None:
+        """Close all clients without request within the idle timeout"""
+        if self._idle_timeout is None:
+            return
+
+        now = time.ticks_ms()
+        for conn in list(self._clients):
+            if time.ticks_diff(now, conn.last_active) > self._idle_timeout:
+                self._close(conn)
+
+    def _lookup(self, obj) -> Optional[TCPConnection]:
+        """
+        Get the connection of a polled object
+
+        :param      obj:  The socket or file descriptor reported by poll()
+        :type       obj:  Union[socket.socket, int]
+
+        :returns:   The connection, None if unknown
+        :rtype:     Optional[TCPConnection]
+        """
+        for conn in self._clients:
+            if obj is conn.sock or (conn.fileno is not None and
+                                    obj == conn.fileno):
+                return conn
+        return None
+
+    @property
+    def pending(self) -> int:
+        """
+        Get the amount of received requests waiting to be processed
+
+        :returns:   Amount of decoded requests
+        :rtype:     int
+        """
+        return len(self._requests)
+
+    def _next_request(self) -> Union[Request, None]:
+        """
+        Get the oldest decoded request
+
+        Requests which failed to decode are answered with their exception
+        on the way, so all responses leave in the order of the requests.
+
+        :returns:   The oldest pending request or None.
+        :rtype:     Union[Request, None]
+        """
+        while len(self._requests):
+            conn, req_tid, request, error = self._requests.popleft()
+            if conn not in self._clients:
+                # connection closed in the meantime
+                continue
+
+            # the response to this request is sent with its transaction ID
+            conn._req_tid = req_tid
+
+            if error is None:
+                return request
+
+            try:
+                conn.send_exception_response(error.unit_addr,
+                                             error.function_code,
+                                             error.exception_code)
+            except OSError:
+                self._close(conn)
+
+        return None
+
     def _accept_request(self,
                         accept_timeout: float,
                         unit_addr_list: list) -> Union[Request, None]:
         """
-        Accept, read and decode a socket based request
+        Poll all sockets, accept new clients and decode received requests
 
-        :param      accept_timeout:  The socket accept timeout
+        :param      accept_timeout:  The poll timeout in seconds
         :type       accept_timeout:  float
         :param      unit_addr_list:  The unit address list
         :type       unit_addr_list:  list
-        """
-        self._sock.settimeout(accept_timeout)
-        new_client_sock = None
 
-        try:
-            new_client_sock, client_address = self._sock.accept()
-        except OSError as e:
-            if e.args[0] != 11:     # 11 = timeout expired
-                raise e
+        :returns:   The oldest pending request or None.
+        :rtype:     Union[Request, None]
+        """
+        request = self._next_request()
+        if request is not None:
+            return request
+
+        self._evict_idle()
+
+        # ADUs left in a buffer while the request queue was full
+        for conn in list(self._clients):
+            if conn.buffered:
+                try:
+                    conn.decode(unit_addr_list, self._requests)
+                except OSError:
+                    self._close(conn)
+
+        if accept_timeout is None:
+            timeout_ms = -1
+        elif len(self._requests):
+            timeout_ms = 0
+        else:
+            timeout_ms = int(accept_timeout * 1000)
 
-        if new_client_sock is not None:
-            if self._client_sock is not None:
-                self._client_sock.close()
+        for obj, event in self._poller.poll(timeout_ms):
+            if obj is self._sock or obj == self._sock_fileno:
+                self._accept()
+                continue
 
-            self._client_sock = new_client_sock
+            conn = self._lookup(obj)
+            if conn is None:
+                continue
 
-            # recv() timeout, setting to 0 might lead to the following error
-            # "Modbus request error: [Errno 11] EAGAIN"
-            # This is a socket timeout error
-            self._client_sock.settimeout(0.5)
+            if event & (select.POLLHUP | select.POLLERR):
+                self._close(conn)
+                continue
 
-        if self._client_sock is not None:
-            try:
-                req = self._client_sock.recv(128)
+            if event & select.POLLOUT:
+                try:
+                    if conn.flush():
+                        self._poll_writable(conn, False)
+                except OSError:
+                    self._close(conn)
+                    continue
 
-                if len(req) == 0:
-                    return None
+            if not event & select.POLLIN:
+                continue
 
-                req_header_no_uid = req[:Const.MBAP_HDR_LENGTH - 1]
-                self._req_tid, req_pid, req_len = struct.unpack('>HHH', req_header_no_uid)
-                req_uid_and_pdu = req[Const.MBAP_HDR_LENGTH - 1:Const.MBAP_HDR_LENGTH + req_len - 1]
+            try:
+                conn.receive()
+                conn.decode(unit_addr_list, self._requests)
             except OSError:
-                # MicroPython raises an OSError instead of socket.timeout
-                # print("Socket OSError aka TimeoutError: {}".format(e))
-                return None
-            except Exception:
-                # print("Modbus request error:", e)
-                self._client_sock.close()
-                self._client_sock = None
-                return None
-
-            if (req_pid != 0):
-                # print("Modbus request error: PID not 0")
-                self._client_sock.close()
-                self._client_sock = None
-                return None
-
-            if ((unit_addr_list is not None) and (req_uid_and_pdu[0] not in unit_addr_list)):
-                return None
+                # closed or broken connection, or invalid MBAP header
+                self._close(conn)
 
-            try:
-                return Request(self, req_uid_and_pdu)
-            except ModbusException as e:
-                self.send_exception_response(req[0],
-                                             e.function_code,
-                                             e.exception_code)
-                return None
+        return self._next_request()
 
     def get_request(self,
                     unit_addr_list: Optional[list] = None,
@@ -386,7 +959,8 @@ class TCPServer(object):
 
         :param      unit_addr_list:  The unit address list
         :type       unit_addr_list:  Optional[list]
-        :param      timeout:         The timeout
+        :param      timeout:         The timeout in milliseconds, 0 to
+                                     return immediately, None to wait
         :type       timeout:         int
 
         :returns:   A request object or None.
@@ -397,19 +971,20 @@ class TCPServer(object):
         if self._sock is None:
             raise Exception('Modbus TCP server not bound')
 
-        if timeout > 0:
+        if timeout is None:
+            while True:
+                req = self._accept_request(None, unit_addr_list)
+                if req:
+                    return req
+        elif timeout > 0:
             start_ms = time.ticks_ms()
             elapsed = 0
-            while True:
-                if self._client_sock is None:
-                    accept_timeout = None if timeout is None else (timeout - elapsed) / 1000
-                else:
-                    accept_timeout = 0
-                req = self._accept_request(accept_timeout, unit_addr_list)
+            while elapsed <= timeout:
+                req = self._accept_request((timeout - elapsed) / 1000,
+                                           unit_addr_list)
                 if req:
                     return req
-                elapsed = time.ticks_diff(start_ms, time.ticks_ms())
-                if elapsed > timeout:
-                    return None
+                elapsed = time.ticks_diff(time.ticks_ms(), start_ms)
+            return None
         else:
             return self._accept_request(0, unit_addr_list)
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+"""
+Simulation of the Pico W for running the firmware on a host
+
+:py:func:`install` registers simulated ``machine``, ``micropython``,
+``network``, ``rp2`` and ``urequests`` modules and patches the ticks and
+sleep functions of ``time``. It has to be called before any firmware module
+is imported::
+
+    import sim
+    clock = sim.install()
+
+    from smart_home.entry_point import HomeService
+
+``python3 -m sim`` runs the main loop of :py:class:`HomeService` and reports
+its timing, see :py:mod:`sim.__main__`.
+"""
+
+# system packages
+import sys
+
+# custom packages
+from . import clock as _clock
+
+#: Modules replaced by the simulation
+MODULES = ('machine', 'micropython', 'network', 'rp2', 'urequests')
+
+# the replaced modules, None where there was none
+_host_modules = {}
+
+
+def install(realtime: bool = False, tick_cost_us: int = 1):
+    """
+    Replace the device modules by their simulation
+
+    :param      realtime:      Follow the host's monotonic clock instead of
+                               a virtual clock
+    :type       realtime:      bool
+    :param      tick_cost_us:  Microseconds every read of the virtual clock
+                               takes
+    :type       tick_cost_us:  int
+
+    :returns:   The clock of the simulation
+    :rtype:     sim.clock.Clock
+    """
+    clock = _clock.configure(realtime=realtime, tick_cost_us=tick_cost_us)
+    _clock.patch_time()
+
+    for name in MODULES:
+        __import__('sim.' + name)
+        if name not in _host_modules:
+            _host_modules[name] = sys.modules.get(name, None)
+        sys.modules[name] = sys.modules['sim.' + name]
+
+    return clock
+
+
+def uninstall() -> None:
+    """
+    Restore the modules and time functions replaced by :py:func:`install`
+
+    Firmware modules imported in between keep using the simulation.
+    """
+    for name, module in _host_modules.items():
+        if module is None:
+            del sys.modules[name]
+        else:
+            sys.modules[name] = module
+    _host_modules.clear()
+
+    _clock.restore_time()
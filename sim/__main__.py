@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+"""
+Run the firmware main loop in the simulation
+
+From the repository root::
+
+    python3 -m sim [--realtime] [--rate HZ] [--duration S] [--quiet]
+                   [--press NAME:AT_MS:HOLD_MS ...] [--profile]
+
+The main loop runs at the given rate. Afterwards the time per loop, per DMX
+service call sending a frame and between the sent DMX frames is reported,
+as simulated time on the device clock and as CPU time of the host.
+"""
+
+# system packages
+import io
+import os
+import sys
+import time
+from contextlib import redirect_stdout
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'lib'))
+sys.path.insert(0, ROOT)
+
+import sim      # noqa: E402
+
+
+class Stats(object):
+    """Samples of a duration in microseconds"""
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.samples = []
+
+    def add(self, us) -> None:
+        self.samples.append(us)
+
+    def row(self) -> str:
+        samples = sorted(self.samples)
+        if not samples:
+            return '{:<24} {:>8}'.format(self.name, 0)
+
+        def percentile(percent):
+            return samples[min(len(samples) - 1,
+                               (len(samples) * percent) // 100)]
+
+        return '{:<24} {:>8} {:>10} {:>10} {:>10}'.format(
+            self.name, len(samples), int(percentile(50)),
+            int(percentile(99)), int(samples[-1]))
+
+
+def _timed(func, sim_stats, cpu_stats, clock):
+    # only calls doing something, returning True, are recorded
+    def wrapper(*args, **kwargs):
+        start_us = clock.now_us()
+        start_ns = time.perf_counter_ns()
+        result = func(*args, **kwargs)
+        if result:
+            cpu_stats.add((time.perf_counter_ns() - start_ns) // 1000)
+            sim_stats.add(clock.now_us() - start_us)
+        return result
+    return wrapper
+
+
+def _schedule_press(clock, buttons, spec) -> None:
+    from sim import machine
+
+    name, at_ms, hold_ms = spec.split(':')
+    button = [btn for btn in buttons if btn['name'] == name]
+    if not button:
+        raise SystemExit('unknown button: {}'.format(name))
+    pin = button[0]['pin']
+    # a pulled up button is pressed at low level
+    pressed = 0 if button[0]['pull'] == 'Up' else 1
+
+    press_us = int(at_ms) * 1000
+    clock.call_at(press_us, lambda: machine.drive(pin, pressed))
+    clock.call_at(press_us + int(hold_ms) * 1000,
+                  lambda: machine.drive(pin, not pressed))
+
+
+def run(rate: int = 1000,
+        duration: float = 5.0,
+        realtime: bool = False,
+        quiet: bool = False,
+        presses=()) -> None:
+    """
+    Run the main loop of the home service and report its timing
+
+    :param      rate:      Main loop iterations per second
+    :type       rate:      int
+    :param      duration:  Simulated time to run in seconds
+    :type       duration:  float
+    :param      realtime:  Run on the host's clock instead of a virtual one
+    :type       realtime:  bool
+    :param      quiet:     Hide the output of the firmware
+    :type       quiet:     bool
+    :param      presses:   Button presses as NAME:AT_MS:HOLD_MS
+    :type       presses:   Iterable[str]
+    """
+    clock = sim.install(realtime=realtime)
+
+    import rp2
+    from smart_home.config import ButtonsConfig
+    from smart_home.entry_point import HomeService
+
+    output = io.StringIO() if quiet else sys.stdout
+    loop_sim, loop_cpu = Stats('loop sim us'), Stats('loop cpu us')
+    dmx_sim, dmx_cpu = Stats('dmx send sim us'), Stats('dmx send cpu us')
+    overruns = 0
+
+    with redirect_stdout(output):
+        home = HomeService()
+        home.dmx.service = _timed(home.dmx.service, dmx_sim, dmx_cpu, clock)
+
+        for spec in presses:
+            _schedule_press(clock, ButtonsConfig.buttons, spec)
+
+        period_us = 1000000 // rate
+        start_us = clock.now_us()
+        end_us = start_us + int(duration * 1000000)
+        next_us = start_us
+        while clock.now_us() < end_us:
+            loop_start_us = clock.now_us()
+            start_ns = time.perf_counter_ns()
+            home()
+            loop_cpu.add((time.perf_counter_ns() - start_ns) // 1000)
+            loop_sim.add(clock.now_us() - loop_start_us)
+
+            next_us += period_us
+            remaining = next_us - clock.now_us()
+            if remaining > 0:
+                clock.sleep_us(remaining)
+            else:
+                overruns += 1
+                next_us = clock.now_us()
+
+    frames = []
+    for sm in rp2.state_machines.values():
+        frames.extend(sm.frames)
+        # the latest frame is recorded with the next restart only
+        latest = sm.last_frame()
+        if latest is not None and latest not in frames:
+            frames.append(latest)
+    frames.sort(key=lambda frame: frame.timestamp_us)
+    frame_interval = Stats('dmx frame interval us')
+    for previous, frame in zip(frames, frames[1:]):
+        frame_interval.add(frame.timestamp_us - previous.timestamp_us)
+
+    print('{} clock, {} s at {} Hz, {} overruns, {} DMX frames, '
+          '{} truncated'.format('realtime' if realtime else 'virtual',
+                                duration, rate, overruns, len(frames),
+                                sum(1 for frame in frames if frame.truncated)))
+    print('{:<24} {:>8} {:>10} {:>10} {:>10}'.format(
+        'timing', 'count', 'p50', 'p99', 'max'))
+    for stats in (loop_sim, loop_cpu, dmx_sim, dmx_cpu, frame_interval):
+        print(stats.row())
+
+
+def main(argv) -> None:
+    options = {'presses': []}
+    profile = False
+    args = list(argv)
+    while args:
+        arg = args.pop(0)
+        if arg == '--realtime':
+            options['realtime'] = True
+        elif arg == '--quiet':
+            options['quiet'] = True
+        elif arg == '--rate':
+            options['rate'] = int(args.pop(0))
+        elif arg == '--duration':
+            options['duration'] = float(args.pop(0))
+        elif arg == '--press':
+            options['presses'].append(args.pop(0))
+        elif arg == '--profile':
+            profile = True
+        else:
+            raise SystemExit(__doc__)
+
+    if not profile:
+        run(**options)
+        return
+
+    import cProfile
+    import pstats
+
+    profiler = cProfile.Profile()
+    profiler.runcall(run, **options)
+    pstats.Stats(profiler).sort_stats('cumulative').print_stats(25)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+"""
+Clock of the simulation
+
+All simulated peripherals take their time from one :py:class:`Clock`. It
+either follows the host's monotonic clock (realtime) or is virtual and only
+moves on when the firmware sleeps, idles or reads it, so runs are
+deterministic and independent of the host's speed.
+
+Timer callbacks and other scheduled events run whenever the clock moves on,
+which on the device corresponds to soft interrupts between bytecodes.
+"""
+
+# system packages
+import heapq
+import time
+
+#: Period of the MicroPython ticks functions
+TICKS_PERIOD = 1 << 30
+TICKS_MAX = TICKS_PERIOD - 1
+TICKS_HALF = TICKS_PERIOD // 2
+
+# the host functions, before time gets patched
+_host_sleep = time.sleep
+_host_monotonic_ns = time.monotonic_ns
+
+
+class Clock(object):
+    """
+    Simulated clock with scheduled events
+
+    :param      realtime:      Follow the host's monotonic clock instead of a
+                               virtual one
+    :type       realtime:      bool
+    :param      tick_cost_us:  Microseconds every read of the virtual clock
+                               takes, so polling loops without sleep end
+    :type       tick_cost_us:  int
+    """
+    def __init__(self, realtime: bool = False, tick_cost_us: int = 1) -> None:
+        self.realtime = realtime
+        self.tick_cost_us = tick_cost_us
+        self._origin_ns = _host_monotonic_ns()
+        self._now_us = 0
+        # heap of [due time in us, sequence number, callback]
+        self._events = []
+        self._seq = 0
+        self._firing = False
+
+    def now_us(self) -> int:
+        """
+        Get the time since the start of the simulation
+
+        :returns:   Time in microseconds, not wrapped
+        :rtype:     int
+        """
+        if self.realtime:
+            return (_host_monotonic_ns() - self._origin_ns) // 1000
+        return self._now_us
+
+    def read_us(self) -> int:
+        """
+        Read the clock as the firmware does
+
+        A read takes :py:attr:`tick_cost_us` on the virtual clock and runs
+        the events that became due.
+
+        :returns:   Time in microseconds, not wrapped
+        :rtype:     int
+        """
+        if not self.realtime and self.tick_cost_us:
+            self.advance(self.tick_cost_us)
+        else:
+            self.run_due()
+        return self.now_us()
+
+    def call_at(self, due_us: int, callback) -> list:
+        """
+        Schedule a callback
+
+        :param      due_us:    The time to run the callback at
+        :type       due_us:    int
+        :param      callback:  Function called without arguments
+        :type       callback:  Callable[[], None]
+
+        :returns:   Handle to cancel the callback with
+        :rtype:     list
+        """
+        self._seq += 1
+        event = [due_us, self._seq, callback]
+        heapq.heappush(self._events, event)
+        return event
+
+    def cancel(self, event: list) -> None:
+        """
+        Cancel a scheduled callback
+
+        :param      event:  The handle returned by :py:meth:`call_at`
+        :type       event:  list
+        """
+        event[2] = None
+
+    def next_due_us(self):
+        """
+        Get the time of the next scheduled callback
+
+        :returns:   Time in microseconds, None if nothing is scheduled
+        :rtype:     Optional[int]
+        """
+        while self._events and self._events[0][2] is None:
+            heapq.heappop(self._events)
+        return self._events[0][0] if self._events else None
+
+    def run_due(self) -> None:
+        """Run all callbacks due by now"""
+        self._run_until(self.now_us())
+
+    def _run_until(self, end_us: int) -> None:
+        if self._firing:
+            # callbacks do not nest, like soft interrupts
+            return
+
+        self._firing = True
+        try:
+            while True:
+                due = self.next_due_us()
+                if due is None or due > end_us:
+                    break
+                event = heapq.heappop(self._events)
+                if not self.realtime and due > self._now_us:
+                    self._now_us = due
+                event[2]()
+        finally:
+            self._firing = False
+
+    def advance(self, us: int) -> None:
+        """
+        Move the clock on and run the callbacks becoming due meanwhile
+
+        :param      us:   Microseconds to move on, waits on a realtime clock
+        :type       us:   int
+        """
+        if self.realtime:
+            self.sleep_us(us)
+            return
+
+        end = self._now_us + max(0, int(us))
+        self._run_until(end)
+        if end > self._now_us:
+            self._now_us = end
+
+    def sleep_us(self, us: int) -> None:
+        """
+        Sleep, running callbacks becoming due meanwhile
+
+        :param      us:   Microseconds to sleep
+        :type       us:   int
+        """
+        if not self.realtime:
+            self.advance(us)
+            return
+
+        end = self.now_us() + max(0, int(us))
+        while True:
+            self.run_due()
+            now = self.now_us()
+            if now >= end:
+                break
+            wake = end
+            due = self.next_due_us()
+            if due is not None and due < wake:
+                wake = due
+            _host_sleep(max(0, wake - now) / 1000000)
+
+    def idle(self) -> None:
+        """Wait for the next callback or the next system tick of 1 ms"""
+        now = self.now_us()
+        wake = now + 1000
+        due = self.next_due_us()
+        if due is not None and due < wake:
+            wake = due
+        self.sleep_us(max(1, wake - now))
+
+
+_clock = Clock()
+
+
+def get() -> Clock:
+    """
+    Get the clock of the simulation
+
+    :returns:   The clock
+    :rtype:     Clock
+    """
+    return _clock
+
+
+def configure(realtime: bool = False, tick_cost_us: int = 1) -> Clock:
+    """
+    Replace the clock of the simulation
+
+    :param      realtime:      Follow the host's monotonic clock
+    :type       realtime:      bool
+    :param      tick_cost_us:  Microseconds every read of the virtual clock
+                               takes
+    :type       tick_cost_us:  int
+
+    :returns:   The new clock
+    :rtype:     Clock
+    """
+    global _clock
+    _clock = Clock(realtime=realtime, tick_cost_us=tick_cost_us)
+    return _clock
+
+
+def ticks_us() -> int:
+    return _clock.read_us() & TICKS_MAX
+
+
+def ticks_ms() -> int:
+    return (_clock.read_us() // 1000) & TICKS_MAX
+
+
+def ticks_add(ticks: int, delta: int) -> int:
+    return (ticks + delta) & TICKS_MAX
+
+
+def ticks_diff(ticks1: int, ticks2: int) -> int:
+    return ((ticks1 - ticks2 + TICKS_HALF) & TICKS_MAX) - TICKS_HALF
+
+
+def sleep(seconds: float) -> None:
+    _clock.sleep_us(int(seconds * 1000000))
+
+
+def sleep_ms(ms: int) -> None:
+    _clock.sleep_us(int(ms) * 1000)
+
+
+def sleep_us(us: int) -> None:
+    _clock.sleep_us(int(us))
+
+
+#: Functions of the time module replaced by the simulation
+PATCHED = ('ticks_us', 'ticks_ms', 'ticks_cpu', 'ticks_add', 'ticks_diff',
+           'sleep', 'sleep_ms', 'sleep_us')
+
+# the replaced functions of the time module, None where it had none
+_host_time = {}
+
+
+def patch_time() -> None:
+    """
+    Replace the ticks and sleep functions of the time module
+
+    Modules importing single functions, like ``from time import ticks_ms``,
+    have to be imported afterwards.
+    """
+    if not _host_time:
+        for name in PATCHED:
+            _host_time[name] = getattr(time, name, None)
+
+    time.ticks_us = ticks_us
+    time.ticks_ms = ticks_ms
+    time.ticks_cpu = ticks_us
+    time.ticks_add = ticks_add
+    time.ticks_diff = ticks_diff
+    time.sleep = sleep
+    time.sleep_ms = sleep_ms
+    time.sleep_us = sleep_us
+
+
+def restore_time() -> None:
+    """Undo :py:func:`patch_time`"""
+    for name, func in _host_time.items():
+        if func is None:
+            delattr(time, name)
+        else:
+            setattr(time, name, func)
+    _host_time.clear()
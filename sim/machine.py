@@ -0,0 +1,367 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+"""
+Simulated ``machine`` module
+
+Pins with the same ID share one level, inputs can be driven from outside
+with :py:func:`drive`. UARTs linked with :py:func:`link_uarts` pass the
+written bytes to each other at the speed of their baudrate.
+"""
+
+# system packages
+from collections import deque
+
+# custom packages
+from . import clock as _clock
+
+#: Level of every pin ID
+_levels = {}
+#: Interrupt handlers of every pin ID as [pin, handler, trigger]
+_pin_irqs = {}
+#: Recorded level changes of traced pin IDs as (time in us, level)
+_traces = {}
+
+#: Latest created UART of every ID
+_uarts = {}
+#: Linked UART IDs
+_uart_links = {}
+
+#: Amount of calls of :py:func:`reset`
+resets = 0
+
+
+class Pin(object):
+    """Virtual GPIO"""
+    IN = 0
+    OUT = 1
+    OPEN_DRAIN = 2
+    ALT = 3
+    PULL_UP = 1
+    PULL_DOWN = 2
+    IRQ_FALLING = 4
+    IRQ_RISING = 8
+
+    def __init__(self, id, mode=-1, pull=-1, value=None, **kwargs) -> None:
+        self._id = id
+        self._mode = self.IN
+        self._pull = None
+        self.init(mode=mode, pull=pull, value=value)
+
+    def init(self, mode=-1, pull=-1, value=None, **kwargs) -> None:
+        if mode != -1:
+            self._mode = mode
+        if pull != -1:
+            self._pull = pull
+        if self._id not in _levels:
+            # an unconnected input follows its pull resistor
+            _levels[self._id] = 1 if self._pull == self.PULL_UP else 0
+        if value is not None:
+            _set_level(self._id, value)
+
+    def __repr__(self) -> str:
+        return 'Pin({})'.format(self._id)
+
+    def __call__(self, value=None):
+        return self.value(value)
+
+    def value(self, value=None):
+        if value is None:
+            return _levels[self._id]
+        _set_level(self._id, value)
+
+    def on(self) -> None:
+        _set_level(self._id, 1)
+
+    def off(self) -> None:
+        _set_level(self._id, 0)
+
+    high = on
+    low = off
+
+    def toggle(self) -> None:
+        _set_level(self._id, not _levels[self._id])
+
+    def irq(self, handler=None, trigger=IRQ_FALLING | IRQ_RISING, **kwargs):
+        handlers = [entry for entry in _pin_irqs.get(self._id, [])
+                    if entry[0] is not self]
+        if handler is not None:
+            handlers.append([self, handler, trigger])
+        _pin_irqs[self._id] = handlers
+
+
+def _set_level(pin_id, level) -> None:
+    level = 1 if level else 0
+    previous = _levels.get(pin_id, 0)
+    _levels[pin_id] = level
+    if level == previous:
+        return
+
+    if pin_id in _traces:
+        _traces[pin_id].append((_clock.get().now_us(), level))
+
+    edge = Pin.IRQ_RISING if level else Pin.IRQ_FALLING
+    for pin, handler, trigger in _pin_irqs.get(pin_id, ()):
+        if trigger & edge:
+            handler(pin)
+
+
+def drive(pin_id, level) -> None:
+    """
+    Drive a pin from outside, e.g. press a button
+
+    :param      pin_id:  The pin ID
+    :type       pin_id:  Union[int, str]
+    :param      level:   The level
+    :type       level:   int
+    """
+    _set_level(pin_id, level)
+
+
+def level(pin_id) -> int:
+    """
+    Get the level of a pin
+
+    :param      pin_id:  The pin ID
+    :type       pin_id:  Union[int, str]
+
+    :returns:   The level, 0 if the pin has not been created
+    :rtype:     int
+    """
+    return _levels.get(pin_id, 0)
+
+
+def trace(pin_id, maxlen: int = 1024) -> deque:
+    """
+    Record the level changes of a pin
+
+    :param      pin_id:  The pin ID
+    :type       pin_id:  Union[int, str]
+    :param      maxlen:  Maximum amount of recorded changes
+    :type       maxlen:  int
+
+    :returns:   The changes as (time in us, level), updated as they happen
+    :rtype:     deque
+    """
+    _traces[pin_id] = deque((), maxlen)
+    return _traces[pin_id]
+
+
+class Timer(object):
+    """Virtual timer running its callback on the simulation clock"""
+    ONE_SHOT = 0
+    PERIODIC = 1
+
+    def __init__(self, id=-1, mode=PERIODIC, freq=-1, period=-1,
+                 callback=None, tick_hz=1000) -> None:
+        self._event = None
+        if freq > 0 or period > 0:
+            self.init(mode=mode,
+                      freq=freq,
+                      period=period,
+                      callback=callback,
+                      tick_hz=tick_hz)
+
+    def init(self, mode=PERIODIC, freq=-1, period=-1, callback=None,
+             tick_hz=1000) -> None:
+        self.deinit()
+        if freq > 0:
+            self._period_us = max(1, int(1000000 / freq))
+        else:
+            self._period_us = max(1, int(period * 1000000 / tick_hz))
+        self._mode = mode
+        self._callback = callback
+        clock = _clock.get()
+        self._due = clock.now_us() + self._period_us
+        self._event = clock.call_at(self._due, self._fire)
+
+    def deinit(self) -> None:
+        if self._event is not None:
+            _clock.get().cancel(self._event)
+            self._event = None
+
+    def _fire(self) -> None:
+        if self._mode == self.PERIODIC:
+            self._due += self._period_us
+            self._event = _clock.get().call_at(self._due, self._fire)
+        else:
+            self._event = None
+
+        if self._callback is not None:
+            self._callback(self)
+
+
+class UART(object):
+    """Virtual UART, bytes written arrive at the linked UART"""
+    IRQ_RXIDLE = 1
+
+    def __init__(self, id, baudrate=115200, bits=8, parity=None, stop=1,
+                 **kwargs) -> None:
+        self._id = id
+        self._rx = bytearray()
+        # chunks on the line as [time of first byte end, us per byte, data]
+        self._incoming = deque()
+        self._tx_free_us = 0
+        self._irq_handler = None
+        self._irq_event = None
+        self.init(baudrate=baudrate, bits=bits, parity=parity, stop=stop)
+        _uarts[id] = self
+
+    def init(self, baudrate=115200, bits=8, parity=None, stop=1,
+             **kwargs) -> None:
+        self._baudrate = baudrate
+        frame_bits = 1 + bits + stop + (0 if parity is None else 1)
+        self._byte_us = max(1, (frame_bits * 1000000) // baudrate)
+
+    def deinit(self) -> None:
+        if _uarts.get(self._id) is self:
+            del _uarts[self._id]
+
+    def __repr__(self) -> str:
+        return 'UART({}, baudrate={})'.format(self._id, self._baudrate)
+
+    def _pump(self) -> None:
+        now = _clock.get().now_us()
+        while self._incoming:
+            chunk = self._incoming[0]
+            arrived = 0
+            if now >= chunk[0]:
+                arrived = min(len(chunk[2]), (now - chunk[0]) // chunk[1] + 1)
+            if not arrived:
+                break
+            self._rx.extend(chunk[2][:arrived])
+            if arrived < len(chunk[2]):
+                chunk[0] += arrived * chunk[1]
+                chunk[2] = chunk[2][arrived:]
+                break
+            self._incoming.popleft()
+
+    def _receive(self, data: bytes, start_us: int, byte_us: int) -> None:
+        self._incoming.append([start_us + byte_us, byte_us, data])
+
+        if self._irq_handler is not None:
+            # the line is idle one character after the last byte
+            clock = _clock.get()
+            if self._irq_event is not None:
+                clock.cancel(self._irq_event)
+            idle_us = start_us + (len(data) + 1) * byte_us
+            self._irq_event = clock.call_at(idle_us, self._fire_irq)
+
+    def _fire_irq(self) -> None:
+        self._irq_event = None
+        self._irq_handler(self)
+
+    def any(self) -> int:
+        self._pump()
+        return len(self._rx)
+
+    def read(self, nbytes=None):
+        self._pump()
+        if not self._rx:
+            return None
+        if nbytes is None:
+            nbytes = len(self._rx)
+        data = bytes(self._rx[:nbytes])
+        del self._rx[:nbytes]
+        return data
+
+    def readinto(self, buf, nbytes=None):
+        if nbytes is None:
+            nbytes = len(buf)
+        data = self.read(nbytes)
+        if data is None:
+            return None
+        buf[:len(data)] = data
+        return len(data)
+
+    def readline(self):
+        self._pump()
+        end = self._rx.find(b'\n')
+        return self.read(None if end < 0 else end + 1)
+
+    def write(self, buf) -> int:
+        data = bytes(buf)
+        now = _clock.get().now_us()
+        start = max(now, self._tx_free_us)
+        self._tx_free_us = start + len(data) * self._byte_us
+
+        peer = _uarts.get(_uart_links.get(self._id, None), None)
+        if peer is not None and data:
+            peer._receive(data, start, self._byte_us)
+
+        return len(data)
+
+    def txdone(self) -> bool:
+        return _clock.get().now_us() >= self._tx_free_us
+
+    def flush(self) -> None:
+        clock = _clock.get()
+        remaining = self._tx_free_us - clock.now_us()
+        if remaining > 0:
+            clock.sleep_us(remaining)
+
+    def irq(self, handler=None, trigger=IRQ_RXIDLE, hard=False):
+        self._irq_handler = handler
+
+
+def link_uarts(id_a, id_b) -> None:
+    """
+    Connect the lines of two UART IDs
+
+    :param      id_a:  The ID of the first UART
+    :type       id_a:  int
+    :param      id_b:  The ID of the second UART
+    :type       id_b:  int
+    """
+    _uart_links[id_a] = id_b
+    _uart_links[id_b] = id_a
+
+
+def uart_pair(id_a=0, id_b=1, **kwargs) -> tuple:
+    """
+    Create two linked UARTs
+
+    :param      id_a:    The ID of the first UART
+    :type       id_a:    int
+    :param      id_b:    The ID of the second UART
+    :type       id_b:    int
+    :param      kwargs:  Settings of both UARTs, e.g. the baudrate
+
+    :returns:   Both UARTs
+    :rtype:     Tuple[UART, UART]
+    """
+    link_uarts(id_a, id_b)
+    return UART(id_a, **kwargs), UART(id_b, **kwargs)
+
+
+def idle() -> None:
+    _clock.get().idle()
+
+
+def lightsleep(time_ms=None) -> None:
+    _clock.get().sleep_us((time_ms or 0) * 1000)
+
+
+def reset() -> None:
+    global resets
+    resets += 1
+    raise SystemExit('machine.reset()')
+
+
+soft_reset = reset
+
+
+def freq(hz=None) -> int:
+    return 125000000
+
+
+def unique_id() -> bytes:
+    return b'\xe6\x61\x41\x04\x03\x2d\x5c\x2f'
+
+
+def disable_irq() -> int:
+    return 0
+
+
+def enable_irq(state=0) -> None:
+    pass
@@ -0,0 +1,26 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+"""
+Simulated ``micropython`` module
+
+There are no native code emitters, modules decorating functions with
+``micropython.viper`` have to fall back to plain Python.
+"""
+
+# custom packages
+from . import clock as _clock
+
+
+def const(value):
+    return value
+
+
+def schedule(func, arg) -> None:
+    # runs the next time the clock moves on, like a soft interrupt
+    clock = _clock.get()
+    clock.call_at(clock.now_us(), lambda: func(arg))
+
+
+def alloc_emergency_exception_buf(size) -> None:
+    pass
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+"""
+Simulated ``network`` module
+
+Access points are added with :py:func:`add_network`. Connecting to them
+takes :py:data:`connect_delay_ms` on the simulation clock. Without any
+added access point every SSID and password is accepted.
+"""
+
+# custom packages
+from . import clock as _clock
+
+STA_IF = 0
+AP_IF = 1
+
+STAT_IDLE = 0
+STAT_CONNECTING = 1
+STAT_WRONG_PASSWORD = -3
+STAT_NO_AP_FOUND = -2
+STAT_CONNECT_FAIL = -1
+STAT_GOT_IP = 3
+
+#: Time in milliseconds until a connection is established
+connect_delay_ms = 1500
+
+#: Access points as SSID -> (password, IP)
+_networks = {}
+#: Interfaces by their ID
+_interfaces = {}
+
+_hostname = 'PicoW'
+
+
+def add_network(ssid: str, password: str, ip: str = '192.168.1.50') -> None:
+    """
+    Add an access point
+
+    :param      ssid:      The SSID
+    :type       ssid:      str
+    :param      password:  The password
+    :type       password:  str
+    :param      ip:        The IP assigned to the station
+    :type       ip:        str
+    """
+    _networks[ssid] = (password, ip)
+
+
+def hostname(name=None):
+    global _hostname
+    if name is None:
+        return _hostname
+    _hostname = name
+
+
+def connected() -> bool:
+    """
+    Check whether any station interface is connected
+
+    :returns:   True if connected, False otherwise
+    :rtype:     bool
+    """
+    interface = _interfaces.get(STA_IF, None)
+    return interface is not None and interface.isconnected()
+
+
+class WLAN(object):
+    """Virtual WLAN interface"""
+    def __init__(self, interface_id=STA_IF) -> None:
+        if interface_id in _interfaces:
+            self.__dict__ = _interfaces[interface_id].__dict__
+            return
+        self._id = interface_id
+        self._active = False
+        self._status = STAT_IDLE
+        self._ready_us = None
+        self._result = STAT_IDLE
+        self._ip = '0.0.0.0'
+        self._ssid = None
+        _interfaces[interface_id] = self
+
+    def active(self, value=None):
+        if value is None:
+            return self._active
+        self._active = bool(value)
+        if not self._active:
+            self.disconnect()
+
+    def connect(self, ssid=None, key=None, **kwargs) -> None:
+        if not self._active:
+            raise OSError('WLAN interface not active')
+
+        network = _networks.get(ssid, None)
+        if not _networks:
+            self._result, ip = STAT_GOT_IP, '192.168.1.50'
+        elif network is None:
+            self._result, ip = STAT_NO_AP_FOUND, '0.0.0.0'
+        elif network[0] != key:
+            self._result, ip = STAT_WRONG_PASSWORD, '0.0.0.0'
+        else:
+            self._result, ip = STAT_GOT_IP, network[1]
+
+        self._ssid = ssid
+        self._ip = ip
+        self._status = STAT_CONNECTING
+        self._ready_us = _clock.get().now_us() + connect_delay_ms * 1000
+
+    def disconnect(self) -> None:
+        self._status = STAT_IDLE
+        self._ready_us = None
+        self._ip = '0.0.0.0'
+
+    def status(self, param=None):
+        if param == 'rssi':
+            return -55
+        if (self._status == STAT_CONNECTING and
+                _clock.get().now_us() >= self._ready_us):
+            self._status = self._result
+        return self._status
+
+    def isconnected(self) -> bool:
+        return self.status() == STAT_GOT_IP
+
+    def ifconfig(self, config=None):
+        if config is not None:
+            self._ip = config[0]
+            return
+        ip = self._ip if self.isconnected() else '0.0.0.0'
+        return (ip, '255.255.255.0', '192.168.1.1', '192.168.1.1')
+
+    def config(self, *args, **kwargs):
+        if args and args[0] == 'essid':
+            return self._ssid
+        if args and args[0] == 'mac':
+            return b'\x28\xcd\xc1\x00\x00\x01'
+        return None
+
+    def scan(self) -> list:
+        return [(ssid.encode(), b'\x00' * 6, 1, -55, 3, 0)
+                for ssid in _networks]
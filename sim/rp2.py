@@ -0,0 +1,483 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+"""
+Simulated ``rp2`` module
+
+PIO programs are not executed. A :py:class:`StateMachine` drains its TX
+FIFO at the speed given for its program in :py:data:`PROGRAM_TIMING` and
+records everything sent between two restarts as a :py:class:`Frame` with
+the time of its start, which for the DMX sender is the start of the break.
+Received words are fed into the RX FIFO with :py:meth:`StateMachine.feed`.
+
+A :py:class:`DMA` channel writing to the TX FIFO address of a state machine
+feeds it without blocking and stays active until its last word entered the
+FIFO. One reading the RX FIFO address transfers the words as they are
+pushed. Any other transfer is copied at once.
+"""
+
+# system packages
+from collections import deque
+
+# custom packages
+from . import clock as _clock
+
+#: Clock cycles of a program as (cycles after restart, cycles per word)
+PROGRAM_TIMING = {
+    # 176 cycles break and 16 cycles mark after break, then 1 start bit,
+    # 8 data bits and 2 stop bits of 4 cycles each
+    'dmx_send': (192, 44),
+}
+
+#: Depth of the TX and RX FIFO
+FIFO_DEPTH = 4
+
+#: All created state machines by ID
+state_machines = {}
+
+#: Base addresses of the PIO blocks and offsets of the first FIFOs
+PIO_BASE = (0x50200000, 0x50300000)
+TXF0 = 0x010
+RXF0 = 0x020
+
+
+class PIO(object):
+    IN_LOW = 0
+    IN_HIGH = 1
+    OUT_LOW = 2
+    OUT_HIGH = 3
+    SHIFT_LEFT = 0
+    SHIFT_RIGHT = 1
+    JOIN_NONE = 0
+    JOIN_TX = 1
+    JOIN_RX = 2
+    IRQ_SM0 = 0x100
+    IRQ_SM1 = 0x200
+    IRQ_SM2 = 0x400
+    IRQ_SM3 = 0x800
+
+    def __init__(self, id) -> None:
+        self._id = id
+
+    def state_machine(self, id, program=None, *args, **kwargs):
+        sm_id = self._id * 4 + id
+        if program is None:
+            return state_machines[sm_id]
+        return StateMachine(sm_id, program, *args, **kwargs)
+
+    def add_program(self, program) -> None:
+        pass
+
+    def remove_program(self, program=None) -> None:
+        pass
+
+
+class Program(object):
+    """PIO program created by :py:func:`asm_pio`, not assembled"""
+    def __init__(self, name: str, options: dict) -> None:
+        self.__name__ = name
+        self.options = options
+
+    def __repr__(self) -> str:
+        return '<PIO program {}>'.format(self.__name__)
+
+
+def asm_pio(**kwargs):
+    def decorator(func):
+        return Program(func.__name__, kwargs)
+    return decorator
+
+
+class Frame(object):
+    """
+    Words sent by a state machine between two restarts
+
+    :param      timestamp_us:  Time of the restart in microseconds
+    :type       timestamp_us:  int
+    :param      start_us:      Time the first word starts in microseconds,
+                               None until the state machine runs
+    :type       start_us:      Optional[int]
+    """
+    def __init__(self, timestamp_us: int, start_us: int) -> None:
+        self.timestamp_us = timestamp_us
+        #: Time the first word starts in microseconds
+        self.start_us = start_us
+        self.data = bytearray()
+        #: Time the last word has been sent in microseconds
+        self.end_us = start_us
+        #: True if a restart cut off words not sent yet
+        self.truncated = False
+
+    def __repr__(self) -> str:
+        return '<Frame at {} us, {} slots>'.format(self.timestamp_us,
+                                                  len(self.data))
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+
+class StateMachine(object):
+    """Virtual PIO state machine"""
+    #: Maximum amount of recorded frames
+    MAX_FRAMES = 256
+
+    def __init__(self, id, program=None, freq=125000000, **kwargs) -> None:
+        self._id = id
+        self._active = False
+        self._rx = deque()
+        self._rx_dma = None
+        self._tx_dma = None
+        #: Words dropped by a push without blocking on a full RX FIFO
+        self.rx_dropped = 0
+        self._irq_handler = None
+        #: Recorded frames, oldest first
+        self.frames = deque((), self.MAX_FRAMES)
+        self._frame = None
+        self.init(program, freq, **kwargs)
+        state_machines[id] = self
+
+    def init(self, program=None, freq=125000000, **kwargs) -> None:
+        self.program = program
+        self.freq = freq
+        name = getattr(program, '__name__', None)
+        setup_cycles, word_cycles = PROGRAM_TIMING.get(name, (0, 1))
+        self._setup_us = setup_cycles * 1000000 / freq
+        self._word_us = word_cycles * 1000000 / freq
+        options = getattr(program, 'options', {})
+        joined = options.get('fifo_join', PIO.JOIN_NONE) == PIO.JOIN_RX
+        self._rx_depth = FIFO_DEPTH * 2 if joined else FIFO_DEPTH
+        # words put while stopped, sent once activated
+        self._held = bytearray()
+        self._line_free_us = 0
+        self.restart()
+
+    def __repr__(self) -> str:
+        return 'StateMachine({}, {!r})'.format(self._id, self.program)
+
+    def active(self, value=None):
+        if value is None:
+            return self._active
+        value = bool(value)
+        if value and not self._active:
+            self._active = True
+            if self._frame.start_us is None:
+                # the program runs from its start, the break is sent now
+                self._start_frame(_clock.get().now_us())
+            held, self._held = self._held, bytearray()
+            self._send(held)
+            if self._tx_dma is not None:
+                self._tx_dma._set_end(self._dma_end_us())
+                self._tx_dma = None
+        self._active = value
+
+    def restart(self) -> None:
+        now = _clock.get().now_us()
+        carried = bytearray()
+        frame = self._frame
+        if frame is not None:
+            # the FIFO survives a restart, a word being shifted out is lost
+            unsent = self._unfinished(now)
+            if unsent:
+                frame.truncated = True
+                shifting = frame.start_us <= now
+                carried = frame.data[len(frame.data) - unsent + shifting:]
+                del frame.data[len(frame.data) - unsent:]
+                frame.end_us = now
+            if len(frame.data) or frame.truncated:
+                self.frames.append(frame)
+
+        self._frame = Frame(now, None)
+        if self._active:
+            self._start_frame(now)
+            self._send(carried)
+        else:
+            self._held = carried + self._held
+
+    def _start_frame(self, now: int) -> None:
+        self._frame.timestamp_us = now
+        self._frame.start_us = now + self._setup_us
+        self._frame.end_us = self._frame.start_us
+        self._line_free_us = self._frame.start_us
+
+    def _unfinished(self, now: int) -> int:
+        # words of the current frame not completely sent by now
+        if not self._active or self._line_free_us <= now:
+            return 0
+        unsent = int((self._line_free_us - now) / self._word_us + 0.999999)
+        return min(unsent, len(self._frame.data))
+
+    def _send(self, words) -> None:
+        if not len(words):
+            return
+        self._frame.data.extend(words)
+        start = max(_clock.get().now_us(), self._line_free_us)
+        self._line_free_us = start + len(words) * self._word_us
+        self._frame.end_us = self._line_free_us
+
+    def _feed_tx(self, words, dma=None) -> float:
+        # words written by DMA, returns when the last one enters the FIFO
+        words = bytearray(word & 0xFF for word in words)
+        if not self._active:
+            # the DMA waits until the state machine runs
+            self._held.extend(words)
+            self._tx_dma = dma
+            return float('inf')
+        self._send(words)
+        return self._dma_end_us()
+
+    def _dma_end_us(self) -> float:
+        return max(_clock.get().now_us(),
+                   self._line_free_us - (FIFO_DEPTH + 1) * self._word_us)
+
+    def put(self, value, shift=0) -> None:
+        if isinstance(value, int):
+            words = bytearray([(value >> shift) & 0xFF])
+        else:
+            words = bytearray((word >> shift) & 0xFF for word in value)
+
+        if not self._active:
+            if len(self._held) + len(words) > FIFO_DEPTH:
+                raise RuntimeError('put blocks forever, '
+                                   'state machine {} stopped'.format(self._id))
+            self._held.extend(words)
+            return
+
+        self._send(words)
+
+        # put returns once the last word is in the FIFO
+        clock = _clock.get()
+        wait = (self._line_free_us - (FIFO_DEPTH + 1) * self._word_us -
+                clock.now_us())
+        if wait > 0:
+            clock.sleep_us(int(wait + 0.999999))
+
+    def tx_fifo(self) -> int:
+        if not self._active:
+            return len(self._held)
+        # one of the unfinished words is in the output shift register
+        unsent = self._unfinished(_clock.get().now_us())
+        return max(0, min(FIFO_DEPTH, unsent - 1))
+
+    def feed(self, words) -> None:
+        """
+        Receive words as if they had been pushed by the program, blocking
+        while the RX FIFO is full
+
+        :param      words:  The words
+        :type       words:  Iterable[int]
+        """
+        for word in words:
+            if self._rx_dma is None or not self._rx_dma._take(word):
+                self._rx.append(word)
+
+    def _push_noblock(self, word: int) -> None:
+        if self._rx_dma is not None and self._rx_dma._take(word):
+            return
+        if len(self._rx) >= self._rx_depth:
+            self.rx_dropped += 1
+            return
+        self._rx.append(word)
+
+    def fire_irq(self) -> None:
+        """Raise the interrupt of the state machine, as ``irq(rel(0))``"""
+        if self._irq_handler is not None:
+            self._irq_handler(self)
+
+    def feed_dmx(self, data, at_us=None, break_us: int = 176,
+                 mab_us: int = 12) -> int:
+        """
+        Receive a DMX frame on the line, for ``dmx_receive_frames``
+
+        The interrupt is raised at the end of the BREAK, the slots are
+        pushed with the timing of 250 kBaud as the clock moves on.
+
+        :param      data:      The start code and the channels
+        :type       data:      bytes
+        :param      at_us:     Time the BREAK starts, None for now
+        :type       at_us:     Optional[int]
+        :param      break_us:  Duration of the BREAK
+        :type       break_us:  int
+        :param      mab_us:    Duration of the Mark-After-Break
+        :type       mab_us:    int
+
+        :returns:   Time the last slot has been received in microseconds
+        :rtype:     int
+        """
+        clock = _clock.get()
+        if at_us is None:
+            at_us = clock.now_us()
+        mab = at_us + break_us
+        clock.call_at(mab, self.fire_irq)
+        for index, value in enumerate(bytes(data)):
+            due = mab + mab_us + 44 * (index + 1)
+            clock.call_at(due, lambda word=value << 24: self._push_noblock(word))
+        return mab + mab_us + 44 * len(data)
+
+    def rx_fifo(self) -> int:
+        return min(self._rx_depth, len(self._rx))
+
+    def get(self, buf=None, shift=0):
+        if buf is None:
+            return self._pop() >> shift
+
+        mask = (1 << (8 * memoryview(buf).itemsize)) - 1
+        for i in range(len(buf)):
+            buf[i] = (self._pop() >> shift) & mask
+
+    def _pop(self) -> int:
+        if not self._rx:
+            raise RuntimeError('get blocks forever, '
+                               'RX FIFO of state machine {} empty'.format(
+                                   self._id))
+        return self._rx.popleft()
+
+    def exec(self, instr) -> None:
+        pass
+
+    def irq(self, handler=None, trigger=0, hard=False):
+        self._irq_handler = handler
+
+    def last_frame(self):
+        """
+        Get the latest completely sent frame
+
+        :returns:   The frame, None if none has been sent yet
+        :rtype:     Optional[Frame]
+        """
+        frame = self._frame
+        if (frame is not None and len(frame.data) and
+                self._unfinished(_clock.get().now_us()) == 0):
+            return frame
+        return self.frames[-1] if self.frames else None
+
+
+def _fifo_state_machine(target, fifo: int):
+    if isinstance(target, StateMachine):
+        return target
+    if not isinstance(target, int):
+        return None
+    for pio, base in enumerate(PIO_BASE):
+        # the RX FIFO may be read in byte lanes
+        offset = target - base - fifo
+        if 0 <= offset < 16 and (fifo == RXF0 or not offset % 4):
+            return state_machines.get(pio * 4 + offset // 4, None)
+    return None
+
+
+class DMA(object):
+    """Virtual DMA channel"""
+    _channels = 0
+
+    def __init__(self) -> None:
+        self.channel = DMA._channels
+        DMA._channels += 1
+        self.read = None
+        self._write = None
+        self.count = 0
+        self.ctrl = self.pack_ctrl()
+        self._position = 0
+        self._end_us = 0
+        self._rx_sm = None
+        self._irq_handler = None
+        self._irq_event = None
+
+    @property
+    def write(self):
+        return self._write
+
+    @write.setter
+    def write(self, value) -> None:
+        self._write = value
+        self._position = 0
+
+    def pack_ctrl(self, default=None, **kwargs) -> dict:
+        ctrl = {'size': 2, 'inc_read': True, 'inc_write': True}
+        ctrl.update(default or {})
+        ctrl.update(kwargs)
+        return ctrl
+
+    @staticmethod
+    def unpack_ctrl(value) -> dict:
+        return dict(value)
+
+    def config(self, read=None, write=None, count=None, ctrl=None,
+               trigger=False) -> None:
+        self.active(0)
+        self.read = read
+        self.write = write
+        self.count = count
+        self.ctrl = ctrl or self.pack_ctrl()
+        if trigger:
+            self.active(1)
+
+    def active(self, value=None):
+        clock = _clock.get()
+        if value is None:
+            if self._rx_sm is not None:
+                return self.count > 0
+            return clock.now_us() < self._end_us
+
+        if self._rx_sm is not None:
+            self._rx_sm._rx_dma = None
+            self._rx_sm = None
+        if not value:
+            self._end_us = 0
+            return
+
+        sm = _fifo_state_machine(self.read, RXF0)
+        if sm is not None:
+            # transfers words as the state machine pushes them
+            self._rx_sm = sm
+            sm._rx_dma = self
+            while sm._rx and self._take(sm._rx[0]):
+                sm._rx.popleft()
+            return
+
+        if self.ctrl.get('size', 2) == 0:
+            words = bytes(memoryview(self.read))[:self.count]
+        else:
+            words = list(self.read)[:self.count]
+
+        sm = _fifo_state_machine(self.write, TXF0)
+        if sm is not None:
+            end_us = sm._feed_tx(words, self)
+        else:
+            self._write[:self.count] = words
+            end_us = clock.now_us()
+        self.count = 0
+        self._set_end(end_us)
+
+    def _set_end(self, end_us: float) -> None:
+        clock = _clock.get()
+        self._end_us = end_us
+        if self._irq_event is not None:
+            clock.cancel(self._irq_event)
+            self._irq_event = None
+        if self._irq_handler is not None and end_us != float('inf'):
+            self._irq_event = clock.call_at(end_us, self._fire_irq)
+
+    def _take(self, word: int) -> bool:
+        # a word pushed into the RX FIFO, False if not transferred
+        if self.count <= 0:
+            return False
+        if self.ctrl.get('size', 2) == 0:
+            lane = (self.read - PIO_BASE[0]) % 4 if isinstance(self.read,
+                                                              int) else 0
+            word = (word >> (8 * lane)) & 0xFF
+        self._write[self._position] = word
+        self._position += 1
+        self.count -= 1
+        if not self.count and self._irq_handler is not None:
+            self._irq_handler(self)
+        return True
+
+    def _fire_irq(self) -> None:
+        self._irq_event = None
+        self._irq_handler(self)
+
+    def irq(self, handler=None, hard=False):
+        self._irq_handler = handler
+
+    def close(self) -> None:
+        self.active(0)
+        self._irq_handler = None
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+"""
+Simulated ``urequests`` module
+
+Responses are served from routes added with :py:func:`register`, any other
+URL answers with 404. Every request takes :py:data:`latency_ms` on the
+simulation clock and fails with an OSError while the WLAN is not connected.
+"""
+
+# system packages
+import errno
+import json as _json
+
+# custom packages
+from . import clock as _clock
+from . import network as _network
+
+#: Time in milliseconds every request takes
+latency_ms = 50
+
+#: Routes as URL -> (status code, body) or callable(method, url, data)
+_routes = {}
+
+#: Requests made as (time in us, method, url)
+history = []
+
+
+def register(url: str, body=b'', status_code: int = 200) -> None:
+    """
+    Add the response of an URL
+
+    :param      url:          The URL
+    :type       url:          str
+    :param      body:         The body, a dict is encoded as JSON, or a
+                              function called with method, url and data
+                              returning status code and body
+    :type       body:         Union[bytes, str, dict, Callable]
+    :param      status_code:  The HTTP status code
+    :type       status_code:  int
+    """
+    if callable(body):
+        _routes[url] = body
+    else:
+        _routes[url] = (status_code, body)
+
+
+def clear() -> None:
+    """Remove all routes and the history"""
+    _routes.clear()
+    del history[:]
+
+
+def _encode(body) -> bytes:
+    if isinstance(body, (dict, list)):
+        body = _json.dumps(body)
+    if isinstance(body, str):
+        body = body.encode('utf-8')
+    return bytes(body)
+
+
+class Response(object):
+    def __init__(self, status_code: int, content: bytes) -> None:
+        self.status_code = status_code
+        self.reason = b'OK' if status_code == 200 else b''
+        self.headers = {}
+        self.encoding = 'utf-8'
+        self.content = content
+
+    @property
+    def text(self) -> str:
+        return self.content.decode(self.encoding)
+
+    def json(self):
+        return _json.loads(self.content)
+
+    def close(self) -> None:
+        pass
+
+
+def request(method: str, url: str, data=None, json=None, headers=None,
+            **kwargs) -> Response:
+    clock = _clock.get()
+    history.append((clock.now_us(), method, url))
+
+    if not _network.connected():
+        raise OSError(errno.EHOSTUNREACH, 'network not connected')
+
+    clock.sleep_us(latency_ms * 1000)
+
+    if json is not None:
+        data = _json.dumps(json)
+
+    route = _routes.get(url, None)
+    if route is None:
+        status_code, body = 404, b'Not Found'
+    elif callable(route):
+        status_code, body = route(method, url, data)
+    else:
+        status_code, body = route
+
+    return Response(status_code, _encode(body))
+
+
+def head(url, **kwargs):
+    return request('HEAD', url, **kwargs)
+
+
+def get(url, **kwargs):
+    return request('GET', url, **kwargs)
+
+
+def post(url, **kwargs):
+    return request('POST', url, **kwargs)
+
+
+def put(url, **kwargs):
+    return request('PUT', url, **kwargs)
+
+
+def patch(url, **kwargs):
+    return request('PATCH', url, **kwargs)
+
+
+def delete(url, **kwargs):
+    return request('DELETE', url, **kwargs)
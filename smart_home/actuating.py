@@ -1,9 +1,12 @@
 #from abc import ABC
 from machine import Pin, Timer
+import time
 
 from .utils import singleton
-from lib.dmx_master import DMX
+from lib.dmx_master import DMXOutput
 from .device import DimmableDevice
+from .fading import FadeEngine
+from .curves import FrameCurves
 from .config import DMXConfig
 
 from typing import Optional, Iterable, Union
@@ -23,20 +26,26 @@ class IInterface():
     def service(self):
         pass
     
-@singleton
 class DMX512(IInterface):
-    UNIVERSE = 24
-    __length = UNIVERSE #min universe message frame
+    UNIVERSE = 24 #min universe message frame
+    MAX_CHANNEL = 512
     
     def __init__(self, config : DMXConfig, devices : list[DimmableDevice]):
         
-        working_pin = config.dmx_pin
+        pins = config.dmx_pins or [config.dmx_pin]
         if config.te is not None:
             pass
-        self.length = len(devices)
+        self.keep_alive = config.keep_alive
+        self.devices = list(devices)
+        self.output = DMXOutput(pins, size = self.UNIVERSE, fps = config.fps, synchronised = config.synchronised)
+        self.dmx = self.output[0]
         self.fps = config.fps
-        self.devices = devices
-        self.dmx = DMX(working_pin, size = self.length)
+        self.frames_sent = 0
+        self.frames_skipped = 0
+        self.__last_frame = [None] * len(pins)
+        self.__fades = [FadeEngine() for _ in pins]
+        self.__levels = [bytearray(self.MAX_CHANNEL + 1) for _ in pins] #brightness before the dimmer curves
+        self.__patch()
         # TODO Распаковка конфига и инициализация устройств
         
     @property
@@ -45,33 +54,109 @@ class DMX512(IInterface):
     
     @fps.setter
     def fps(self, var : int):
-        
-        self.__fps = 0
+        if var < 1:
+            var = 1
+        self.__fps = var
+        self.output.fps = var
         
     @property
     def length(self):
-        return self.__length
-    
-    @length.setter
-    def length(self, var: int):
-        if var > 512:
-            self.__length = 512
-        elif var < self.UNIVERSE:
-            self.__length = self.UNIVERSE
-        else:
-            self.__length = var
+        #longest frame of all lines
+        return max([len(dmx.universe) - 1 for dmx in self.output.universes])
+    
+    def frame_length(self, channel : int) -> int:
+        #the highest patched channel, padded to the min universe message frame
+        if channel > self.MAX_CHANNEL:
+            raise ValueError('DMX channel {} above {}'.format(channel, self.MAX_CHANNEL))
+        return max(channel, self.UNIVERSE)
+    
+    def add_device(self, device : DimmableDevice):
+        self.frame_length(device.channel)
+        if device.universe >= len(self.output):
+            raise ValueError('no DMX line {}'.format(device.universe))
+        self.devices.append(device)
+        self.__patch()
+    
+    def remove_device(self, device : DimmableDevice):
+        self.devices.remove(device)
+        self.__fades[device.universe].set(device.channel, 0)
+        self.__levels[device.universe][device.channel] = 0
+        self.__patch()
+    
+    def set_curve(self, device : DimmableDevice, curve = None):
+        #256 entry dimmer curve lut, see curves.py, None for linear
+        if curve is not None and len(curve) != 256:
+            raise ValueError('dimmer curve needs 256 entries, got {}'.format(len(curve)))
+        device.curve = curve
+        self.__patch()
+    
+    def __patch(self):
+        #group the devices by line, size each frame to its highest channel
+        #and collect the dimmer curves
+        lines = [[] for _ in self.output.universes]
+        curves = [FrameCurves(self.MAX_CHANNEL + 1) for _ in lines]
+        for device in self.devices:
+            lines[device.universe].append(device)
+            curves[device.universe].assign(device.channel, device.curve)
+        for line, devices in enumerate(lines):
+            length = self.frame_length(max([0] + [device.channel for device in devices]))
+            dmx = self.output[line]
+            if len(dmx.universe) != length + 1:
+                dmx.resize(length)
+            self.__last_frame[line] = None #send the new frame right away
+        self.__lines = lines
+        self.__curves = curves
             
     def get_state(self, device) -> int:
         return super().get_state(device)
     
-    def service(self, t):
-        for device in self.devices:
-            self.dmx.universe[device.channel] = device.brightless
-            print(f'send {self.dmx.universe}, t value = {t}')
-            self.dmx.send()
-    
-    #def __smooth_dimming(self):
-    #    self.step = 
+    def service(self, t = None) -> bool:
+        """
+        Send at most one frame per line and tick of the configured fps.
+
+        The device values of a due line are applied first, the frame is
+        only built through the dimmer curves and sent if a value changed or
+        the keep alive time has passed. A tick is delayed while the previous frame of the line
+        is still going out.
+
+        Returns:
+            bool: True if a frame has been sent.
+        """
+        return self.output.service(self.__refresh) != 0
+    
+    def __refresh(self, line : int) -> bool:
+        changed = self.__apply_devices(line)
+        now = time.ticks_ms()
+        last = self.__last_frame[line]
+        if (not changed and last is not None and
+                time.ticks_diff(now, last) < self.keep_alive):
+            self.frames_skipped += 1
+            return False
+
+        #build the frame, one pass through the dimmer curves
+        self.__curves[line].apply(self.__levels[line], self.output[line].universe)
+        self.__last_frame[line] = now
+        self.frames_sent += 1
+        return True
+    
+    def __apply_devices(self, line : int) -> bool:
+        levels = self.__levels[line]
+        fades = self.__fades[line]
+        goals = fades.goals
+        changed = False
+        for device in self.__lines[line]:
+            channel = device.channel
+            value = device.brightless
+            if goals[channel] == value:
+                continue
+            if device.smooth:
+                fades.fade(channel, levels[channel], value, device.step_speed << 8, device.fade_curve)
+            else:
+                fades.set(channel, value)
+                levels[channel] = value
+                changed = True
+        #one pass over the running fades per frame
+        return fades.tick(levels) or changed
     
 
 @singleton
@@ -2,8 +2,13 @@ from machine import Pin
 
 class DMXConfig():
     dmx_pin = Pin((12), Pin.OUT)
+    dmx_pins = None #several lines, one universe per pin, instead of dmx_pin
+    synchronised = False #start the frames of all lines together, otherwise staggered
     te = None #transmit emitter
     fps = 25
+    #ms, resend an unchanged universe at least this often, sent up to one frame period later
+    #keep it well under 1 s, many DMX receivers blank or go failsafe after 1 s without data
+    keep_alive = 800
     
 class ButtonsConfig():
     buttons = [ 
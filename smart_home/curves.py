@@ -0,0 +1,79 @@
+from .fading import CHANNELS, GAMMA_LUT
+
+#dimmer curves, 256 entry luts from brightness value to DMX value
+LINEAR = bytes(range(256))
+GAMMA_22 = GAMMA_LUT
+S_CURVE = bytes(round(255 * t * t * (3 - 2 * t)) for t in (i / 255 for i in range(256)))
+
+#bulk mapping of a whole frame through one lut, not on MicroPython
+_TRANSLATE = hasattr(bytes, 'translate')
+
+def _apply(state, src, out, length : int):
+    lut, index = state
+    for channel in range(1, length):
+        out[channel] = lut[(index[channel] << 8) | src[channel]]
+
+try:
+    from .curves_viper import apply
+    #a stand-in micropython module on CPython lacks viper or fails once called
+    apply((bytearray(LINEAR), bytearray(2)), bytearray(2), bytearray(2), 2)
+except (AttributeError, ImportError, NameError, SyntaxError, TypeError):
+    #no native emitter on this port or not running on MicroPython
+    apply = _apply
+
+class FrameCurves():
+    """
+    Dimmer curves of the channels of a universe, applied when a frame is built.
+
+    All luts of the universe are stored back to back in one bytearray and
+    each channel holds the number of its lut, so a frame is mapped in a
+    single pass. A frame using one lut only is copied or translated in bulk.
+    """
+
+    def __init__(self, size : int = CHANNELS):
+        self.tables = [LINEAR]
+        self.lut = bytearray(LINEAR)
+        self.index = bytearray(size)
+        self.__state = (self.lut, self.index)
+        self.__uniform = None
+
+    def assign(self, channel : int, table = None):
+        #table is a 256 entry lut, None for linear
+        if table is None:
+            table = LINEAR
+        if len(table) != 256:
+            raise ValueError('dimmer curve needs 256 entries, got {}'.format(len(table)))
+        for number, known in enumerate(self.tables):
+            if known is table or known == table:
+                break
+        else:
+            number = len(self.tables)
+            if number == 256:
+                raise ValueError('too many dimmer curves')
+            self.tables.append(bytes(table))
+            self.lut.extend(table)
+        self.index[channel] = number
+        self.__uniform = None
+
+    def uniform(self, length : int) -> int:
+        #number of the lut all channels below length use, -1 if they differ
+        if self.__uniform is None or self.__uniform[0] != length:
+            index = self.index
+            number = index[1] if length > 1 else 0
+            for channel in range(2, length):
+                if index[channel] != number:
+                    number = -1
+                    break
+            self.__uniform = (length, number)
+        return self.__uniform[1]
+
+    def apply(self, src, out):
+        #map the brightness values of src to the DMX frame out, start code kept
+        length = len(out)
+        number = self.uniform(length)
+        if number == 0:
+            memoryview(out)[1:length] = memoryview(src)[1:length]
+        elif number > 0 and _TRANSLATE:
+            memoryview(out)[1:length] = bytes(src[1:length]).translate(self.tables[number])
+        else:
+            apply(self.__state, src, out, length)
@@ -0,0 +1,14 @@
+#native frame mapping, kept in its own module as ports without a native
+#emitter refuse to compile any module containing a viper function
+import micropython
+
+@micropython.viper
+def apply(state, src, out, length : int):
+    lut = ptr8(state[0])  # noqa: F821
+    index = ptr8(state[1])  # noqa: F821
+    values = ptr8(src)  # noqa: F821
+    frame = ptr8(out)  # noqa: F821
+    channel = 1
+    while channel < length:
+        frame[channel] = lut[(index[channel] << 8) | values[channel]]
+        channel += 1
@@ -13,6 +13,7 @@ class Rooms():
 class IDevice():
     name : str
     channel : int
+    universe : int = 0 #DMX line of the channel
     room : Rooms
     #handler : IInterface
     on_value : int
@@ -40,14 +41,18 @@ class DimmableDevice(IDevice):
     max_bright : int = 255
     min_bright : int = 0
     smooth : bool = False
-    step_speed : int = 10
+    step_speed : int = 10 #brightness change per DMX frame when smooth
+    fade_curve : int = 0 #0 linear, 1 gamma corrected, see fading.py
+    curve : bytes = None #dimmer curve, 256 entry lut, see curves.py, None for linear
     
-    def __init__(self, channel: int, name: str, brightless = 0, max_bright = 255, min_bright = 0, smooth = False, step_speed = 10) -> None:
+    def __init__(self, channel: int, name: str, brightless = 0, max_bright = 255, min_bright = 0, smooth = False, step_speed = 10, fade_curve = 0, curve = None) -> None:
         self.brightless = brightless
         self.max_bright = max_bright
         self.min_bright = min_bright
         self.smooth = smooth
         self.step_speed = step_speed
+        self.fade_curve = fade_curve
+        self.curve = curve
         super().__init__(channel, name)
     
     def toggle(self):
@@ -26,4 +26,5 @@ class HomeService():
         #self.dmx_poll = Timer(mode = Timer.PERIODIC, period = 2500, callback=self.dmx.service)
         
     def __call__(self, *args: Any, **kwds: Any) -> Any:
-        self.buttons.service()
\ No newline at end of file
+        self.buttons.service()
+        self.dmx.service()
\ No newline at end of file
@@ -0,0 +1,103 @@
+from array import array
+
+#fade curves
+LINEAR = 0
+GAMMA = 1 #steps evenly in perceived brightness
+
+CHANNELS = 513 #start code + 512 channels
+
+#gamma 2.2 and its inverse, brightness value <-> perceived level
+GAMMA_LUT = bytes(round(255 * (i / 255) ** 2.2) for i in range(256))
+INVERSE_GAMMA_LUT = bytearray(256)
+_level = 0
+for _value in range(256):
+    while GAMMA_LUT[_level] < _value:
+        _level += 1
+    INVERSE_GAMMA_LUT[_value] = _level
+
+def _tick(state, out, count : int) -> int:
+    levels, targets, steps, curves, goals, active = state
+    gamma = GAMMA_LUT
+    i = 0
+    while i < count:
+        channel = active[i]
+        level = levels[channel]
+        target = targets[channel]
+        step = steps[channel]
+        if level < target:
+            level = level + step if target - level > step else target
+        else:
+            level = level - step if level - target > step else target
+        levels[channel] = level
+        if level == target:
+            #done, end exactly on the goal and drop it from the active list
+            out[channel] = goals[channel]
+            count -= 1
+            active[i] = active[count]
+            continue
+        if curves[channel]:
+            out[channel] = gamma[level >> 8]
+        else:
+            out[channel] = level >> 8
+        i += 1
+    return count
+
+try:
+    from .fading_viper import tick
+    #a stand-in micropython module on CPython lacks viper or fails once called
+    tick((array('H', [0]), array('H', [0]), array('H', [0]), bytearray(1), bytearray(1), array('H', [0])), bytearray(1), 0)
+except (AttributeError, ImportError, NameError, SyntaxError, TypeError):
+    #no native emitter on this port or not running on MicroPython
+    tick = _tick
+
+class FadeEngine():
+    """
+    Fades of all channels of a universe, advanced once per DMX frame.
+
+    Levels are 8.8 fixed point in an array('H'), a tick only visits the
+    channels in the active list, so idle devices cost nothing.
+    """
+
+    def __init__(self, size : int = CHANNELS):
+        self.levels = array('H', bytes(2 * size))
+        self.targets = array('H', bytes(2 * size))
+        self.steps = array('H', bytes(2 * size))
+        self.curves = bytearray(size)
+        self.goals = bytearray(size) #the value each channel ends on
+        self.active = array('H', bytes(2 * size))
+        self.count = 0
+        self.__state = (self.levels, self.targets, self.steps, self.curves, self.goals, self.active)
+
+    def fading(self, channel : int) -> bool:
+        for i in range(self.count):
+            if self.active[i] == channel:
+                return True
+        return False
+
+    def fade(self, channel : int, start : int, goal : int, step : int, curve : int = LINEAR):
+        #step is the change of the level per frame, 8.8 fixed point
+        if curve == GAMMA:
+            start = INVERSE_GAMMA_LUT[start]
+            end = INVERSE_GAMMA_LUT[goal]
+        else:
+            end = goal
+        self.levels[channel] = start << 8
+        self.targets[channel] = end << 8
+        self.steps[channel] = min(max(step, 1), 0xFFFF)
+        self.curves[channel] = curve
+        self.goals[channel] = goal
+        if not self.fading(channel):
+            self.active[self.count] = channel
+            self.count += 1
+
+    def set(self, channel : int, value : int):
+        #jump to a value, ending a running fade
+        self.goals[channel] = value
+        self.levels[channel] = self.targets[channel] = value << 8
+
+    def tick(self, out) -> bool:
+        #advance all fades by one frame and write them to out, True if any ran
+        if not self.count:
+            return False
+        self.count = tick(self.__state, out, self.count)
+        return True
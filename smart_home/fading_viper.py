@@ -0,0 +1,44 @@
+#native fade tick, kept in its own module as ports without a native emitter
+#refuse to compile any module containing a viper function
+import micropython
+
+from .fading import GAMMA_LUT
+
+@micropython.viper
+def tick(state, out, count : int) -> int:
+    levels = ptr16(state[0])  # noqa: F821
+    targets = ptr16(state[1])  # noqa: F821
+    steps = ptr16(state[2])  # noqa: F821
+    curves = ptr8(state[3])  # noqa: F821
+    goals = ptr8(state[4])  # noqa: F821
+    active = ptr16(state[5])  # noqa: F821
+    gamma = ptr8(GAMMA_LUT)  # noqa: F821
+    buf = ptr8(out)  # noqa: F821
+    i = 0
+    while i < count:
+        channel = active[i]
+        level = levels[channel]
+        target = targets[channel]
+        step = steps[channel]
+        if level < target:
+            if target - level > step:
+                level = level + step
+            else:
+                level = target
+        else:
+            if level - target > step:
+                level = level - step
+            else:
+                level = target
+        levels[channel] = level
+        if level == target:
+            buf[channel] = goals[channel]
+            count -= 1
+            active[i] = active[count]
+            continue
+        if curves[channel]:
+            buf[channel] = gamma[level >> 8]
+        else:
+            buf[channel] = level >> 8
+        i += 1
+    return count
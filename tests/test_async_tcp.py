@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+"""
+Tests of the awaitable Modbus TCP client
+
+Runs on CPython and on the MicroPython unix port, from the repository
+root::
+
+    python3 -m unittest discover tests
+    micropython -m unittest discover tests
+"""
+
+# system packages
+import struct
+import time
+import sys
+import unittest
+
+sys.path.insert(0, 'benchmarks')
+sys.path.insert(0, 'lib')
+
+import fakes    # noqa: E402
+fakes.install()
+
+try:
+    import uasyncio as asyncio
+except ImportError:
+    import asyncio
+
+from umodbus import const as Const                  # noqa: E402
+from umodbus.asynchronous.tcp import AsyncTCP       # noqa: E402
+
+#: Port of the fake slave
+PORT = 15502
+
+
+def _response(tid: int, pdu: bytes) -> bytes:
+    return struct.pack('>HHHB', tid & 0xFFFF, 0, len(pdu) + 1, 1) + pdu
+
+
+class FakeSlave(object):
+    """Slave answering each request with a list of raw responses"""
+    def __init__(self, answer):
+        self.answer = answer
+        self.server = None
+
+    async def _serve(self, reader, writer):
+        try:
+            while True:
+                header = await reader.readexactly(Const.MBAP_HDR_LENGTH - 1)
+                tid, _, length = struct.unpack('>HHH', header)
+                await reader.readexactly(length)
+                for delay, data in self.answer(tid):
+                    await asyncio.sleep(delay)
+                    writer.write(data)
+                    await writer.drain()
+        except (OSError, EOFError, asyncio.CancelledError):
+            # client gone or test finished with answers still pending
+            pass
+        finally:
+            writer.close()
+
+    async def start(self):
+        self.server = await asyncio.start_server(self._serve,
+                                                 '127.0.0.1',
+                                                 PORT)
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+
+class TestAsyncTCPClient(unittest.TestCase):
+    def _run(self, answer, timeout, *requests):
+        async def main():
+            slave = FakeSlave(answer)
+            await slave.start()
+            client = AsyncTCP('127.0.0.1', PORT, timeout=timeout)
+            try:
+                results = []
+                for request in requests:
+                    try:
+                        results.append(await request(client))
+                    except asyncio.TimeoutError:
+                        results.append((asyncio.TimeoutError,
+                                        client._writer is None))
+                return results
+            finally:
+                await client.close()
+                await slave.stop()
+
+        return asyncio.run(main())
+
+    def test_stale_response_is_skipped(self):
+        def answer(tid):
+            return [(0, _response(tid - 1, b'\x03\x02\x00\x01')),
+                    (0, _response(tid, b'\x03\x04\x00\x07\xff\xff'))]
+
+        results = self._run(answer, 1.0, lambda client:
+                            client.read_holding_registers(1, 0, 2))
+        self.assertEqual(results, [(7, -1)])
+
+    def test_timeout_covers_all_stale_responses(self):
+        # a stream of foreign responses must not extend the timeout
+        def answer(tid):
+            return [(0.05, _response(0xFFFF, b'\x03\x02\x00\x01'))] * 20
+
+        async def timed(client):
+            start = time.ticks_ms()
+            try:
+                await client.read_holding_registers(1, 0, 1)
+            finally:
+                self.elapsed = time.ticks_diff(time.ticks_ms(), start)
+
+        results = self._run(answer, 0.3, timed)
+        self.assertEqual(results, [(asyncio.TimeoutError, True)])
+        self.assertLess(self.elapsed, 600)
+
+    def test_timeout_drops_connection(self):
+        # the late answer of the first request must not answer the second
+        def answer(tid):
+            if tid == 0:
+                return [(0.3, _response(tid, b'\x03\x02\x00\x01'))]
+            return [(0, _response(tid, b'\x03\x02\x00\x02'))]
+
+        results = self._run(
+            answer, 0.1,
+            lambda client: client.read_holding_registers(1, 0, 1),
+            lambda client: client.read_holding_registers(1, 0, 1))
+        self.assertEqual(results, [(asyncio.TimeoutError, True), (2, )])
+
+
+if __name__ == '__main__':
+    unittest.main()
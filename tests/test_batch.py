@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+"""
+Tests of the batch read planner
+
+Runs on CPython and on the MicroPython unix port, from the repository
+root::
+
+    python3 -m unittest discover tests
+"""
+
+# system packages
+import struct
+import sys
+import unittest
+
+sys.path.insert(0, 'benchmarks')
+sys.path.insert(0, 'lib')
+
+import fakes    # noqa: E402
+fakes.install()
+
+from umodbus import const as Const                      # noqa: E402
+from umodbus.batch import plan_reads, split_results     # noqa: E402
+from umodbus.common import CommonModbusFunctions        # noqa: E402
+
+
+class FakeClient(CommonModbusFunctions):
+    """Client answering register reads with the register address"""
+    def __init__(self):
+        self.requests = []
+
+    def _send_receive(self, slave_addr, modbus_pdu, count):
+        function_code, address, quantity = struct.unpack('>BHH', modbus_pdu)
+        self.requests.append((function_code, address, quantity))
+        if function_code in (Const.READ_COILS, Const.READ_DISCRETE_INPUTS):
+            # all bits set
+            return bytes([0xFF] * ((quantity + 7) // 8))
+        return struct.pack('>{}H'.format(quantity),
+                           *range(address, address + quantity))
+
+
+class TestPlanReads(unittest.TestCase):
+    def _requests(self, reads, max_gap=0):
+        return [request[:3] for request in plan_reads(reads, max_gap)]
+
+    def test_touching_and_overlapping_reads_are_merged(self):
+        self.assertEqual(self._requests([('HREGS', 0, 2),
+                                         ('HREGS', 2, 3),
+                                         ('HREGS', 4, 2),
+                                         ('HREGS', 0, 2)]),
+                         [['HREGS', 0, 6]])
+
+    def test_gap_is_bridged_up_to_max_gap(self):
+        reads = [('HREGS', 0, 2), ('HREGS', 5, 1)]
+        self.assertEqual(self._requests(reads, max_gap=2),
+                         [['HREGS', 0, 2], ['HREGS', 5, 1]])
+        self.assertEqual(self._requests(reads, max_gap=3),
+                         [['HREGS', 0, 6]])
+
+    def test_register_types_are_not_merged(self):
+        self.assertEqual(self._requests([('IREGS', 2, 1),
+                                         ('HREGS', 0, 2),
+                                         ('HREGS', 2, 1)]),
+                         [['HREGS', 0, 3], ['IREGS', 2, 1]])
+
+    def test_register_reads_stay_within_125(self):
+        reads = [('HREGS', address, 25) for address in range(0, 250, 25)]
+        self.assertEqual(self._requests(reads),
+                         [['HREGS', 0, 125], ['HREGS', 125, 125]])
+        self.assertEqual(self._requests([('IREGS', 0, 100),
+                                         ('IREGS', 100, 26)]),
+                         [['IREGS', 0, 100], ['IREGS', 100, 26]])
+
+    def test_bit_reads_stay_within_2000(self):
+        reads = [('COILS', 0, 1000), ('COILS', 1000, 1000),
+                 ('COILS', 2000, 1)]
+        self.assertEqual(self._requests(reads),
+                         [['COILS', 0, 2000], ['COILS', 2000, 1]])
+        self.assertEqual(self._requests([('ISTS', 0, 1999),
+                                         ('ISTS', 1999, 2)]),
+                         [['ISTS', 0, 1999], ['ISTS', 1999, 2]])
+
+    def test_invalid_reads_are_rejected(self):
+        for read in (('HREGS', 0, 0), ('HREGS', 0, 126),
+                     ('COILS', 0, 2001), ('FOO', 0, 1)):
+            with self.assertRaises(ValueError):
+                plan_reads([read])
+
+    def test_results_are_split_per_read(self):
+        request = plan_reads([('HREGS', 10, 2), ('HREGS', 13, 1)],
+                             max_gap=1)[0]
+        self.assertEqual(split_results(request, [10, 11, 12, 13]),
+                         {('HREGS', 10, 2): [10, 11],
+                          ('HREGS', 13, 1): [13]})
+
+
+class TestReadBatch(unittest.TestCase):
+    def test_one_request_per_merged_range(self):
+        client = FakeClient()
+        results = client.read_batch(1, [('HREGS', 0, 2),
+                                        ('HREGS', 3, 2),
+                                        ('COILS', 4, 3)], max_gap=1)
+
+        self.assertEqual(client.requests,
+                         [(Const.READ_COILS, 4, 3),
+                          (Const.READ_HOLDING_REGISTERS, 0, 5)])
+        self.assertEqual(results, {('HREGS', 0, 2): (0, 1),
+                                   ('HREGS', 3, 2): (3, 4),
+                                   ('COILS', 4, 3): [True, True, True]})
+
+
+if __name__ == '__main__':
+    unittest.main()
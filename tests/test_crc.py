@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+"""
+Tests of the Modbus CRC16 engine
+
+Runs on CPython and on the MicroPython unix port, from the repository
+root::
+
+    python3 -m unittest discover tests
+"""
+
+# system packages
+import struct
+import sys
+import unittest
+
+sys.path.insert(0, 'benchmarks')
+sys.path.insert(0, 'lib')
+
+import fakes    # noqa: E402
+fakes.install()
+
+import micropython                      # noqa: E402
+
+from umodbus import crc                 # noqa: E402
+from umodbus.crc import CRC16, crc16    # noqa: E402
+
+#: Read holding registers request of the Modbus over serial line guide
+FRAME = bytes([0x01, 0x03, 0x00, 0x00, 0x00, 0x0A])
+FRAME_CRC = 0xCDC5
+
+
+def _native_update():
+    # the viper implementation, run as plain Python where there is no
+    # native emitter
+    if hasattr(micropython, 'viper'):
+        from umodbus import crc_viper
+        return crc_viper.crc16_update
+
+    micropython.viper = lambda func: func
+    try:
+        from umodbus import crc_viper
+    finally:
+        del micropython.viper
+        sys.modules.pop('umodbus.crc_viper', None)
+    crc_viper.ptr8 = memoryview
+    crc_viper.uint = int
+    return crc_viper.crc16_update
+
+
+class TestCRC16(unittest.TestCase):
+    def test_known_frame(self):
+        self.assertEqual(crc16(FRAME), FRAME_CRC)
+        frame = FRAME + struct.pack('<H', FRAME_CRC)
+        self.assertEqual(crc16(frame), 0)
+
+    def test_incremental_over_memoryview(self):
+        buf = bytearray(FRAME) + bytearray(2)
+        view = memoryview(buf)
+        engine = CRC16()
+        engine.update(view, 0, 2)
+        engine.update(view, 2, len(FRAME))
+        self.assertEqual(engine.crc, FRAME_CRC)
+        self.assertFalse(engine.valid)
+
+        engine.pack_into(buf, len(FRAME))
+        engine.update(view, len(FRAME))
+        self.assertTrue(engine.valid)
+
+        engine.reset()
+        self.assertEqual(engine.update(FRAME, 1, 3), crc16(FRAME, 1, 3))
+
+    def test_native_and_fallback_agree(self):
+        native = _native_update()
+        data = bytes((i * 37 + 11) & 0xFF for i in range(300))
+        for start, end in ((0, 0), (0, 1), (3, 17), (0, 300), (299, 300)):
+            for value in (crc.CRC16_INIT, 0, 0x1234):
+                self.assertEqual(native(value, data, start, end),
+                                 crc._crc16_update(value, data, start, end))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+"""
+Tests of the dimmer curves applied when DMX frames are built
+
+Runs on CPython and on the MicroPython unix port, from the repository
+root::
+
+    python3 -m unittest discover tests
+"""
+
+# system packages
+import sys
+import unittest
+
+sys.path.insert(0, 'benchmarks')
+sys.path.insert(0, 'lib')
+sys.path.insert(0, '.')
+
+import fakes    # noqa: E402
+fakes.install()
+
+from smart_home import curves                               # noqa: E402
+from smart_home.curves import (FrameCurves, GAMMA_22,       # noqa: E402
+                               LINEAR, S_CURVE)
+
+#: Length of the tested frames, start code included
+LENGTH = 33
+
+
+def _per_channel(frame_curves: FrameCurves, src) -> bytearray:
+    # reference result, every channel mapped through its own lut
+    out = bytearray(len(src))
+    out[0] = 0xFF
+    for channel in range(1, len(src)):
+        table = frame_curves.tables[frame_curves.index[channel]]
+        out[channel] = table[src[channel]]
+    return out
+
+
+class TestFrameCurves(unittest.TestCase):
+    def setUp(self):
+        self.curves = FrameCurves(LENGTH)
+        self.src = bytearray((7 * i) & 0xFF for i in range(LENGTH))
+        self.out = bytearray([0xFF] * LENGTH)
+
+    def tearDown(self):
+        curves._TRANSLATE = hasattr(bytes, 'translate')
+
+    def test_linear_frame_is_copied(self):
+        self.assertEqual(self.curves.uniform(LENGTH), 0)
+        self.curves.apply(self.src, self.out)
+        self.assertEqual(self.out, bytes([0xFF]) + self.src[1:])
+
+    def test_uniform_curve_matches_per_channel_mapping(self):
+        for channel in range(1, LENGTH):
+            self.curves.assign(channel, GAMMA_22)
+        self.assertEqual(self.curves.uniform(LENGTH), 1)
+
+        for translate in (True, False):
+            curves._TRANSLATE = translate and hasattr(bytes, 'translate')
+            out = bytearray([0xFF] * LENGTH)
+            self.curves.apply(self.src, out)
+            self.assertEqual(out, _per_channel(self.curves, self.src))
+
+    def test_mixed_curves_are_mapped_per_channel(self):
+        self.curves.assign(1, GAMMA_22)
+        self.curves.assign(2, S_CURVE)
+        self.curves.assign(3, GAMMA_22)
+        self.assertEqual(self.curves.uniform(LENGTH), -1)
+        self.assertEqual(len(self.curves.tables), 3)
+
+        self.curves.apply(self.src, self.out)
+        self.assertEqual(self.out, _per_channel(self.curves, self.src))
+        self.assertEqual(self.out[1], GAMMA_22[self.src[1]])
+        self.assertEqual(self.out[2], S_CURVE[self.src[2]])
+
+    def test_reassigning_updates_the_uniform_curve(self):
+        self.curves.assign(5, S_CURVE)
+        self.assertEqual(self.curves.uniform(LENGTH), -1)
+        # channels beyond the frame do not matter
+        self.assertEqual(self.curves.uniform(5), 0)
+
+        self.curves.assign(5, None)
+        self.assertEqual(self.curves.uniform(LENGTH), 0)
+        self.assertIs(self.curves.tables[0], LINEAR)
+
+    def test_curve_needs_256_entries(self):
+        with self.assertRaises(ValueError):
+            self.curves.assign(1, bytes(255))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+"""
+Tests of sending DMX frames by DMA on the simulated Pico W
+
+Runs on CPython from the repository root::
+
+    python3 -m unittest discover tests
+"""
+
+# system packages
+import sys
+import unittest
+
+sys.path.insert(0, 'lib')
+sys.path.insert(0, '.')
+
+import sim      # noqa: E402
+
+#: Channels of the tested universe
+SIZE = 16
+
+
+def setUpModule():
+    global clock, machine, rp2, DMX, BREAK_MAB_US, SLOT_US
+    clock = sim.install()
+    import machine
+    import rp2
+    from dmx_master import DMX, BREAK_MAB_US, SLOT_US
+
+
+def tearDownModule():
+    sim.uninstall()
+
+
+class TestDMX(unittest.TestCase):
+    def setUp(self):
+        rp2.state_machines.clear()
+        self.done = []
+        self.dmx = DMX(machine.Pin(10, machine.Pin.OUT),
+                       size=SIZE,
+                       on_done=self.done.append)
+        self.sm = rp2.state_machines[self.dmx.machine_nr]
+
+    def tearDown(self):
+        self.dmx.deinit()
+
+    def _sent(self) -> bytes:
+        self.dmx.wait()
+        return bytes(self.sm.last_frame().data)
+
+    def test_send_returns_before_the_frame_is_out(self):
+        self.dmx.set_all(3)
+        start = clock.now_us()
+        self.assertTrue(self.dmx.send())
+        self.assertLess(clock.now_us() - start, SLOT_US)
+        self.assertTrue(self.dmx.busy())
+
+        self.assertEqual(self._sent(), bytes([0] + [3] * SIZE))
+        self.assertGreaterEqual(clock.now_us() - start,
+                                BREAK_MAB_US + SLOT_US * (SIZE + 1))
+        self.assertEqual(self.done, [self.dmx])
+
+    def test_universe_is_free_while_sending(self):
+        self.dmx.set_channel(1, 10)
+        self.assertTrue(self.dmx.send())
+        # the values of the sent frame are kept for the next one
+        self.assertEqual(self.dmx.get_channel(1), 10)
+        self.dmx.set_channel(1, 20)
+        self.assertFalse(self.dmx.send())
+
+        self.assertEqual(self._sent()[1], 10)
+        self.assertTrue(self.dmx.send())
+        self.assertEqual(self._sent()[1], 20)
+
+    def test_resize_applies_to_the_next_frame(self):
+        self.dmx.set_all(5)
+        self.assertTrue(self.dmx.send())
+        self.dmx.resize(4)
+
+        self.assertEqual(len(self._sent()), SIZE + 1)
+        self.assertTrue(self.dmx.send())
+        self.assertEqual(self._sent(), bytes([0, 5, 5, 5, 5]))
+
+
+if __name__ == '__main__':
+    unittest.main()
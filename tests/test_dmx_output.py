@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+"""
+Tests of several DMX universes on the simulated Pico W
+
+Runs on CPython from the repository root::
+
+    python3 -m unittest discover tests
+"""
+
+# system packages
+import sys
+import unittest
+
+sys.path.insert(0, 'lib')
+sys.path.insert(0, '.')
+
+import sim      # noqa: E402
+
+#: Frames per second of the tested universes
+FPS = 25
+#: Frame period in microseconds
+PERIOD = 1000000 // FPS
+
+
+def setUpModule():
+    global clock, machine, rp2, DMXOutput
+    clock = sim.install()
+    import machine
+    import rp2
+    from dmx_master import DMXOutput
+
+
+def tearDownModule():
+    sim.uninstall()
+
+
+class TestDMXOutput(unittest.TestCase):
+    def _output(self, synchronised: bool):
+        rp2.state_machines.clear()
+        self.output = DMXOutput([machine.Pin(pin, machine.Pin.OUT)
+                                 for pin in (10, 11, 12)],
+                                size=16,
+                                fps=FPS,
+                                synchronised=synchronised)
+        return self.output
+
+    def tearDown(self):
+        self.output.deinit()
+
+    def _masks(self, output, duration: int, refresh=None) -> list:
+        # (time, bit mask) of each service call starting frames, services
+        # every 0.5 ms
+        masks = []
+        start = clock.now_us()
+        while clock.now_us() - start < duration:
+            started = output.service(refresh)
+            if started:
+                masks.append((clock.now_us() - start, started))
+            clock.sleep_us(500)
+        return masks
+
+    def test_synchronised_universes_start_together(self):
+        output = self._output(True)
+        masks = self._masks(output, 3 * PERIOD - 1000)
+
+        self.assertEqual([mask for _, mask in masks], [0b111] * 3)
+        for index, (at, _) in enumerate(masks):
+            self.assertAlmostEqual(at, index * PERIOD, delta=1000)
+        starts = [sm.last_frame().start_us
+                  for sm in rp2.state_machines.values()]
+        self.assertLess(max(starts) - min(starts), 100)
+
+    def test_staggered_universes_spread_over_the_period(self):
+        output = self._output(False)
+        masks = self._masks(output, 2 * PERIOD - 1000)
+
+        self.assertEqual([mask for _, mask in masks],
+                         [0b001, 0b010, 0b100] * 2)
+        for index, (at, _) in enumerate(masks):
+            self.assertAlmostEqual(at, index * PERIOD // 3, delta=1000)
+
+    def test_refresh_skips_universes(self):
+        for synchronised in (True, False):
+            output = self._output(synchronised)
+            calls = []
+
+            def refresh(index):
+                calls.append(index)
+                return index != 1
+
+            masks = self._masks(output, PERIOD - 1000, refresh)
+            self.assertEqual(calls, [0, 1, 2])
+            self.assertEqual(sorted(mask for _, mask in masks),
+                             [0b001, 0b100] if not synchronised else [0b101])
+            output.deinit()
+
+
+if __name__ == '__main__':
+    unittest.main()
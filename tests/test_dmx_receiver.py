@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+"""
+Tests of the continuous DMX receiver on the simulated Pico W
+
+Runs on CPython from the repository root::
+
+    python3 -m unittest discover tests
+"""
+
+# system packages
+import sys
+import unittest
+
+sys.path.insert(0, 'lib')
+sys.path.insert(0, '.')
+
+import sim      # noqa: E402
+
+#: Channels of the tested receiver
+SIZE = 16
+
+
+def setUpModule():
+    global clock, machine, rp2, DMXReceiver
+    clock = sim.install()
+    import machine
+    import rp2
+    from pio_code.pio_dmx import DMXReceiver
+
+
+def tearDownModule():
+    sim.uninstall()
+
+
+class TestDMXReceiver(unittest.TestCase):
+    def setUp(self):
+        self.rx = DMXReceiver(machine.Pin(14, machine.Pin.IN),
+                              machine_nr=1,
+                              size=SIZE)
+        self.sm = rp2.state_machines[1]
+        self.rx.start()
+        # the first BREAK only synchronises
+        self.at_us = clock.now_us() + 100
+
+    def tearDown(self):
+        self.rx.deinit()
+
+    def _feed(self, *frames) -> None:
+        for frame in frames:
+            self.at_us = self.sm.feed_dmx(frame, at_us=self.at_us) + 100
+        clock.advance(self.at_us - clock.now_us())
+
+    def _frame(self, value: int, start_code: int = 0) -> bytes:
+        return bytes([start_code]) + bytes([value] * SIZE)
+
+    def test_latest_frame_is_read(self):
+        self._feed(self._frame(1), self._frame(2), self._frame(3))
+        # the last frame ends with the next BREAK
+        self._feed(b'')
+
+        universe = bytearray(SIZE + 1)
+        self.assertEqual(self.rx.read(universe), SIZE + 1)
+        self.assertEqual(universe, self._frame(3))
+        self.assertEqual(self.rx.get_channel(SIZE), 3)
+        self.assertEqual((self.rx.frames, self.rx.errors, self.rx.ignored),
+                         (3, 0, 0))
+
+    def test_rejected_frames_keep_the_latest_one(self):
+        self._feed(self._frame(7),
+                   self._frame(8, start_code=0xCC),
+                   b'',
+                   self._frame(9)[:5])
+        self._feed(b'')
+
+        universe = bytearray(SIZE + 1)
+        self.assertEqual(self.rx.read(universe), 5)
+        self.assertEqual(universe[:5], self._frame(9)[:5])
+        self.assertEqual((self.rx.frames, self.rx.errors, self.rx.ignored),
+                         (2, 1, 1))
+
+    def test_frame_after_too_long_one_is_dropped(self):
+        self._feed(self._frame(1),
+                   bytes(3 * SIZE),
+                   self._frame(2),
+                   self._frame(3))
+        self._feed(b'')
+
+        self.assertEqual(self.rx.get_channel(1), 3)
+        self.assertEqual((self.rx.frames, self.rx.errors, self.rx.ignored),
+                         (2, 1, 0))
+
+    def test_counters_are_updated_outside_the_interrupt(self):
+        self._feed(self._frame(1))
+        self.sm.fire_irq()
+        self.assertEqual(self.rx.frames, 0)
+        self.assertEqual(self.rx.get_channel(1), 1)
+
+        clock.advance(1)
+        self.assertEqual(self.rx.frames, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+"""
+Tests of the change events of remotely written registers
+
+Runs on CPython and on the MicroPython unix port, from the repository
+root::
+
+    python3 -m unittest discover tests
+"""
+
+# system packages
+import sys
+import time
+import unittest
+
+sys.path.insert(0, 'benchmarks')
+sys.path.insert(0, 'lib')
+
+import fakes    # noqa: E402
+fakes.install()
+
+from umodbus import events      # noqa: E402
+from umodbus.events import ChangeQueue  # noqa: E402
+
+
+class FakeTime(object):
+    """Millisecond clock set by the test"""
+    def __init__(self):
+        self.now = 1000
+
+    def ticks_ms(self):
+        return self.now
+
+    def ticks_diff(self, end, start):
+        return time.ticks_diff(end, start)
+
+
+class TestChangeQueue(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeTime()
+        events.time = self.clock
+        self.queue = ChangeQueue()
+
+    def tearDown(self):
+        events.time = time
+
+    def test_remove_latest_write_drops_older_ones(self):
+        self.queue.append('HREGS', 5, 1)
+        self.clock.now += 10
+        self.queue.append('HREGS', 5, 2)
+        self.assertEqual(self.queue.latest('HREGS'),
+                         {5: {'val': 2, 'time': self.clock.now}})
+
+        self.assertTrue(self.queue.remove('HREGS', 5, self.clock.now))
+        self.assertEqual(self.queue.latest('HREGS'), dict())
+        self.assertEqual(len(self.queue), 0)
+
+    def test_remove_writes_of_the_same_millisecond(self):
+        self.queue.append('HREGS', 5, 1)
+        self.queue.append('HREGS', 5, 2)
+
+        self.assertTrue(self.queue.remove('HREGS', 5, self.clock.now))
+        self.assertEqual(self.queue.latest('HREGS'), dict())
+
+    def test_remove_older_write_keeps_later_one(self):
+        self.queue.append('HREGS', 5, 1)
+        first = self.clock.now
+        self.clock.now += 10
+        self.queue.append('HREGS', 5, 2)
+
+        self.assertTrue(self.queue.remove('HREGS', 5, first))
+        self.assertEqual(self.queue.latest('HREGS'),
+                         {5: {'val': 2, 'time': self.clock.now}})
+
+    def test_remove_keeps_other_addresses_of_a_range(self):
+        self.queue.append('HREGS', 4, [7, 8, 9])
+
+        self.assertTrue(self.queue.remove('HREGS', 5, self.clock.now))
+        self.assertFalse(self.queue.remove('HREGS', 5, self.clock.now))
+        self.assertEqual(sorted(self.queue.latest('HREGS')), [4, 6])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+"""
+Tests of the fades advanced once per DMX frame
+
+Runs on CPython and on the MicroPython unix port, from the repository
+root::
+
+    python3 -m unittest discover tests
+"""
+
+# system packages
+import sys
+import unittest
+
+sys.path.insert(0, 'benchmarks')
+sys.path.insert(0, 'lib')
+sys.path.insert(0, '.')
+
+import fakes    # noqa: E402
+fakes.install()
+
+from smart_home.fading import (FadeEngine, GAMMA, GAMMA_LUT,    # noqa: E402
+                               INVERSE_GAMMA_LUT, LINEAR)
+
+#: Channels of the tested universe, start code included
+SIZE = 9
+
+
+class TestFadeEngine(unittest.TestCase):
+    def setUp(self):
+        self.engine = FadeEngine(SIZE)
+        self.out = bytearray(SIZE)
+
+    def _run(self, channel: int, limit: int = 1000) -> list:
+        # values of the channel per frame until all fades are done
+        values = []
+        while self.engine.tick(self.out):
+            values.append(self.out[channel])
+            self.assertLess(len(values), limit)
+        return values
+
+    def test_linear_fade_ends_exactly_on_the_goal(self):
+        self.engine.fade(1, 10, 200, 3 << 8)
+        values = self._run(1)
+
+        self.assertEqual(values[0], 13)
+        self.assertEqual(values[-1], 200)
+        self.assertEqual(len(values), 64)
+        self.assertEqual(values, sorted(values))
+        self.assertFalse(self.engine.fading(1))
+
+    def test_fade_down_to_zero(self):
+        self.engine.fade(2, 255, 0, 0x180)
+        values = self._run(2)
+
+        self.assertEqual(values[-1], 0)
+        self.assertEqual(values, sorted(values, reverse=True))
+
+    def test_gamma_fade_ends_on_the_goal(self):
+        for goal in (1, 2, 128, 254, 255):
+            self.engine.fade(3, 0, goal, 0x80, GAMMA)
+            values = self._run(3)
+            self.assertEqual(values[-1], goal)
+            self.assertEqual(values, sorted(values))
+
+        self.engine.fade(3, 255, 0, 0x80, GAMMA)
+        self.assertEqual(self._run(3)[-1], 0)
+
+    def test_gamma_fade_steps_in_perceived_brightness(self):
+        self.engine.fade(4, 0, 255, 1 << 8, GAMMA)
+        values = self._run(4)
+        self.assertEqual(values[:-1],
+                         [GAMMA_LUT[level] for level in range(1, 255)])
+        self.assertEqual(INVERSE_GAMMA_LUT[255], 255)
+
+    def test_refade_keeps_one_active_entry(self):
+        self.engine.fade(5, 0, 100, 1 << 8)
+        self.engine.tick(self.out)
+        self.engine.fade(5, self.out[5], 0, 1 << 8, LINEAR)
+        self.assertEqual(self.engine.count, 1)
+        self.assertEqual(self._run(5)[-1], 0)
+
+    def test_set_ends_a_running_fade(self):
+        self.engine.fade(6, 0, 255, 1)
+        self.engine.fade(7, 0, 10, 1 << 8)
+        self.engine.set(6, 42)
+        self._run(7)
+
+        self.assertEqual(self.out[6], 42)
+        self.assertEqual(self.out[7], 10)
+        self.assertFalse(self.engine.tick(self.out))
+
+
+if __name__ == '__main__':
+    unittest.main()
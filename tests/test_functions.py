@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+"""
+Tests of packing and unpacking coil bits
+
+Runs on CPython and on the MicroPython unix port, from the repository
+root::
+
+    python3 -m unittest discover tests
+"""
+
+# system packages
+import sys
+import unittest
+
+sys.path.insert(0, 'benchmarks')
+sys.path.insert(0, 'lib')
+
+import fakes    # noqa: E402
+fakes.install()
+
+from umodbus import functions   # noqa: E402
+
+
+def _pattern(quantity: int) -> list:
+    return [(i * 7) % 3 == 0 for i in range(quantity)]
+
+
+class TestBits(unittest.TestCase):
+    def test_full_groups_start_at_the_msb(self):
+        values = [True, False, False, False, False, False, True, True,
+                  False, True, False, False, False, False, False, False]
+        self.assertEqual(functions.pack_bits(values), b'\x83\x40')
+
+    def test_last_group_ends_at_the_lsb(self):
+        self.assertEqual(functions.pack_bits([True, True, False]), b'\x06')
+        self.assertEqual(functions.pack_bits([True] * 8 + [True, False]),
+                         b'\xff\x02')
+
+    def test_round_trip(self):
+        for quantity in (1, 7, 8, 9, 15, 16, 17, 1968, 2000):
+            values = _pattern(quantity)
+            packed = functions.pack_bits(values)
+            self.assertEqual(len(packed), (quantity + 7) // 8)
+            self.assertEqual(functions.bytes_to_bool(packed, quantity),
+                             values)
+            self.assertEqual([functions.packed_bit(packed, i, quantity)
+                              for i in range(quantity)], values)
+
+    def test_write_multiple_coils_pdu(self):
+        self.assertEqual(functions.write_multiple_coils(
+                             starting_address=0x13,
+                             value_list=[1, 0, 1, 1, 0, 0, 1, 1, 1, 0]),
+                         b'\x0f\x00\x13\x00\x0a\x02\xb3\x02')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+"""
+Tests of the Modbus TCP to RTU gateway forwarding
+
+Runs on CPython and on the MicroPython unix port, from the repository
+root::
+
+    python3 -m unittest discover tests
+"""
+
+# system packages
+import struct
+import sys
+import unittest
+
+sys.path.insert(0, 'benchmarks')
+sys.path.insert(0, 'lib')
+
+import fakes    # noqa: E402
+fakes.install()
+
+from umodbus import const as Const          # noqa: E402
+from umodbus.gateway import ModbusTCPGateway    # noqa: E402
+from umodbus.tcp import TCPConnection       # noqa: E402
+
+from test_tcp import UNIT_ADDR, RecordingSocket, _adu, _responses  # noqa: E402
+
+
+class FakeSerial(object):
+    """Serial host answering every forwarded PDU with a fixed response"""
+    def __init__(self, response: bytes):
+        self.response = response
+        self.forwarded = []
+
+    def forward_pdu(self, modbus_pdu: bytes, slave_addr: int) -> bytes:
+        self.forwarded.append((slave_addr, bytes(modbus_pdu)))
+        return self.response
+
+
+class TestGatewayForward(unittest.TestCase):
+    def setUp(self):
+        self.serial = FakeSerial(bytes([Const.READ_EXCEPTION_STATUS, 0x5A]))
+        self.gateway = ModbusTCPGateway(self.serial, cache_ttl=1000)
+        self.itf = self.gateway._itf
+        self.sock = RecordingSocket()
+        self.conn = TCPConnection(self.itf, self.sock, ('loopback', 0))
+        self.itf._clients.append(self.conn)
+        self.itf.get_request = self._get_request
+
+    def _get_request(self, unit_addr_list=None, timeout=None):
+        self.conn.decode(unit_addr_list, self.itf._requests)
+        return self.itf._next_request()
+
+    def test_short_pdu_is_forwarded_as_is(self):
+        self.conn._rx_buf = bytearray(
+            _adu(1, bytes([Const.READ_EXCEPTION_STATUS])))
+
+        self.assertTrue(self.gateway.process())
+        self.assertEqual(self.conn.buffered, 0)
+        self.assertEqual(self.serial.forwarded,
+                         [(UNIT_ADDR, bytes([Const.READ_EXCEPTION_STATUS]))])
+        self.assertEqual(_responses(self.sock.data),
+                         [(1, bytes([Const.READ_EXCEPTION_STATUS, 0x5A]))])
+
+    def test_truncated_read_is_not_cached(self):
+        self.serial.response = struct.pack('>BBH',
+                                           Const.READ_HOLDING_REGISTERS, 2, 7)
+        pdu = struct.pack('>BH', Const.READ_HOLDING_REGISTERS, 0)
+        self.conn._rx_buf = bytearray(_adu(2, pdu) + _adu(3, pdu))
+
+        self.assertTrue(self.gateway.process())
+        self.assertEqual(len(self.serial.forwarded), 2)
+        self.assertEqual(self.gateway._cache, dict())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+"""
+Tests of the function code handlers of the Modbus server
+
+Runs on CPython and on the MicroPython unix port, from the repository
+root::
+
+    python3 -m unittest discover tests
+"""
+
+# system packages
+import struct
+import sys
+import unittest
+
+sys.path.insert(0, 'benchmarks')
+sys.path.insert(0, 'lib')
+
+import fakes    # noqa: E402
+fakes.install()
+
+from umodbus import const as Const      # noqa: E402
+from umodbus import functions           # noqa: E402
+from umodbus.modbus import Modbus       # noqa: E402
+
+from test_tcp import RecordingSocket, _adu, _responses  # noqa: E402
+
+
+class ModbusTestCase(unittest.TestCase):
+    """Server answering requests of a loopback TCP connection"""
+    def setUp(self):
+        self.itf = fakes.loopback_tcp()
+        self.sock = RecordingSocket()
+        self.itf.conn.sock = self.sock
+        self.itf.get_request = self._get_request
+        self.server = Modbus(self.itf, None)
+        self.written = []
+        self.server.add_hreg(10, [0x12, 0x34, 0x56],
+                             on_set_cb=self._on_set)
+
+    def _get_request(self, unit_addr_list=None, timeout=None):
+        self.itf.conn.decode(unit_addr_list, self.itf._requests)
+        return self.itf._next_request()
+
+    def _on_set(self, reg_type, address, val):
+        self.written.append((reg_type, address, list(val)))
+
+    def _request(self, pdu: bytes) -> bytes:
+        self.sock.data = bytearray()
+        self.itf.conn._rx_buf = bytearray(_adu(1, pdu))
+        self.server.process()
+        return _responses(self.sock.data)[0][1]
+
+
+class TestDispatch(ModbusTestCase):
+    def test_mask_write_register(self):
+        pdu = struct.pack('>BHHH', Const.MASK_WRITE_REGISTER,
+                          10, 0xF2, 0x25)
+        # the request is echoed
+        self.assertEqual(self._request(pdu), pdu)
+        # (0x12 AND 0xF2) OR (0x25 AND NOT 0xF2)
+        self.assertEqual(self.server.get_hreg(10), 0x17)
+        self.assertEqual(self.written, [('HREGS', 10, [0x17])])
+
+    def test_mask_write_unknown_register(self):
+        pdu = struct.pack('>BHHH', Const.MASK_WRITE_REGISTER, 20, 0, 0)
+        self.assertEqual(self._request(pdu),
+                         bytes([Const.MASK_WRITE_REGISTER + 0x80,
+                                Const.ILLEGAL_DATA_ADDRESS]))
+
+    def test_custom_handler_replaces_and_removes(self):
+        requests = []
+        self.server.set_handler(Const.READ_EXCEPTION_STATUS,
+                                lambda request: (requests.append(request),
+                                                 request.send_pdu(b'\x07\x5a')))
+        self.assertEqual(self._request(bytes([Const.READ_EXCEPTION_STATUS])),
+                         b'\x07\x5a')
+        self.assertEqual(len(requests), 1)
+
+        self.server.remove_handler(Const.READ_EXCEPTION_STATUS)
+        self.assertEqual(self._request(bytes([Const.READ_EXCEPTION_STATUS])),
+                         bytes([Const.READ_EXCEPTION_STATUS + 0x80,
+                                Const.ILLEGAL_FUNCTION]))
+
+
+class TestReadWriteMultipleRegisters(ModbusTestCase):
+    def test_write_goes_before_read(self):
+        pdu = struct.pack('>BHHHHBhh', Const.READ_WRITE_MULTIPLE_REGISTERS,
+                          10, 3, 11, 2, 4, -1, 0x78)
+        self.assertEqual(self._request(pdu),
+                         struct.pack('>BBHhH',
+                                     Const.READ_WRITE_MULTIPLE_REGISTERS,
+                                     6, 0x12, -1, 0x78))
+        # written from the wire as unsigned, like FC16
+        self.assertEqual(self.server.get_hreg(11), 0xFFFF)
+        self.assertEqual(self.written, [('HREGS', 11, [0xFFFF, 0x78])])
+
+    def test_unknown_write_address(self):
+        pdu = struct.pack('>BHHHHBH', Const.READ_WRITE_MULTIPLE_REGISTERS,
+                          10, 1, 30, 1, 2, 5)
+        self.assertEqual(self._request(pdu),
+                         bytes([Const.READ_WRITE_MULTIPLE_REGISTERS + 0x80,
+                                Const.ILLEGAL_DATA_ADDRESS]))
+        self.assertEqual(self.written, [])
+
+    def test_client_request_pdu(self):
+        self.assertEqual(
+            functions.read_write_multiple_registers(read_address=10,
+                                                    read_qty=3,
+                                                    write_address=11,
+                                                    register_values=[-1, 5]),
+            struct.pack('>BHHHHBhh', Const.READ_WRITE_MULTIPLE_REGISTERS,
+                        10, 3, 11, 2, 4, -1, 5))
+        with self.assertRaises(ValueError):
+            functions.read_write_multiple_registers(10, 126, 11, [1])
+        with self.assertRaises(ValueError):
+            functions.read_write_multiple_registers(10, 1, 11, [1] * 122)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+"""
+Tests of the register banks and the register API of the Modbus class
+
+Runs on CPython and on the MicroPython unix port, from the repository
+root::
+
+    python3 -m unittest discover tests
+"""
+
+# system packages
+import struct
+import sys
+import unittest
+
+sys.path.insert(0, 'benchmarks')
+sys.path.insert(0, 'lib')
+
+import fakes    # noqa: E402
+fakes.install()
+
+from umodbus.modbus import Modbus       # noqa: E402
+
+
+class TestRegisterAPI(unittest.TestCase):
+    def setUp(self):
+        self.client = Modbus(fakes.loopback_tcp(), None)
+
+    def test_negative_hreg_reads_back_signed(self):
+        self.client.add_hreg(0, -1)
+        self.assertEqual(self.client.get_hreg(0), -1)
+
+        self.client.set_hreg(0, 65535)
+        self.assertEqual(self.client.get_hreg(0), 65535)
+
+        self.client.set_hreg(0, -32768)
+        self.assertEqual(self.client.get_hreg(0), -32768)
+        self.assertEqual(self.client.remove_hreg(0), -32768)
+
+    def test_negative_ireg_reads_back_signed(self):
+        self.client.add_ireg(3, -200)
+        self.assertEqual(self.client.get_ireg(3), -200)
+
+    def test_list_valued_registers_are_flattened(self):
+        self.client.add_hreg(10, [1, -2, 3])
+        self.assertEqual([self.client.get_hreg(addr) for addr in range(10, 13)],
+                         [1, -2, 3])
+        self.assertEqual(self.client.hregs, [10, 11, 12])
+
+    def test_negative_value_on_the_wire(self):
+        self.client.add_hreg(0, [-2, 5])
+        buf = bytearray(4)
+        self.client._register_dict['HREGS'].pack_into(buf, 0, 0, 2)
+        self.assertEqual(struct.unpack('>HH', buf), (0xFFFE, 5))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+"""
+Tests of the polling scheduler of a Modbus host
+
+Runs on CPython and on the MicroPython unix port, from the repository
+root::
+
+    python3 -m unittest discover tests
+"""
+
+# system packages
+import sys
+import time
+import unittest
+
+sys.path.insert(0, 'benchmarks')
+sys.path.insert(0, 'lib')
+
+import fakes    # noqa: E402
+fakes.install()
+
+from umodbus import scheduler                   # noqa: E402
+from umodbus.scheduler import PollScheduler     # noqa: E402
+
+
+class FakeTime(object):
+    """Clock set by the test, microseconds follow milliseconds"""
+    def __init__(self):
+        self.now = 1000
+
+    def ticks_ms(self):
+        return self.now
+
+    def ticks_us(self):
+        return self.now * 1000
+
+    def ticks_add(self, ticks, delta):
+        return time.ticks_add(ticks, delta)
+
+    def ticks_diff(self, end, start):
+        return time.ticks_diff(end, start)
+
+
+class FakeHost(object):
+    """Host answering from a register list, or failing as configured"""
+    def __init__(self):
+        self.log = []
+        self.regs = [0] * 10
+        #: slave address -> exception raised by each transaction
+        self.errors = {}
+
+    def _transaction(self, kind, slave_addr, address):
+        self.log.append((kind, slave_addr, address))
+        if slave_addr in self.errors:
+            raise self.errors[slave_addr]
+
+    def read_holding_registers(self, slave_addr, address, quantity,
+                               signed=True):
+        self._transaction('read', slave_addr, address)
+        return tuple(self.regs[address:address + quantity])
+
+    def write_single_register(self, slave_addr, address, value, signed=True):
+        self._transaction('write', slave_addr, address)
+        self.regs[address] = value
+        return True
+
+
+class TestPollScheduler(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeTime()
+        scheduler.time = self.clock
+        self.host = FakeHost()
+        self.scheduler = PollScheduler(self.host,
+                                       backoff=100,
+                                       max_backoff=300)
+
+    def tearDown(self):
+        scheduler.time = time
+
+    def test_write_goes_before_due_reads(self):
+        self.scheduler.add_poll(1, 'HREGS', 0, 4, 50)
+        self.scheduler.write(1, 'HREGS', 2, 42)
+
+        self.assertTrue(self.scheduler.service())
+        self.assertTrue(self.scheduler.service())
+        self.assertFalse(self.scheduler.service())
+        self.assertEqual(self.host.log, [('write', 1, 2), ('read', 1, 0)])
+        self.assertEqual(self.scheduler.get(1, 'HREGS', 2), [42])
+
+    def test_most_overdue_job_is_read_first(self):
+        self.scheduler.add_poll(1, 'HREGS', 0, 1, 50)
+        self.clock.now += 10
+        self.scheduler.add_poll(2, 'HREGS', 5, 1, 50)
+        self.clock.now += 10
+
+        self.scheduler.service()
+        self.scheduler.service()
+        self.assertEqual(self.host.log, [('read', 1, 0), ('read', 2, 5)])
+
+    def test_failing_slave_backs_off_exponentially(self):
+        self.host.errors[3] = OSError('no data received from slave')
+        self.scheduler.add_poll(3, 'HREGS', 0, 1, 10)
+
+        attempts = []
+        for _ in range(1000):
+            self.scheduler.service()
+            attempts.append(len(self.host.log))
+            self.clock.now += 1
+        # tries at 0, 100, 300 (100 + 200), then every 300 ms
+        self.assertEqual([attempts.index(n) for n in range(1, 5)],
+                         [0, 100, 300, 600])
+        self.assertFalse(self.scheduler.is_online(3))
+
+        del self.host.errors[3]
+        self.clock.now += 300
+        self.scheduler.service()
+        self.assertTrue(self.scheduler.is_online(3))
+
+    def test_rejected_write_keeps_slave_health(self):
+        results = []
+        self.host.errors[4] = OSError('no data received from slave')
+        self.scheduler.add_poll(4, 'HREGS', 0, 1, 10)
+        self.scheduler.service()
+        self.assertFalse(self.scheduler.is_online(4))
+
+        # a rejected write after the backoff must not end it early
+        self.clock.now += 100
+        self.host.errors[4] = ValueError('slave returned exception code')
+        self.scheduler.write(4, 'HREGS', 0, 1, callback=results.append)
+        self.scheduler.service()
+        self.assertIsInstance(results[0], ValueError)
+        self.assertFalse(self.scheduler.is_online(4))
+
+    def test_rejected_read_keeps_slave_health(self):
+        self.host.errors[5] = ValueError('slave returned exception code')
+        job = self.scheduler.add_poll(5, 'HREGS', 0, 1, 10)
+        self.scheduler.service()
+
+        self.assertIsInstance(job.error, ValueError)
+        self.assertIsNone(job.values)
+        self.assertTrue(self.scheduler.is_online(5))
+
+
+if __name__ == '__main__':
+    unittest.main()
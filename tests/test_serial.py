@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+"""
+Tests of the background receiver of Modbus RTU frames
+
+Runs on CPython and on the MicroPython unix port, from the repository
+root::
+
+    python3 -m unittest discover tests
+"""
+
+# system packages
+import struct
+import sys
+import time
+import unittest
+
+sys.path.insert(0, 'benchmarks')
+sys.path.insert(0, 'lib')
+
+import fakes    # noqa: E402
+fakes.install()
+
+from umodbus import serial                      # noqa: E402
+from umodbus.crc import crc16                   # noqa: E402
+from umodbus.serial import RTUFrameAssembler    # noqa: E402
+
+#: Inter-frame delay of the tested receiver in microseconds
+T35 = 2000
+
+
+class FakeTime(object):
+    """Microsecond clock set by the test"""
+    def __init__(self):
+        self.now = 1000
+
+    def ticks_us(self):
+        return self.now
+
+    def ticks_diff(self, end, start):
+        return time.ticks_diff(end, start)
+
+
+class RxUART(object):
+    """UART receiving the bytes fed by the test"""
+    def __init__(self):
+        self.rx = bytearray()
+
+    def any(self):
+        return len(self.rx)
+
+    def read(self, nbytes=None):
+        nbytes = len(self.rx) if nbytes is None else nbytes
+        data = bytes(self.rx[:nbytes])
+        del self.rx[:nbytes]
+        return data
+
+    def readinto(self, buf, nbytes):
+        data = self.read(nbytes)
+        buf[:len(data)] = data
+        return len(data)
+
+
+def _frame(pdu: bytes) -> bytes:
+    return pdu + struct.pack('<H', crc16(pdu))
+
+
+class TestRTUFrameAssembler(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeTime()
+        serial.time = self.clock
+        self.uart = RxUART()
+        self.rx = RTUFrameAssembler(uart=self.uart,
+                                    inter_frame_delay=T35,
+                                    max_frames=2)
+
+    def tearDown(self):
+        serial.time = time
+
+    def _receive(self, data: bytes) -> None:
+        # bytes arrive in two chunks, then the line stays silent
+        half = len(data) // 2
+        for chunk in (data[:half], data[half:]):
+            self.uart.rx.extend(chunk)
+            self.rx._service()
+            self.clock.now += 500
+        self.clock.now += T35
+        self.rx._service()
+
+    def test_frame_completes_after_silence(self):
+        frame = _frame(b'\x01\x03\x00\x00\x00\x02')
+        self.uart.rx.extend(frame)
+        self.rx._service()
+        self.clock.now += T35 - 1
+        self.rx._service()
+        self.assertEqual(self.rx.pending, 0)
+
+        self.clock.now += 1
+        self.rx._service()
+        self.assertEqual(self.rx.pending, 1)
+        self.assertEqual(self.rx.get_frame(), frame)
+        self.assertTrue(self.rx.last_crc_valid)
+        self.assertIsNone(self.rx.get_frame())
+
+    def test_corrupted_frame_is_flagged(self):
+        frame = bytearray(_frame(b'\x01\x06\x00\x01\x00\x03'))
+        frame[2] ^= 0x10
+        self._receive(bytes(frame))
+
+        self.assertEqual(self.rx.get_frame(), bytes(frame))
+        self.assertFalse(self.rx.last_crc_valid)
+
+    def test_full_ring_drops_newest_frame(self):
+        frames = [_frame(bytes([1, 3, 0, n, 0, 1])) for n in range(3)]
+        for frame in frames:
+            self._receive(frame)
+        self.assertEqual(self.rx.pending, 2)
+
+        self.assertEqual(self.rx.get_frame(), frames[0])
+        self.assertEqual(self.rx.get_frame(), frames[1])
+
+        # the slots are reused once read
+        for frame in frames:
+            self._receive(frame)
+        self.assertEqual([self.rx.get_frame(), self.rx.get_frame()],
+                         frames[:2])
+
+    def test_clear_drops_queued_frames(self):
+        self._receive(_frame(b'\x01\x03\x00\x00\x00\x01'))
+        self.rx.clear()
+        self.assertEqual(self.rx.pending, 0)
+        self.assertIsNone(self.rx.get_frame())
+
+    def test_engine_is_opt_in(self):
+        itf = serial.Serial(uart_id=0, baudrate=115200, pins=(0, 1))
+        self.assertIsNone(itf._rx)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+"""
+Tests of the Modbus TCP server request decoding
+
+Runs on CPython and on the MicroPython unix port, from the repository
+root::
+
+    python3 -m unittest discover tests
+    micropython -m unittest discover tests
+"""
+
+# system packages
+import errno
+import struct
+import sys
+import unittest
+
+sys.path.insert(0, 'benchmarks')
+sys.path.insert(0, 'lib')
+
+import fakes    # noqa: E402
+fakes.install()
+
+from umodbus import const as Const      # noqa: E402
+from umodbus.modbus import Modbus       # noqa: E402
+
+#: Unit address of the tested server
+UNIT_ADDR = 1
+
+
+class RecordingSocket(object):
+    """Socket keeping all sent data"""
+    def __init__(self):
+        self.data = bytearray()
+
+    def send(self, buf):
+        self.data.extend(buf)
+        return len(buf)
+
+    def close(self):
+        pass
+
+
+class SlowSocket(RecordingSocket):
+    """Socket taking a few bytes per call, then failing with an error"""
+    def __init__(self, chunk: int, error: int = errno.EAGAIN):
+        super().__init__()
+        self.chunk = chunk
+        self.error = error
+
+    def send(self, buf):
+        if not self.chunk:
+            raise OSError(self.error, 'send failed')
+        taken = min(self.chunk, len(buf))
+        self.data.extend(buf[:taken])
+        self.chunk = 0
+        return taken
+
+
+def _adu(tid: int, pdu: bytes) -> bytes:
+    return struct.pack('>HHHB', tid, 0, len(pdu) + 1, UNIT_ADDR) + pdu
+
+
+def _responses(data: bytes) -> list:
+    # split sent ADUs into (transaction ID, PDU)
+    responses = []
+    start = 0
+    while start < len(data):
+        tid, _, length = struct.unpack_from('>HHH', data, start)
+        end = start + Const.MBAP_HDR_LENGTH - 1 + length
+        responses.append((tid, bytes(data[start + Const.MBAP_HDR_LENGTH:end])))
+        start = end
+    return responses
+
+
+class TestTCPDecode(unittest.TestCase):
+    def setUp(self):
+        self.itf = fakes.loopback_tcp()
+        self.sock = RecordingSocket()
+        self.itf.conn.sock = self.sock
+        # decode the receive buffer as it is, it is not refilled per call
+        self.itf.get_request = self._get_request
+        self.client = Modbus(self.itf, None)
+        self.client.add_hreg(0, [7, 8])
+
+    def _get_request(self, unit_addr_list=None, timeout=None):
+        self.itf.conn.decode(unit_addr_list, self.itf._requests)
+        return self.itf._next_request()
+
+    def test_short_pdu_is_answered_and_consumed(self):
+        # FC07 without data, followed by a valid read of two registers
+        self.itf.conn._rx_buf = bytearray(
+            _adu(1, bytes([Const.READ_EXCEPTION_STATUS])) +
+            _adu(2, struct.pack('>BHH', Const.READ_HOLDING_REGISTERS, 0, 2)))
+
+        self.assertTrue(self.client.process())
+        self.assertFalse(self.client.process())
+        self.assertEqual(self.itf.conn.buffered, 0)
+
+        self.assertEqual(_responses(self.sock.data), [
+            (1, bytes([Const.READ_EXCEPTION_STATUS + 0x80,
+                       Const.ILLEGAL_FUNCTION])),
+            (2, struct.pack('>BBHH', Const.READ_HOLDING_REGISTERS, 4, 7, 8)),
+        ])
+
+    def test_truncated_read_is_illegal_data_value(self):
+        self.itf.conn._rx_buf = bytearray(
+            _adu(3, bytes([Const.READ_HOLDING_REGISTERS, 0x00])))
+
+        # answered while decoding, there is no request to process
+        self.assertFalse(self.client.process())
+        self.assertFalse(self.client.process())
+        self.assertEqual(self.itf.conn.buffered, 0)
+
+        self.assertEqual(_responses(self.sock.data), [
+            (3, bytes([Const.READ_HOLDING_REGISTERS + 0x80,
+                       Const.ILLEGAL_DATA_VALUE])),
+        ])
+
+    def test_partial_send_is_kept_for_flush(self):
+        self.sock = self.itf.conn.sock = SlowSocket(chunk=5)
+        self.itf.conn._rx_buf = bytearray(
+            _adu(4, struct.pack('>BHH', Const.READ_HOLDING_REGISTERS, 0, 2)))
+
+        self.assertTrue(self.client.process())
+        self.assertIn(self.itf.conn, self.itf.connections)
+        self.assertEqual(len(self.sock.data), 5)
+        # socket still full
+        self.assertFalse(self.itf.conn.flush())
+
+        self.sock.chunk = 100
+        self.assertTrue(self.itf.conn.flush())
+        self.assertEqual(_responses(self.sock.data), [
+            (4, struct.pack('>BBHH', Const.READ_HOLDING_REGISTERS, 4, 7, 8)),
+        ])
+
+    def test_broken_connection_is_closed(self):
+        self.itf.conn.sock = SlowSocket(chunk=0, error=errno.ECONNRESET)
+        self.itf.conn._rx_buf = bytearray(
+            _adu(5, struct.pack('>BHH', Const.READ_HOLDING_REGISTERS, 0, 2)))
+
+        self.assertTrue(self.client.process())
+        self.assertNotIn(self.itf.conn, self.itf.connections)
+
+
+if __name__ == '__main__':
+    unittest.main()